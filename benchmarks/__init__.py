@@ -0,0 +1,13 @@
+"""
+Performance benchmarks for pysindy, in the format of airspeed velocity (asv).
+
+Each module times (``time_*``) and measures the peak memory (``peakmem_*``)
+of a hot path over a grid of problem sizes. The benchmarks run against the
+pysindy installed in the current environment, so no network access is
+needed. From the top-level directory, run
+
+    asv run --python=same --quick       # one pass over every benchmark
+    asv run --python=same -b Polynomial # only matching benchmarks
+
+or compare two commits with ``asv continuous --python=same <old> <new>``.
+"""
@@ -0,0 +1,49 @@
+from .common import trajectory
+from pysindy.differentiation import FiniteDifference
+from pysindy.differentiation import SmoothedFiniteDifference
+from pysindy.differentiation import SpectralDerivative
+
+
+class FiniteDifferenceDifferentiate:
+    params = ([3, 12], [1000, 10000, 100000], [1, 2], [2, 4])
+    param_names = ["n_features", "n_samples", "d", "order"]
+
+    def setup(self, n_features, n_samples, d, order):
+        self.t, self.x = trajectory(n_samples, n_features)
+        self.method = FiniteDifference(d=d, order=order)
+
+    def time_differentiate(self, n_features, n_samples, d, order):
+        self.method._differentiate(self.x, self.t)
+
+    def peakmem_differentiate(self, n_features, n_samples, d, order):
+        self.method._differentiate(self.x, self.t)
+
+    def time_differentiate_uniform(self, n_features, n_samples, d, order):
+        self.method._differentiate(self.x, self.t[1] - self.t[0])
+
+
+class SmoothedFiniteDifferenceDifferentiate:
+    params = ([3, 12], [1000, 10000, 100000])
+    param_names = ["n_features", "n_samples"]
+
+    def setup(self, n_features, n_samples):
+        self.t, self.x = trajectory(n_samples, n_features)
+        self.method = SmoothedFiniteDifference()
+
+    def time_differentiate(self, n_features, n_samples):
+        self.method._differentiate(self.x, self.t)
+
+    def peakmem_differentiate(self, n_features, n_samples):
+        self.method._differentiate(self.x, self.t)
+
+
+class SpectralDerivativeDifferentiate:
+    params = ([3, 12], [1000, 10000, 100000])
+    param_names = ["n_features", "n_samples"]
+
+    def setup(self, n_features, n_samples):
+        self.t, self.x = trajectory(n_samples, n_features)
+        self.method = SpectralDerivative()
+
+    def time_differentiate(self, n_features, n_samples):
+        self.method._differentiate(self.x, self.t)
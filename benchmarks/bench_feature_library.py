@@ -0,0 +1,197 @@
+import numpy as np
+
+from .common import spatiotemporal_field
+from .common import trajectory
+from pysindy.feature_library import CustomLibrary
+from pysindy.feature_library import FourierLibrary
+from pysindy.feature_library import PDELibrary
+from pysindy.feature_library import PolynomialLibrary
+from pysindy.feature_library import TensoredLibrary
+from pysindy.feature_library import WeakPDELibrary
+
+_library_functions = [lambda x: x, lambda x: x * x]
+_function_names = [lambda x: x, lambda x: x + x]
+
+
+class PolynomialLibraryTransform:
+    params = ([3, 6, 12], [2, 3, 4], [1000, 10000])
+    param_names = ["n_features", "degree", "n_samples"]
+
+    def setup(self, n_features, degree, n_samples):
+        _, self.x = trajectory(n_samples, n_features)
+        self.library = PolynomialLibrary(degree=degree).fit(self.x)
+
+    def time_transform(self, n_features, degree, n_samples):
+        self.library.transform(self.x)
+
+    def peakmem_transform(self, n_features, degree, n_samples):
+        self.library.transform(self.x)
+
+    def time_fit(self, n_features, degree, n_samples):
+        PolynomialLibrary(degree=degree).fit(self.x)
+
+    def time_get_feature_names(self, n_features, degree, n_samples):
+        self.library.get_feature_names()
+
+
+class PolynomialLibraryMonomials:
+    # Monomials built degree by degree from their parents, against the
+    # product of the inputs of every combination computed from scratch
+    params = ([(6, 4), (21, 3)], [1000, 10000], ["incremental", "product"])
+    param_names = ["n_features_degree", "n_samples", "method"]
+    timeout = 300
+
+    def setup(self, n_features_degree, n_samples, method):
+        n_features, degree = n_features_degree
+        _, self.x = trajectory(n_samples, n_features)
+        self.library = PolynomialLibrary(degree=degree).fit(self.x)
+        self.combinations = list(
+            self.library._combinations(n_features, degree, True, False, True)
+        )
+
+    def _transform(self, method):
+        if method == "incremental":
+            return self.library.transform(self.x)
+        xp = np.empty((self.x.shape[0], len(self.combinations)))
+        for i, comb in enumerate(self.combinations):
+            xp[..., i] = self.x[..., comb].prod(-1)
+        return xp
+
+    def time_transform(self, n_features_degree, n_samples, method):
+        self._transform(method)
+
+    def peakmem_transform(self, n_features_degree, n_samples, method):
+        self._transform(method)
+
+
+class FourierLibraryTransform:
+    params = ([3, 12], [1, 4], [1000, 10000])
+    param_names = ["n_features", "n_frequencies", "n_samples"]
+
+    def setup(self, n_features, n_frequencies, n_samples):
+        _, self.x = trajectory(n_samples, n_features)
+        self.library = FourierLibrary(n_frequencies=n_frequencies).fit(self.x)
+
+    def time_transform(self, n_features, n_frequencies, n_samples):
+        self.library.transform(self.x)
+
+    def peakmem_transform(self, n_features, n_frequencies, n_samples):
+        self.library.transform(self.x)
+
+
+class CustomLibraryTransform:
+    # Single samples, as in predict and simulate, and batches, calling the
+    # functions per combination of inputs or once for all combinations
+    params = ([3, 12], [1, 10000], [False, True])
+    param_names = ["n_features", "n_samples", "vectorized"]
+
+    def setup(self, n_features, n_samples, vectorized):
+        _, self.x = trajectory(max(n_samples, 2), n_features)
+        self.x = self.x[:n_samples]
+        self.library = CustomLibrary(
+            library_functions=[lambda x: x, lambda x, y: x * y],
+            vectorized=vectorized,
+        ).fit(self.x)
+
+    def time_transform(self, n_features, n_samples, vectorized):
+        self.library.transform(self.x)
+
+
+class FourierLibraryHarmonics:
+    # Harmonics from the angle-addition recurrence, against evaluating
+    # sin(k x) and cos(k x) for every frequency and input
+    params = ([3, 12], [1, 10], [10000, 100000], ["recurrence", "direct"])
+    param_names = ["n_features", "n_frequencies", "n_samples", "method"]
+    timeout = 300
+
+    def setup(self, n_features, n_frequencies, n_samples, method):
+        _, self.x = trajectory(n_samples, n_features)
+        self.library = FourierLibrary(n_frequencies=n_frequencies).fit(self.x)
+
+    def _transform(self, n_frequencies, method):
+        if method == "recurrence":
+            return self.library.transform(self.x)
+        xp = np.empty((self.x.shape[0], self.library.n_output_features_))
+        idx = 0
+        for i in range(n_frequencies):
+            for j in range(self.x.shape[1]):
+                xp[:, idx] = np.sin((i + 1) * self.x[:, j])
+                xp[:, idx + 1] = np.cos((i + 1) * self.x[:, j])
+                idx += 2
+        return xp
+
+    def time_transform(self, n_features, n_frequencies, n_samples, method):
+        self._transform(n_frequencies, method)
+
+    def peakmem_transform(self, n_features, n_frequencies, n_samples, method):
+        self._transform(n_frequencies, method)
+
+
+class TensoredLibraryTransform:
+    # Pairwise products of two to four libraries, for one trajectory and
+    # for many
+    params = ([2, 4], [1, 100])
+    param_names = ["n_libraries", "n_trajectories"]
+
+    def setup(self, n_libraries, n_trajectories):
+        _, x = trajectory(10000, 3)
+        self.x = np.split(x, n_trajectories)
+        libraries = [PolynomialLibrary(degree=2), FourierLibrary()] * 2
+        self.library = TensoredLibrary(libraries[:n_libraries]).fit(self.x)
+
+    def time_transform(self, n_libraries, n_trajectories):
+        self.library.transform(self.x)
+
+    def peakmem_transform(self, n_libraries, n_trajectories):
+        self.library.transform(self.x)
+
+
+class PDELibraryTransform:
+    params = ([64, 256], [2, 4])
+    param_names = ["grid_size", "derivative_order"]
+
+    def setup(self, grid_size, derivative_order):
+        grid, self.u = spatiotemporal_field(grid_size)
+        self.library = PDELibrary(
+            library_functions=_library_functions,
+            function_names=_function_names,
+            derivative_order=derivative_order,
+            spatial_grid=grid[:, 0, 0],
+        ).fit([self.u])
+
+    def time_transform(self, grid_size, derivative_order):
+        self.library.transform([self.u])
+
+    def peakmem_transform(self, grid_size, derivative_order):
+        self.library.transform([self.u])
+
+
+class WeakPDELibrary1D:
+    params = ([64, 256], [10, 100, 400])
+    param_names = ["grid_size", "K"]
+    timeout = 300
+
+    def setup(self, grid_size, K):
+        self.grid, self.u = spatiotemporal_field(grid_size)
+        # Subdomains are placed at random
+        np.random.seed(100)
+        self.library = WeakPDELibrary(
+            library_functions=_library_functions,
+            function_names=_function_names,
+            derivative_order=2,
+            spatiotemporal_grid=self.grid,
+            K=K,
+            is_uniform=True,
+        ).fit([self.u])
+
+    def time_set_up_weights(self, grid_size, K):
+        self.library._set_up_weights()
+
+    def peakmem_set_up_weights(self, grid_size, K):
+        self.library._set_up_weights()
+
+    def time_transform(self, grid_size, K):
+        self.library.transform([self.u])
+
+    def peakmem_transform(self, grid_size, K):
+        self.library.transform([self.u])
@@ -0,0 +1,66 @@
+import warnings
+
+from sklearn.exceptions import ConvergenceWarning
+
+from .common import trajectory
+from pysindy.differentiation import FiniteDifference
+from pysindy.feature_library import PolynomialLibrary
+from pysindy.optimizers import SR3
+from pysindy.optimizers import STLSQ
+
+
+def _regression_problem(n_features, degree, n_samples, include_bias=True):
+    t, x = trajectory(n_samples, n_features)
+    theta = PolynomialLibrary(degree=degree, include_bias=include_bias).fit_transform(x)
+    return theta, FiniteDifference()._differentiate(x, t)
+
+
+class _OptimizerBenchmark:
+    def setup(self, *params):
+        self.theta, self.x_dot = _regression_problem(*params)
+        warnings.filterwarnings("ignore", category=ConvergenceWarning)
+
+    def teardown(self, *params):
+        warnings.resetwarnings()
+
+
+class STLSQFit(_OptimizerBenchmark):
+    params = ([3, 6, 12], [2, 3], [1000, 10000])
+    param_names = ["n_features", "degree", "n_samples"]
+
+    def time_fit(self, n_features, degree, n_samples):
+        STLSQ(threshold=0.1).fit(self.theta, self.x_dot)
+
+    def peakmem_fit(self, n_features, degree, n_samples):
+        STLSQ(threshold=0.1).fit(self.theta, self.x_dot)
+
+
+class SR3Fit(_OptimizerBenchmark):
+    params = ([3, 6, 12], [2, 3], [1000, 10000])
+    param_names = ["n_features", "degree", "n_samples"]
+
+    def time_fit(self, n_features, degree, n_samples):
+        SR3(threshold=0.1, max_iter=100).fit(self.theta, self.x_dot)
+
+    def peakmem_fit(self, n_features, degree, n_samples):
+        SR3(threshold=0.1, max_iter=100).fit(self.theta, self.x_dot)
+
+
+class TrappingSR3Fit(_OptimizerBenchmark):
+    # The trapping constraints require a quadratic library without a constant
+    params = ([3, 6], [1000, 10000])
+    param_names = ["n_features", "n_samples"]
+    timeout = 300
+
+    def setup(self, n_features, n_samples):
+        super().setup(n_features, 2, n_samples, False)
+
+    def time_fit(self, n_features, n_samples):
+        from pysindy.optimizers import TrappingSR3
+
+        TrappingSR3(threshold=0.0, eta=1e5, max_iter=100).fit(self.theta, self.x_dot)
+
+    def peakmem_fit(self, n_features, n_samples):
+        from pysindy.optimizers import TrappingSR3
+
+        TrappingSR3(threshold=0.0, eta=1e5, max_iter=100).fit(self.theta, self.x_dot)
@@ -0,0 +1,146 @@
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from .common import trajectory
+from pysindy import SINDy
+from pysindy.feature_library import PolynomialLibrary
+from pysindy.optimizers import STLSQ
+from pysindy.utils import RaggedTrajectories
+
+
+class SINDyFit:
+    params = ([3, 12], [1000, 10000, 100000])
+    param_names = ["n_features", "n_samples"]
+    timeout = 300
+
+    def setup(self, n_features, n_samples):
+        self.t, self.x = trajectory(n_samples, n_features)
+
+    def time_fit(self, n_features, n_samples):
+        SINDy(optimizer=STLSQ(threshold=0.1)).fit(self.x, t=self.t, quiet=True)
+
+    def peakmem_fit(self, n_features, n_samples):
+        SINDy(optimizer=STLSQ(threshold=0.1)).fit(self.x, t=self.t, quiet=True)
+
+
+class SINDySimulate:
+    params = ([3, 6], [100, 1000, 5000], ["solve_ivp", "odeint"])
+    param_names = ["n_features", "n_steps", "integrator"]
+    timeout = 300
+
+    def setup(self, n_features, n_steps, integrator):
+        t, x = trajectory(10000, n_features)
+        self.model = SINDy(
+            optimizer=STLSQ(threshold=0.1),
+            feature_library=PolynomialLibrary(degree=2),
+        ).fit(x, t=t, quiet=True)
+        self.x0 = x[0]
+        self.t = np.arange(n_steps) * (t[1] - t[0])
+
+    def time_simulate(self, n_features, n_steps, integrator):
+        self.model.simulate(self.x0, self.t, integrator=integrator)
+
+    def peakmem_simulate(self, n_features, n_steps, integrator):
+        self.model.simulate(self.x0, self.t, integrator=integrator)
+
+
+class SINDyPredict:
+    # Sparse models on large libraries only evaluate their active terms
+    params = ([3, 12], [2, 4])
+    param_names = ["n_features", "degree"]
+    timeout = 300
+
+    def setup(self, n_features, degree):
+        t, self.x = trajectory(10000, n_features)
+        self.model = SINDy(
+            optimizer=STLSQ(threshold=0.1),
+            feature_library=PolynomialLibrary(degree=degree),
+        ).fit(self.x, t=t, quiet=True)
+
+    def time_predict(self, n_features, degree):
+        self.model.predict(self.x)
+
+
+class SINDyFitLargeLibrary:
+    # A library matrix much larger than the data, to track the copies made
+    # on the way to the optimizer
+    params = ([False, True], [True, False])
+    param_names = ["normalize_columns", "copy_X"]
+    number = 1
+    timeout = 600
+
+    def setup(self, normalize_columns, copy_X):
+        self.t, self.x = trajectory(20000, 12)
+
+    def _fit(self, normalize_columns, copy_X):
+        SINDy(
+            optimizer=STLSQ(
+                threshold=0.5, normalize_columns=normalize_columns, copy_X=copy_X
+            ),
+            feature_library=PolynomialLibrary(degree=3),
+        ).fit(self.x, t=self.t, quiet=True)
+
+    def time_fit(self, normalize_columns, copy_X):
+        self._fit(normalize_columns, copy_X)
+
+    def peakmem_fit(self, normalize_columns, copy_X):
+        self._fit(normalize_columns, copy_X)
+
+
+class SINDyFitManyTrajectories:
+    # Thousands of short trajectories, as a list and as one ragged buffer
+    params = ([100, 1000, 5000], [False, True])
+    param_names = ["n_trajectories", "ragged"]
+    timeout = 300
+
+    def setup(self, n_trajectories, ragged):
+        t, x = trajectory(80 * n_trajectories)
+        lengths = np.random.default_rng(0).integers(20, 80, size=n_trajectories)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        x = x[: offsets[-1]]
+        if ragged:
+            self.x = RaggedTrajectories(x, offsets)
+        else:
+            self.x = np.split(x, offsets[1:-1])
+        self.dt = t[1] - t[0]
+
+    def time_fit(self, n_trajectories, ragged):
+        SINDy(optimizer=STLSQ(threshold=0.1)).fit(
+            self.x, t=self.dt, multiple_trajectories=True, quiet=True
+        )
+
+
+class SINDyLoad:
+    # Restoring a fitted model, from a pickle and from SINDy.save
+    params = ([2, 5], ["pickle", "npz"])
+    param_names = ["degree", "format"]
+
+    def setup(self, degree, format):
+        t, x = trajectory(10000, 6)
+        model = SINDy(
+            optimizer=STLSQ(threshold=0.1),
+            feature_library=PolynomialLibrary(degree=degree),
+        ).fit(x, t=t, quiet=True)
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "model." + format)
+        if format == "pickle":
+            with open(self.path, "wb") as f:
+                pickle.dump(model, f)
+        else:
+            model.save(self.path)
+
+    def teardown(self, degree, format):
+        self.dir.cleanup()
+
+    def time_load(self, degree, format):
+        if format == "pickle":
+            with open(self.path, "rb") as f:
+                pickle.load(f)
+        else:
+            SINDy.load(self.path)
+
+    def track_size(self, degree, format):
+        return os.path.getsize(self.path)
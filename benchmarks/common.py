@@ -0,0 +1,61 @@
+"""
+Data sets shared by the benchmarks, generated from the systems in
+:mod:`pysindy.utils.odes`.
+"""
+from functools import lru_cache
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from pysindy.utils import lorenz
+from pysindy.utils import rossler
+
+DT = 0.002
+
+_systems = {
+    "lorenz": (lorenz, np.array([-8.0, 8.0, 27.0])),
+    "rossler": (rossler, np.array([1.0, 1.0, 0.0])),
+}
+
+
+@lru_cache(maxsize=None)
+def trajectory(n_samples, n_features=3, system="lorenz"):
+    """Sample ``n_features // 3`` copies of a system from nearby initial conditions.
+
+    Returns the time points, shape (n_samples,), and the states of all the
+    copies side by side, shape (n_samples, n_features). Copies let the
+    state dimension grow while keeping realistic, bounded data.
+    """
+    rhs, x0 = _systems[system]
+    n_copies = n_features // 3
+    t = np.arange(n_samples) * DT
+    x = np.concatenate(
+        [
+            solve_ivp(
+                rhs,
+                (t[0], t[-1]),
+                x0 + 0.1 * k,
+                t_eval=t,
+                rtol=1e-8,
+                atol=1e-8,
+            ).y.T
+            for k in range(n_copies)
+        ],
+        axis=1,
+    )
+    x.flags.writeable = False
+    return t, x
+
+
+@lru_cache(maxsize=None)
+def spatiotemporal_field(grid_size):
+    """A decaying travelling wave on a square (x, t) grid.
+
+    Returns the grid, shape (grid_size, grid_size, 2), and the field u,
+    shape (grid_size, grid_size, 1).
+    """
+    x = np.linspace(-8, 8, grid_size)
+    t = np.linspace(0, 10, grid_size)
+    X, T = np.meshgrid(x, t, indexing="ij")
+    u = (np.sin(X - T) * np.exp(-0.1 * T))[..., np.newaxis]
+    return np.stack([X, T], axis=-1), u
@@ -895,11 +895,17 @@ def hyperparameter_scan_stlsq(
         n_models=n_models,
         n_subset=n_subset,
         replace=replace,
+        store_theta=True,
     )
 
-    # Compute initial model
+    # Compute initial model. The derivatives and library matrix are
+    # cached, so the scan below only reruns the optimizer.
+    cache = ps.FeatureCache()
     model = ps.SINDy(
-        feature_library=ode_lib, optimizer=optimizer, feature_names=input_names
+        feature_library=ode_lib,
+        optimizer=optimizer,
+        feature_names=input_names,
+        feature_cache=cache,
     )
     model.fit(
         x_train,
@@ -955,7 +961,10 @@ def hyperparameter_scan_stlsq(
             # ensemble_aggregator=np.mean
         )
         model = ps.SINDy(
-            feature_library=ode_lib, optimizer=optimizer, feature_names=input_names
+            feature_library=ode_lib,
+            optimizer=optimizer,
+            feature_names=input_names,
+            feature_cache=cache,
         )
         model.fit(
             x_train,
@@ -1130,6 +1139,7 @@ def hyperparameter_scan_lasso(
         n_models=n_models,
         n_subset=n_subset,
         replace=replace,
+        store_theta=True,
         # ensemble_aggregator=np.mean
     )
 
@@ -1367,6 +1377,7 @@ def hyperparameter_scan_sr3(
         n_models=n_models,
         n_subset=n_subset,
         replace=replace,
+        store_theta=True,
         # ensemble_aggregator=np.mean
     )
 
@@ -1605,6 +1616,7 @@ def hyperparameter_scan_miosr(
         n_models=n_models,
         n_subset=n_subset,
         replace=replace,
+        store_theta=True,
         # ensemble_aggregator=np.mean
     )
 
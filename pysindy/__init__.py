@@ -1,18 +1,31 @@
-from pkg_resources import DistributionNotFound
-from pkg_resources import get_distribution
+try:
+    from importlib.metadata import PackageNotFoundError
+    from importlib.metadata import version
+except ImportError:  # Python < 3.8
+    from pkg_resources import DistributionNotFound as PackageNotFoundError
+    from pkg_resources import get_distribution
+
+    def version(name):
+        return get_distribution(name).version
+
 
 try:
-    __version__ = get_distribution(__name__).version
-except DistributionNotFound:
+    __version__ = version(__name__)
+except PackageNotFoundError:
     pass
 
 from . import differentiation
 from . import feature_library
 from . import optimizers
 from . import deeptime
+from . import model_selection
 from . import utils
 from .pysindy import SINDy
 from .pysindy import AxesArray
+from .utils import FeatureCache
+from .utils import FitProfile
+from .utils import FitProgress
+from .utils import RaggedTrajectories
 from .differentiation import BaseDifferentiation
 from .differentiation import FiniteDifference
 from .differentiation import SpectralDerivative
@@ -20,35 +33,11 @@ from .differentiation import SINDyDerivative
 from .differentiation import SmoothedFiniteDifference
 from .feature_library import ConcatLibrary
 from .feature_library import TensoredLibrary
-from .feature_library import GeneralizedLibrary
-from .feature_library import CustomLibrary
-from .feature_library import FourierLibrary
-from .feature_library import IdentityLibrary
 from .feature_library import PolynomialLibrary
-from .feature_library import PDELibrary
-from .feature_library import WeakPDELibrary
-from .feature_library import SINDyPILibrary
-from .feature_library import ParameterizedLibrary
 from .optimizers import BaseOptimizer
 from .optimizers import ConstrainedSR3
 from .optimizers import FROLS
-
-try:  # Waiting on PEP 690 to lazy import gurobipy
-    from .optimizers import MIOSR
-except ImportError:
-    pass
-try:  # Waiting on PEP 690 to lazy import CVXPY
-    from .optimizers import SINDyPI
-except ImportError:
-    pass
-try:  # Waiting on PEP 690 to lazy import CVXPY
-    from .optimizers import TrappingSR3
-except ImportError:
-    pass
-try:  # Waiting on PEP 690 to lazy import CVXPY
-    from .optimizers import StableLinearSR3
-except ImportError:
-    pass
+from .optimizers import StableLinearSR3
 from .optimizers import SINDyOptimizer
 from .optimizers import SR3
 from .optimizers import SSR
@@ -56,9 +45,35 @@ from .optimizers import STLSQ
 from .optimizers import EnsembleOptimizer
 
 
-__all__ = ["SINDy", "AxesArray"]
+__all__ = [
+    "SINDy",
+    "AxesArray",
+    "FeatureCache",
+    "FitProfile",
+    "FitProgress",
+    "RaggedTrajectories",
+]
 __all__.extend(differentiation.__all__)
 __all__.extend(feature_library.__all__)
 __all__.extend(optimizers.__all__)
 __all__.extend(["utils"])
 __all__.extend(["deeptime"])
+__all__.extend(["model_selection"])
+
+
+def __getattr__(name):
+    # MIOSR, SINDyPI and TrappingSR3 import their solvers on first access, and
+    # all libraries but PolynomialLibrary are imported on first access too
+    if name in optimizers._lazy_optimizers:
+        return getattr(optimizers, name)
+    if name in feature_library._lazy_libraries:
+        return getattr(feature_library, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(
+        set(globals())
+        | set(optimizers._lazy_optimizers)
+        | set(feature_library._lazy_libraries)
+    )
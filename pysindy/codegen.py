@@ -0,0 +1,299 @@
+"""
+Generation of standalone source code for fitted SINDy models.
+"""
+import numpy as np
+from sklearn.utils.validation import check_is_fitted
+
+from .feature_library import ConcatLibrary
+from .feature_library import PolynomialLibrary
+from .feature_library import TensoredLibrary
+
+
+def numpy_source(model):
+    """
+    Source code of a Python module evaluating a fitted SINDy model with NumPy.
+
+    The module depends on nothing but NumPy. It defines ``rhs(x)`` and
+    ``jacobian(x)`` (``rhs(x, u)`` and ``jacobian(x, u)`` for models with
+    control inputs), which accept a single state of shape (n_features,) or a
+    batch of shape (n_samples, n_features), just like
+    :meth:`pysindy.SINDy.compile_rhs` and :meth:`pysindy.SINDy.jacobian`.
+
+    Only the library features with a nonzero coefficient are computed, and
+    every product of inputs is computed once: a monomial is formed by
+    multiplying a lower degree monomial by one input, so ``x0 * x1`` is
+    reused for ``x0 * x1 * x2``, and monomials and trigonometric factors are
+    shared between the equations.
+
+    Parameters
+    ----------
+    model : pysindy.SINDy
+        A fitted model whose feature library is built from
+        :class:`pysindy.PolynomialLibrary`, :class:`pysindy.IdentityLibrary`
+        and :class:`pysindy.FourierLibrary`, possibly concatenated, tensored
+        or combined in a :class:`pysindy.GeneralizedLibrary`.
+
+    Returns
+    -------
+    source : str
+    """
+    check_is_fitted(model, "model")
+    library = model.model.steps[0][1]
+    optimizer = model.model.steps[-1][1]
+    coef = np.asarray(optimizer.coef_, dtype=float)
+    intercept = np.broadcast_to(
+        np.asarray(optimizer.intercept_, dtype=float), coef.shape[:1]
+    )
+    n_inputs = len(model.feature_names)
+    n_control = model.n_control_features_
+    n_state = n_inputs - n_control
+    if coef.shape[0] != n_state:
+        raise NotImplementedError("Only models of the state can be exported")
+    terms = _library_terms(library, np.arange(n_inputs), n_inputs)
+
+    names = [f"x{j}" for j in range(n_state)] + [f"u{j}" for j in range(n_control)]
+    args = "x" if n_control == 0 else "x, u"
+    lhs = "{}[k+1]" if model.discrete_time else "({})'"
+    equations = "\n".join(
+        f"    {lhs.format(name)} = {equation}"
+        for name, equation in zip(model.feature_names, model.equations(precision=6))
+    )
+
+    rhs = _Emitter(names)
+    rhs_entries = []
+    for i in range(coef.shape[0]):
+        active = np.flatnonzero(coef[i])
+        rhs_entries.append(
+            rhs.sum([(coef[i, k], rhs.term(*terms[k])) for k in active], intercept[i])
+        )
+
+    jac = _Emitter(names)
+    jac_entries = {}
+    for i in range(coef.shape[0]):
+        for j in range(n_state):
+            derivative = {}
+            for k in np.flatnonzero(coef[i]):
+                for c, factors in jac.term_derivative(*terms[k], j):
+                    derivative[factors] = derivative.get(factors, 0.0) + coef[i, k] * c
+            if any(derivative.values()):
+                jac_entries[i, j] = jac.sum(
+                    [(c, factors) for factors, c in derivative.items()], 0.0
+                )
+
+    lines = [
+        '"""',
+        "SINDy model exported with pysindy.",
+        "",
+        "Equations:",
+        "",
+        equations,
+        '"""',
+        "import numpy as np",
+        "",
+        f"N_STATE = {n_state}",
+        f"N_CONTROL = {n_control}",
+        f"FEATURE_NAMES = {list(model.feature_names)!r}",
+        "",
+        "",
+        f"def rhs({args}):",
+        '    """',
+        "    Right-hand side of the model"
+        + (" (the next state)." if model.discrete_time else "."),
+        "",
+        "    x has shape (N_STATE,) or (n_samples, N_STATE)"
+        + (
+            "; u has shape (N_CONTROL,) or\n    (n_samples, N_CONTROL)."
+            if n_control
+            else "."
+        ),
+        '    """',
+        *_inputs_source(n_control),
+        *rhs.lines,
+        "    out = np.empty(z.shape[:-1] + (N_STATE,), dtype=z.dtype)",
+        *(f"    out[..., {i}] = {entry}" for i, entry in enumerate(rhs_entries)),
+        "    return out",
+        "",
+        "",
+        f"def jacobian({args}):",
+        '    """',
+        "    Jacobian of rhs with respect to the state, of shape",
+        "    x.shape[:-1] + (N_STATE, N_STATE).",
+        '    """',
+        *_inputs_source(n_control),
+        *jac.lines,
+        "    out = np.zeros(z.shape[:-1] + (N_STATE, N_STATE), dtype=z.dtype)",
+        *(f"    out[..., {i}, {j}] = {entry}" for (i, j), entry in jac_entries.items()),
+        "    return out",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def _inputs_source(n_control):
+    if n_control == 0:
+        return ["    z = np.asarray(x, dtype=float)"]
+    return [
+        "    x = np.asarray(x, dtype=float)",
+        "    u = np.broadcast_to(u, x.shape[:-1] + (N_CONTROL,))",
+        "    z = np.concatenate((x, u), axis=-1)",
+    ]
+
+
+def _library_terms(library, inputs, n_inputs):
+    """
+    Symbolic form of the features of a fitted library.
+
+    Every feature is a ``(powers, trig)`` pair: a monomial given by the
+    powers of all ``n_inputs`` inputs, times the trigonometric factors in
+    ``trig``, each a ``(function, frequency, input)`` triple. ``inputs`` are
+    the indices of the inputs seen by the library.
+    """
+    # Imported here so that importing pysindy does not load these libraries
+    from .feature_library import FourierLibrary
+    from .feature_library import GeneralizedLibrary
+    from .feature_library import IdentityLibrary
+
+    inputs = np.asarray(inputs)
+
+    def monomial(local_powers):
+        powers = np.zeros(n_inputs, dtype=int)
+        np.add.at(powers, inputs, local_powers)
+        return tuple(powers), ()
+
+    if isinstance(library, PolynomialLibrary):
+        return [monomial(row) for row in library.powers_]
+    if isinstance(library, IdentityLibrary):
+        return [monomial(row) for row in np.eye(len(inputs), dtype=int)]
+    if isinstance(library, FourierLibrary):
+        functions = ["sin"] * library.include_sin + ["cos"] * library.include_cos
+        zero = (0,) * n_inputs
+        return [
+            (zero, ((function, i + 1, inputs[j]),))
+            for i in range(library.n_frequencies)
+            for j in range(len(inputs))
+            for function in functions
+        ]
+    if isinstance(library, ConcatLibrary):
+        return [
+            term
+            for lib in library.libraries_
+            for term in _library_terms(lib, inputs, n_inputs)
+        ]
+    if isinstance(library, TensoredLibrary):
+        sublibrary_terms = [
+            _library_terms(
+                lib, inputs[np.unique(library.inputs_per_library_[i])], n_inputs
+            )
+            for i, lib in enumerate(library.libraries_)
+        ]
+        return [
+            (
+                tuple(np.add(powers_a, powers_b)),
+                tuple(sorted(trig_a + trig_b)),
+            )
+            for i in range(len(sublibrary_terms))
+            for j in range(i + 1, len(sublibrary_terms))
+            for powers_a, trig_a in sublibrary_terms[i]
+            for powers_b, trig_b in sublibrary_terms[j]
+        ]
+    if isinstance(library, GeneralizedLibrary):
+        terms = []
+        for i, lib in enumerate(library.libraries_full_):
+            if i < library.inputs_per_library_.shape[0]:
+                if i not in library.exclude_libs_:
+                    lib_inputs = inputs[np.unique(library.inputs_per_library_[i])]
+                    terms += _library_terms(lib, lib_inputs, n_inputs)
+            else:
+                terms += _library_terms(lib, inputs, n_inputs)
+        return terms
+    raise NotImplementedError("{} cannot be exported".format(type(library).__name__))
+
+
+class _Emitter:
+    """
+    Assignments computing the monomials and trigonometric factors of a set
+    of terms, each only once and only if needed.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.lines = []
+        self._defined = {}
+
+    def _define(self, key, name, expression):
+        if key not in self._defined:
+            self.lines.append(f"    {name} = {expression}")
+            self._defined[key] = name
+        return self._defined[key]
+
+    def input(self, j):
+        return self._define(("input", j), self.names[j], f"z[..., {j}]")
+
+    def monomial(self, powers):
+        """Name of the monomial, or None for the constant 1."""
+        if not any(powers):
+            return None
+        if ("monomial", powers) in self._defined:
+            return self._defined["monomial", powers]
+        if sum(powers) == 1:
+            name = self.input(int(np.flatnonzero(powers)[0]))
+            self._defined["monomial", powers] = name
+            return name
+        # Multiply the monomial of one degree less by the last input
+        j = max(k for k, p in enumerate(powers) if p)
+        parent = tuple(p - (k == j) for k, p in enumerate(powers))
+        parent_name = self.monomial(parent)
+        name = "_".join(
+            self.names[k] if p == 1 else f"{self.names[k]}p{p}"
+            for k, p in enumerate(powers)
+            if p
+        )
+        return self._define(
+            ("monomial", powers), name, f"{parent_name} * {self.input(j)}"
+        )
+
+    def trig(self, function, frequency, j):
+        argument = self.input(j)
+        if frequency != 1:
+            argument = f"{frequency} * {argument}"
+        return self._define(
+            ("trig", function, frequency, j),
+            f"{function}_{frequency}{self.names[j]}",
+            f"np.{function}({argument})",
+        )
+
+    def term(self, powers, trig):
+        """Names of the factors of a term, to be multiplied together."""
+        factors = [self.monomial(powers)] + [self.trig(*t) for t in trig]
+        return tuple(f for f in factors if f is not None)
+
+    def term_derivative(self, powers, trig, j):
+        """Derivative of a term by input j, as (coefficient, factors) pairs."""
+        derivative = []
+        if powers[j]:
+            lower = tuple(p - (k == j) for k, p in enumerate(powers))
+            derivative.append((powers[j], self.term(lower, trig)))
+        for n, (function, frequency, input) in enumerate(trig):
+            if input == j:
+                others = trig[:n] + trig[n + 1 :]
+                if function == "sin":
+                    c, flipped = frequency, ("cos", frequency, input)
+                else:
+                    c, flipped = -frequency, ("sin", frequency, input)
+                derivative.append((c, self.term(powers, others + (flipped,))))
+        return derivative
+
+    @staticmethod
+    def sum(terms, constant):
+        """Source of constant + sum of coefficient * product of factors."""
+        constant = float(constant) + sum(float(c) for c, f in terms if not f)
+        source = repr(constant) if constant or all(not f for c, f in terms) else ""
+        for c, factors in terms:
+            if not factors or c == 0:
+                continue
+            product = " * ".join((repr(abs(float(c))),) + tuple(factors))
+            if source:
+                source += f" {'-' if c < 0 else '+'} {product}"
+            else:
+                source = f"-{product}" if c < 0 else product
+        return source
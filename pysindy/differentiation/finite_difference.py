@@ -212,7 +212,7 @@ class FiniteDifference(BaseDifferentiation):
             np.einsum(
                 "ij...,ij->j...",
                 np.transpose(x[tuple(s)], axes=trans),
-                np.transpose(coeffs),
+                np.transpose(coeffs).astype(_float_dtype(x), copy=False),
             ),
             np.roll(np.arange(len(x.shape)), self.axis),
         )
@@ -237,7 +237,9 @@ class FiniteDifference(BaseDifferentiation):
             coeffs = self._constant_coefficients(dt)
             dims = np.array(x.shape)
             dims[self.axis] = x.shape[self.axis] - (self.n_stencil - 1)
-            interior = np.zeros(dims)
+            # Work in the precision of x, e.g. float32 data stays float32
+            coeffs = coeffs.astype(_float_dtype(x), copy=False)
+            interior = np.zeros(dims, dtype=coeffs.dtype)
             # Slightly faster version of self._accumulate for uniform grid
             for i in range(self.n_stencil):
                 if abs(coeffs[i]) > 0:
@@ -283,3 +285,8 @@ class FiniteDifference(BaseDifferentiation):
                 )
             x_dot[tuple(s)] = boundary
         return x_dot
+
+
+def _float_dtype(x):
+    """Floating point type of x, promoting integers to float64."""
+    return np.result_type(x.dtype, np.float32)
@@ -3,8 +3,9 @@ Wrapper classes for differentiation methods from the :doc:`derivative:index` pac
 
 Some default values used here may differ from those used in :doc:`derivative:index`.
 """
-from derivative import dxdt
 from numpy import arange
+from numpy import float32
+from numpy import result_type
 
 from .base import BaseDifferentiation
 
@@ -70,4 +71,7 @@ class SINDyDerivative(BaseDifferentiation):
                 raise ValueError("t must be a positive constant or an array")
             t = arange(x.shape[0]) * t
 
-        return dxdt(x, t, axis=0, **self.kwargs)
+        from derivative import dxdt
+
+        x_dot = dxdt(x, t, axis=0, **self.kwargs)
+        return x_dot.astype(result_type(x.dtype, float32), copy=False)
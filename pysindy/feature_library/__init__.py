@@ -1,14 +1,8 @@
+from importlib import import_module
+
 from .base import ConcatLibrary
 from .base import TensoredLibrary
-from .custom_library import CustomLibrary
-from .fourier_library import FourierLibrary
-from .generalized_library import GeneralizedLibrary
-from .identity_library import IdentityLibrary
-from .parameterized_library import ParameterizedLibrary
-from .pde_library import PDELibrary
 from .polynomial_library import PolynomialLibrary
-from .sindy_pi_library import SINDyPILibrary
-from .weak_pde_library import WeakPDELibrary
 
 __all__ = [
     "ConcatLibrary",
@@ -23,3 +17,27 @@ __all__ = [
     "SINDyPILibrary",
     "ParameterizedLibrary",
 ]
+
+# Only the base classes and the default PolynomialLibrary are imported with
+# the package; the other libraries are loaded when first accessed.
+_lazy_libraries = {
+    "CustomLibrary": ".custom_library",
+    "FourierLibrary": ".fourier_library",
+    "GeneralizedLibrary": ".generalized_library",
+    "IdentityLibrary": ".identity_library",
+    "ParameterizedLibrary": ".parameterized_library",
+    "PDELibrary": ".pde_library",
+    "SINDyPILibrary": ".sindy_pi_library",
+    "WeakPDELibrary": ".weak_pde_library",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_libraries:
+        module = import_module(_lazy_libraries[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_libraries))
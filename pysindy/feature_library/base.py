@@ -3,7 +3,9 @@ Base class for feature library classes.
 """
 import abc
 import warnings
+from functools import partial
 from functools import wraps
+from itertools import combinations
 from typing import Sequence
 
 import numpy as np
@@ -16,6 +18,10 @@ from ..utils import AxesArray
 from ..utils import comprehend_axes
 from ..utils import validate_no_reshape
 from ..utils import wrap_axes
+from ..utils.profiling import profile_stage
+
+# Number of entries in each argument of a vectorized library function call
+_VECTORIZED_BLOCK_SIZE = 2**16
 
 
 class BaseFeatureLibrary(TransformerMixin):
@@ -35,6 +41,10 @@ class BaseFeatureLibrary(TransformerMixin):
         The indices to use for ensembling the library.
     """
 
+    # Whether each output row depends only on the same row of the input, so
+    # that many trajectories can be transformed at once as one long array
+    _pointwise = False
+
     def __init__(self, library_ensemble=None, ensemble_indices=[0]):
         if library_ensemble is not None:
             warnings.warn(
@@ -143,6 +153,49 @@ class BaseFeatureLibrary(TransformerMixin):
         """
         raise NotImplementedError
 
+    def transform_derivative(self, x):
+        """
+        Compute the derivatives of the library features with respect to the
+        input features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_output_features, n_features)
+            ``dxp[k, i, j]`` is the derivative of the ith output feature with
+            respect to the jth input feature, evaluated at the kth sample.
+        """
+        raise NotImplementedError(
+            "{} does not provide analytic derivatives".format(type(self).__name__)
+        )
+
+    def transform_columns(self, x, columns):
+        """
+        Compute only some of the library features.
+
+        Used to evaluate fitted models, which typically use a small fraction
+        of the library. This default computes all features and selects the
+        requested ones; libraries override it to skip the others.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        return np.asarray(self.transform(x))[..., np.asarray(columns, dtype=int)]
+
     def _ensemble(self, xp):
         """
         If library bagging, return xp without
@@ -181,6 +234,87 @@ class BaseFeatureLibrary(TransformerMixin):
         return self.n_output_features_
 
 
+def _transform_blocks_columns(blocks, columns, n_samples):
+    """
+    Compute some columns of a feature matrix made of consecutive blocks.
+
+    ``blocks`` lists the ``(n_block_features, transform_columns)`` of every
+    block, where ``transform_columns(local_columns)`` computes the given
+    columns of that block. Blocks without any requested column are skipped.
+    """
+    columns = np.asarray(columns, dtype=int)
+    positions = []
+    pieces = []
+    start = 0
+    for n_block_features, transform_columns in blocks:
+        in_block = (columns >= start) & (columns < start + n_block_features)
+        if in_block.any():
+            positions.append(np.flatnonzero(in_block))
+            pieces.append(np.asarray(transform_columns(columns[in_block] - start)))
+        start += n_block_features
+    if not pieces:
+        return np.empty((n_samples, 0))
+    xp = np.empty((n_samples, len(columns)), dtype=np.result_type(*pieces))
+    for position, piece in zip(positions, pieces):
+        xp[:, position] = piece
+    return xp
+
+
+def _function_arguments(library, functions, n_features):
+    """
+    Inputs passed to the library functions, computed once at fit.
+
+    Returns one int array of shape (n_calls, n_args) per function, whose rows
+    are the indices of the inputs of each call, enumerated by
+    ``library._combinations``.
+    """
+    arguments = []
+    for f in functions:
+        n_args = f.__code__.co_argcount
+        calls = library._combinations(n_features, n_args, library.interaction_only)
+        arguments.append(np.array(list(calls), dtype=np.intp).reshape(-1, n_args))
+    return arguments
+
+
+def _evaluate_functions(functions, arguments, x, out, vectorized=False):
+    """
+    Write every call of the library functions on x to the columns of out.
+
+    Vectorized functions are called for all their calls at once, on blocks
+    of samples along the first axis: each argument stacks the inputs of
+    every call into an array of shape ``block.shape[:-1] + (n_calls,)``.
+    """
+    # Plain arrays: indexing an AxesArray costs more than most functions
+    x = np.asarray(x)
+    column = 0
+    for f, calls in zip(functions, arguments):
+        if not vectorized:
+            for c in calls.tolist():
+                out[..., column] = f(*[x[..., j] for j in c])
+                column += 1
+        elif len(calls):
+            stop = column + len(calls)
+            # Keep the stacked arguments small enough to stay in cache
+            row_size = len(calls) * int(np.prod(x.shape[1:-1]))
+            n_rows = max(1, _VECTORIZED_BLOCK_SIZE // row_size)
+            for start in range(0, x.shape[0], n_rows):
+                block = x[start : start + n_rows]
+                out[start : start + n_rows, ..., column:stop] = f(
+                    *[block[..., calls[:, k]] for k in range(calls.shape[1])]
+                )
+            column = stop
+    return out
+
+
+def _function_feature_names(function_names, arguments, input_features):
+    """Names of the calls of the library functions, in the order evaluated."""
+    return [
+        name(*[input_features[j] for j in c])
+        for name, calls in zip(function_names, arguments)
+        for c in calls.tolist()
+    ]
+
+
 def x_sequence_or_item(wrapped_func):
     """Allow a feature library's method to handle list or item inputs."""
 
@@ -268,6 +402,10 @@ class ConcatLibrary(BaseFeatureLibrary):
         )
         self.libraries_ = libraries
 
+    @property
+    def _pointwise(self):
+        return all(lib._pointwise for lib in self.libraries_)
+
     @x_sequence_or_item
     def fit(self, x_full, y=None):
         """
@@ -320,7 +458,10 @@ class ConcatLibrary(BaseFeatureLibrary):
 
         xp_full = []
         for x in x_full:
-            feature_sets = [lib.transform([x])[0] for lib in self.libraries_]
+            feature_sets = []
+            for i, lib in enumerate(self.libraries_):
+                with profile_stage(f"{type(lib).__name__}[{i}]"):
+                    feature_sets.append(lib.transform([x])[0])
             xp = np.concatenate(feature_sets, axis=feature_sets[0].ax_coord)
 
             xp = AxesArray(xp, comprehend_axes(xp))
@@ -348,6 +489,53 @@ class ConcatLibrary(BaseFeatureLibrary):
             feature_names += lib_feat_names
         return feature_names
 
+    def transform_derivative(self, x):
+        """Compute the derivatives of the concatenated library features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_output_features, n_features)
+            The derivatives of each output feature with respect to each input.
+        """
+        for lib in self.libraries_:
+            check_is_fitted(lib)
+        return np.concatenate(
+            [lib.transform_derivative(x) for lib in self.libraries_], axis=1
+        )
+
+    def transform_columns(self, x, columns):
+        """Compute only some of the concatenated library features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        for lib in self.libraries_:
+            check_is_fitted(lib)
+        x = np.asarray(x)
+        return _transform_blocks_columns(
+            [
+                (lib.n_output_features_, partial(lib.transform_columns, x))
+                for lib in self.libraries_
+            ],
+            columns,
+            x.shape[0],
+        )
+
     def calc_trajectory(self, diff_method, x, t):
         return self.libraries_[0].calc_trajectory(diff_method, x, t)
 
@@ -416,26 +604,6 @@ class TensoredLibrary(BaseFeatureLibrary):
         self.libraries_ = libraries
         self.inputs_per_library_ = inputs_per_library
 
-    def _combinations(self, lib_i, lib_j):
-        """
-        Compute combinations of the numerical libraries.
-
-        Returns
-        -------
-        lib_full : All combinations of the numerical library terms.
-        """
-        # the shape here should be fixed with ax_coord....
-        shape = np.array(lib_i.shape)
-        shape[lib_i.ax_coord] = (
-            lib_i.shape[lib_i.ax_coord] * lib_j.shape[lib_j.ax_coord]
-        )
-        lib_full = np.reshape(
-            lib_i[..., :, np.newaxis] * lib_j[..., np.newaxis, :],
-            shape,
-        )
-
-        return lib_full
-
     def _name_combinations(self, lib_i, lib_j):
         """
         Compute combinations of the library feature names.
@@ -456,6 +624,10 @@ class TensoredLibrary(BaseFeatureLibrary):
         """
         self.inputs_per_library_ = inputs_per_library
 
+    @property
+    def _pointwise(self):
+        return all(lib._pointwise for lib in self.libraries_)
+
     @x_sequence_or_item
     def fit(self, x_full, y=None):
         """
@@ -484,12 +656,16 @@ class TensoredLibrary(BaseFeatureLibrary):
                 temp_inputs, (len(self.libraries_), n_features)
             )
 
+        # Inputs seen by each library
+        self._library_inputs_ = [
+            np.unique(self.inputs_per_library_[i, :])
+            for i in range(len(self.libraries_))
+        ]
+
         # First fit all libs provided below
         fitted_libs = [
-            lib.fit(
-                [x[..., np.unique(self.inputs_per_library_[i, :])] for x in x_full], y
-            )
-            for i, lib in enumerate(self.libraries_)
+            lib.fit([x[..., inputs] for x in x_full], y)
+            for lib, inputs in zip(self.libraries_, self._library_inputs_)
         ]
 
         # Calculate the sum of output features
@@ -521,29 +697,38 @@ class TensoredLibrary(BaseFeatureLibrary):
         """
         check_is_fitted(self)
 
+        # Transform every library once, for all trajectories at a time
+        xp_libs = [
+            lib.transform([x[..., inputs] for x in x_full])
+            for lib, inputs in zip(self.libraries_, self._library_inputs_)
+        ]
+
         xp_full = []
-        for x in x_full:
-            xp = []
-            for i in range(len(self.libraries_)):
-                lib_i = self.libraries_[i]
-                if self.inputs_per_library_ is None:
-                    xp_i = lib_i.transform([x])[0]
-                else:
-                    xp_i = lib_i.transform(
-                        [x[..., np.unique(self.inputs_per_library_[i, :])]]
-                    )[0]
-
-                for j in range(i + 1, len(self.libraries_)):
-                    lib_j = self.libraries_[j]
-                    xp_j = lib_j.transform(
-                        [x[..., np.unique(self.inputs_per_library_[j, :])]]
-                    )[0]
-
-                    xp.append(self._combinations(xp_i, xp_j))
-
-            xp = np.concatenate(xp, axis=xp[0].ax_coord)
-            xp = AxesArray(xp, comprehend_axes(xp))
-            xp_full.append(xp)
+        for features in zip(*xp_libs):
+            features = [np.asarray(xp_k) for xp_k in features]
+            n_output_features = sum(
+                features[i].shape[-1] * features[j].shape[-1]
+                for i, j in combinations(range(len(features)), 2)
+            )
+            xp = np.empty(
+                features[0].shape[:-1] + (n_output_features,),
+                dtype=np.result_type(*features),
+            )
+            start = 0
+            for i, j in combinations(range(len(features)), 2):
+                n_i = features[i].shape[-1]
+                n_j = features[j].shape[-1]
+                # Products of every pair of terms, lib_i index major and
+                # lib_j index minor, written in place
+                np.multiply(
+                    features[i][..., :, np.newaxis],
+                    features[j][..., np.newaxis, :],
+                    out=xp[..., start : start + n_i * n_j].reshape(
+                        xp.shape[:-1] + (n_i, n_j)
+                    ),
+                )
+                start += n_i * n_j
+            xp_full.append(AxesArray(xp, comprehend_axes(xp)))
         if self.library_ensemble:
             xp_full = self._ensemble(xp_full)
         return xp_full
@@ -561,33 +746,117 @@ class TensoredLibrary(BaseFeatureLibrary):
         -------
         output_feature_names : list of string, length n_output_features
         """
-        feature_names = list()
-        for i in range(len(self.libraries_)):
-            lib_i = self.libraries_[i]
+        lib_feat_names = []
+        for i, lib in enumerate(self.libraries_):
+            inputs = np.unique(self.inputs_per_library_[i, :])
             if input_features is None:
-                input_features_i = [
-                    "x%d" % k for k in np.unique(self.inputs_per_library_[i, :])
-                ]
+                input_features_i = ["x%d" % k for k in inputs]
             else:
-                input_features_i = np.asarray(input_features)[
-                    np.unique(self.inputs_per_library_[i, :])
-                ].tolist()
-            lib_i_feat_names = lib_i.get_feature_names(input_features_i)
-            for j in range(i + 1, len(self.libraries_)):
-                lib_j = self.libraries_[j]
-                if input_features is None:
-                    input_features_j = [
-                        "x%d" % k for k in np.unique(self.inputs_per_library_[j, :])
-                    ]
-                else:
-                    input_features_j = np.asarray(input_features)[
-                        np.unique(self.inputs_per_library_[j, :])
-                    ].tolist()
-                lib_j_feat_names = lib_j.get_feature_names(input_features_j)
-                feature_names += self._name_combinations(
-                    lib_i_feat_names, lib_j_feat_names
-                )
+                input_features_i = np.asarray(input_features)[inputs].tolist()
+            lib_feat_names.append(lib.get_feature_names(input_features_i))
+
+        feature_names = list()
+        for i, j in combinations(range(len(self.libraries_)), 2):
+            feature_names += self._name_combinations(
+                lib_feat_names[i], lib_feat_names[j]
+            )
         return feature_names
 
+    def transform_derivative(self, x):
+        """Compute the derivatives of the tensored library features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_output_features, n_features)
+            The derivatives of each output feature with respect to each input.
+        """
+        check_is_fitted(self)
+        x = np.asarray(x)
+        n_samples, n_features = x.shape
+
+        features = []
+        derivatives = []
+        for lib, inputs in zip(self.libraries_, self._library_inputs_):
+            features.append(np.asarray(lib.transform(x[:, inputs])))
+            dxp = np.zeros((n_samples, lib.n_output_features_, n_features))
+            dxp[..., inputs] = lib.transform_derivative(x[:, inputs])
+            derivatives.append(dxp)
+
+        pairs = list(combinations(range(len(self.libraries_)), 2))
+        n_output_features = sum(
+            features[i].shape[1] * features[j].shape[1] for i, j in pairs
+        )
+        dxp_full = np.empty(
+            (n_samples, n_output_features, n_features),
+            dtype=np.result_type(*features, *derivatives),
+        )
+        start = 0
+        for i, j in pairs:
+            n_i = features[i].shape[1]
+            n_j = features[j].shape[1]
+            # product rule on every pair of terms, in the order of
+            # transform: lib_i index major, lib_j index minor
+            dxp = dxp_full[:, start : start + n_i * n_j].reshape(
+                n_samples, n_i, n_j, n_features
+            )
+            np.multiply(
+                derivatives[i][:, :, np.newaxis, :],
+                features[j][:, np.newaxis, :, np.newaxis],
+                out=dxp,
+            )
+            dxp += (
+                features[i][:, :, np.newaxis, np.newaxis]
+                * derivatives[j][:, np.newaxis, :, :]
+            )
+            start += n_i * n_j
+        return dxp_full
+
+    def transform_columns(self, x, columns):
+        """Compute only some of the tensored library features.
+
+        Only the features of each library that appear in a requested product
+        are computed.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        check_is_fitted(self)
+        x = np.asarray(x)
+
+        def product_columns(i, j, local_columns):
+            rows, cols = np.divmod(local_columns, self.libraries_[j].n_output_features_)
+            factors = []
+            for k, lib_columns in ((i, rows), (j, cols)):
+                unique, inverse = np.unique(lib_columns, return_inverse=True)
+                inputs = self._library_inputs_[k]
+                xp_k = self.libraries_[k].transform_columns(x[:, inputs], unique)
+                factors.append(np.asarray(xp_k)[:, inverse])
+            return factors[0] * factors[1]
+
+        blocks = [
+            (
+                self.libraries_[i].n_output_features_
+                * self.libraries_[j].n_output_features_,
+                partial(product_columns, i, j),
+            )
+            for i, j in combinations(range(len(self.libraries_)), 2)
+        ]
+        return _transform_blocks_columns(blocks, columns, x.shape[0])
+
     def calc_trajectory(self, diff_method, x, t):
         return self.libraries_[0].calc_trajectory(diff_method, x, t)
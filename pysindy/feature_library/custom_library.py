@@ -1,7 +1,9 @@
 from itertools import combinations
 from itertools import combinations_with_replacement as combinations_w_r
 
+from numpy import asarray
 from numpy import empty
+from numpy import flatnonzero
 from numpy import ones
 from numpy import shape
 from sklearn import __version__
@@ -9,6 +11,9 @@ from sklearn.utils.validation import check_is_fitted
 
 from ..utils import AxesArray
 from ..utils import comprehend_axes
+from .base import _evaluate_functions
+from .base import _function_arguments
+from .base import _function_feature_names
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 
@@ -56,6 +61,18 @@ class CustomLibrary(BaseFeatureLibrary):
         This is hard to do with just lambda functions, because if the system
         is not 1D, lambdas will generate duplicates.
 
+    vectorized : boolean, optional (default False)
+        If False, each library function is called once per combination of
+        inputs, with arguments of shape (n_samples,). If True, it is called
+        once for all the combinations (per block of samples, for large
+        inputs): its ith argument stacks the ith input of every combination,
+        with shape (n_samples, n_combinations), and it must return an array
+        of that shape. This suits functions applied elementwise, such as
+        NumPy ufuncs, and saves a Python call per combination. Vectorized
+        functions must be elementwise: the library then treats every sample
+        independently, so that fitted models only evaluate their active
+        features and many trajectories are transformed at once.
+
     Attributes
     ----------
     functions : list of functions
@@ -98,6 +115,7 @@ class CustomLibrary(BaseFeatureLibrary):
         library_ensemble=False,
         ensemble_indices=[0],
         include_bias=False,
+        vectorized=False,
     ):
         super(CustomLibrary, self).__init__(
             library_ensemble=library_ensemble, ensemble_indices=ensemble_indices
@@ -113,6 +131,12 @@ class CustomLibrary(BaseFeatureLibrary):
             )
         self.include_bias = include_bias
         self.interaction_only = interaction_only
+        self.vectorized = vectorized
+
+    @property
+    def _pointwise(self):
+        # Only vectorized functions are required to be elementwise
+        return self.vectorized
 
     @staticmethod
     def _combinations(n_features, n_args, interaction_only):
@@ -144,13 +168,9 @@ class CustomLibrary(BaseFeatureLibrary):
         feature_names = []
         if self.include_bias:
             feature_names.append("1")
-        for i, f in enumerate(self.functions):
-            for c in self._combinations(
-                n_input_features, f.__code__.co_argcount, self.interaction_only
-            ):
-                feature_names.append(
-                    self.function_names[i](*[input_features[j] for j in c])
-                )
+        feature_names += _function_feature_names(
+            self.function_names, self._function_arguments_, input_features
+        )
         return feature_names
 
     @x_sequence_or_item
@@ -171,12 +191,10 @@ class CustomLibrary(BaseFeatureLibrary):
             self.n_features_in_ = n_features
         else:
             self.n_input_features_ = n_features
-        n_output_features = 0
-        for f in self.functions:
-            n_args = f.__code__.co_argcount
-            n_output_features += len(
-                list(self._combinations(n_features, n_args, self.interaction_only))
-            )
+        self._function_arguments_ = _function_arguments(
+            self, self.functions, n_features
+        )
+        n_output_features = sum(len(calls) for calls in self._function_arguments_)
         if self.include_bias:
             n_output_features += 1
         self.n_output_features_ = n_output_features
@@ -219,19 +237,63 @@ class CustomLibrary(BaseFeatureLibrary):
                 raise ValueError("x shape does not match training shape")
 
             xp = empty((*x.shape[:-1], self.n_output_features_), dtype=x.dtype)
-            library_idx = 0
             if self.include_bias:
-                xp[..., library_idx] = ones(x.shape[:-1])
-                library_idx += 1
-            for f in self.functions:
-                for c in self._combinations(
-                    n_input_features, f.__code__.co_argcount, self.interaction_only
-                ):
-                    xp[..., library_idx] = f(*[x[..., j] for j in c])
-                    library_idx += 1
+                xp[..., 0] = ones(x.shape[:-1])
+            _evaluate_functions(
+                self.functions,
+                self._function_arguments_,
+                x,
+                xp[..., int(self.include_bias) :],
+                self.vectorized,
+            )
 
             xp = AxesArray(xp, comprehend_axes(xp))
             xp_full.append(xp)
         if self.library_ensemble:
             xp_full = self._ensemble(xp_full)
         return xp_full
+
+    def transform_columns(self, x, columns):
+        """Compute only some of the custom features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        check_is_fitted(self)
+        x = asarray(x)
+        if float(__version__[:3]) >= 1.0:
+            n_input_features = self.n_features_in_
+        else:
+            n_input_features = self.n_input_features_
+        if x.shape[-1] != n_input_features:
+            raise ValueError("x shape does not match training shape")
+
+        columns = asarray(columns, dtype=int)
+        xp = empty((x.shape[0], len(columns)), dtype=x.dtype)
+        start = 0
+        if self.include_bias:
+            xp[:, columns == 0] = 1
+            start = 1
+        for f, calls in zip(self.functions, self._function_arguments_):
+            # Evaluate the requested calls of each function together
+            positions = flatnonzero((columns >= start) & (columns < start + len(calls)))
+            if len(positions):
+                xp[:, positions] = _evaluate_functions(
+                    [f],
+                    [calls[columns[positions] - start]],
+                    x,
+                    empty((x.shape[0], len(positions)), dtype=x.dtype),
+                    self.vectorized,
+                )
+            start += len(calls)
+        return xp
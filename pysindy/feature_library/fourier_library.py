@@ -7,6 +7,10 @@ from ..utils import comprehend_axes
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 
+# Number of input values whose harmonics are computed together, so that the
+# recurrence runs on arrays that stay in cache
+_BLOCK_SIZE = 2**13
+
 
 class FourierLibrary(BaseFeatureLibrary):
     """
@@ -45,6 +49,24 @@ class FourierLibrary(BaseFeatureLibrary):
         is ``2 * n_input_features_ * n_frequencies`` if both sines and cosines
         are included. Otherwise it is ``n_input_features * n_frequencies``.
 
+    Notes
+    -----
+    ``transform`` evaluates :math:`\\sin(x)` and :math:`\\cos(x)` only, and
+    computes the higher harmonics with the angle-addition recurrence
+
+    .. math::
+
+        \\sin((k + 1) x) = \\sin(k x) \\cos(x) + \\cos(k x) \\sin(x) \\\\
+        \\cos((k + 1) x) = \\cos(k x) \\cos(x) - \\sin(k x) \\sin(x)
+
+    Each step is a rotation, so rounding errors grow linearly: the features
+    of frequency :math:`k` are within about :math:`2 k \\epsilon` of the exact
+    values, where :math:`\\epsilon` is the machine epsilon of the data type
+    (under :math:`5 \\cdot 10^{-15}` for ``n_frequencies=10`` in double
+    precision). Unlike evaluating :math:`\\sin(k x)` directly, whose error
+    grows with :math:`|k x|`, the bound does not depend on the magnitude of
+    the inputs.
+
     Examples
     --------
     >>> import numpy as np
@@ -59,6 +81,8 @@ class FourierLibrary(BaseFeatureLibrary):
     ['sin(1 x0)', 'cos(1 x0)', 'sin(2 x0)', 'cos(2 x0)']
     """
 
+    _pointwise = True
+
     def __init__(
         self,
         n_frequencies=1,
@@ -165,17 +189,119 @@ class FourierLibrary(BaseFeatureLibrary):
 
             shape[-1] = self.n_output_features_
             xp = np.empty(shape, dtype=x.dtype)
-            idx = 0
-            for i in range(self.n_frequencies):
-                for j in range(n_input_features):
-                    if self.include_sin:
-                        xp[..., idx] = np.sin((i + 1) * x[..., j])
-                        idx += 1
-                    if self.include_cos:
-                        xp[..., idx] = np.cos((i + 1) * x[..., j])
-                        idx += 1
+            self._harmonics(np.asarray(x), xp)
             xp = AxesArray(xp, comprehend_axes(xp))
             xp_full.append(xp)
         if self.library_ensemble:
             xp_full = self._ensemble(xp_full)
         return xp_full
+
+    def _harmonics(self, x, xp):
+        """
+        Fill xp with the features of x, computing the harmonics of every
+        input with the angle-addition recurrence, one block of samples at a
+        time.
+        """
+        n_features = x.shape[-1]
+        x = x.reshape(int(np.prod(x.shape[:-1])), n_features)
+        # Axes: sample, frequency, input, sin/cos
+        out = xp.reshape(
+            len(x), self.n_frequencies, n_features, self.include_sin + self.include_cos
+        )
+        n_rows = max(1, _BLOCK_SIZE // max(1, n_features))
+        for start in range(0, len(x), n_rows):
+            # Trajectories are often column-major; the recurrence runs on
+            # contiguous blocks
+            x_block = np.ascontiguousarray(x[start : start + n_rows])
+            out_block = out[start : start + n_rows]
+            sin_x = np.sin(x_block)
+            cos_x = np.cos(x_block)
+            sin_kx = sin_x.copy()
+            cos_kx = cos_x.copy()
+            next_sin = np.empty_like(sin_x)
+            next_cos = np.empty_like(cos_x)
+            product = np.empty_like(sin_x)
+            for k in range(self.n_frequencies):
+                if k > 0:
+                    np.multiply(sin_kx, cos_x, out=next_sin)
+                    next_sin += np.multiply(cos_kx, sin_x, out=product)
+                    np.multiply(cos_kx, cos_x, out=next_cos)
+                    next_cos -= np.multiply(sin_kx, sin_x, out=product)
+                    sin_kx, next_sin = next_sin, sin_kx
+                    cos_kx, next_cos = next_cos, cos_kx
+                if self.include_sin:
+                    out_block[:, k, :, 0] = sin_kx
+                if self.include_cos:
+                    out_block[:, k, :, -1] = cos_kx
+
+    def transform_columns(self, x, columns):
+        """Compute only some of the Fourier features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        check_is_fitted(self)
+        x = np.asarray(x)
+        if float(__version__[:3]) >= 1.0:
+            n_input_features = self.n_features_in_
+        else:
+            n_input_features = self.n_input_features_
+        if x.shape[-1] != n_input_features:
+            raise ValueError("x shape does not match training shape")
+
+        # Features are ordered by frequency, then input, then sin before cos
+        functions = [np.sin] * self.include_sin + [np.cos] * self.include_cos
+        columns = np.asarray(columns, dtype=int)
+        frequency, column = np.divmod(columns, n_input_features * len(functions))
+        inputs, function = np.divmod(column, len(functions))
+        xp = np.empty((x.shape[0], len(columns)), dtype=x.dtype)
+        for k in range(len(columns)):
+            xp[:, k] = functions[function[k]]((frequency[k] + 1) * x[:, inputs[k]])
+        return xp
+
+    def transform_derivative(self, x):
+        """Compute the derivatives of the Fourier features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_output_features, n_features)
+            ``dxp[k, i, j]`` is the derivative of the ith Fourier feature with
+            respect to the jth input feature, evaluated at the kth sample.
+        """
+        check_is_fitted(self)
+        x = np.asarray(x)
+        if float(__version__[:3]) >= 1.0:
+            n_input_features = self.n_features_in_
+        else:
+            n_input_features = self.n_input_features_
+        if x.shape[-1] != n_input_features:
+            raise ValueError("x shape does not match training shape")
+
+        dxp = np.zeros(
+            (x.shape[0], self.n_output_features_, n_input_features), dtype=x.dtype
+        )
+        idx = 0
+        for i in range(self.n_frequencies):
+            for j in range(n_input_features):
+                if self.include_sin:
+                    dxp[:, idx, j] = (i + 1) * np.cos((i + 1) * x[:, j])
+                    idx += 1
+                if self.include_cos:
+                    dxp[:, idx, j] = -(i + 1) * np.sin((i + 1) * x[:, j])
+                    idx += 1
+        return dxp
@@ -1,8 +1,12 @@
+from functools import partial
+
 import numpy as np
 from sklearn import __version__
 from sklearn.utils.validation import check_is_fitted
 
 from ..utils import AxesArray
+from ..utils.profiling import profile_stage
+from .base import _transform_blocks_columns
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 from .weak_pde_library import WeakPDELibrary
@@ -162,6 +166,10 @@ class GeneralizedLibrary(BaseFeatureLibrary):
         self.libraries_full_ = self.libraries_
         self.exclude_libs_ = exclude_libraries
 
+    @property
+    def _pointwise(self):
+        return all(lib._pointwise for lib in self.libraries_)
+
     @x_sequence_or_item
     def fit(self, x_full, y=None):
         """
@@ -263,13 +271,12 @@ class GeneralizedLibrary(BaseFeatureLibrary):
             for i, lib in enumerate(self.libraries_full_):
                 if i < self.inputs_per_library_.shape[0]:
                     if i not in self.exclude_libs_:
-                        xps.append(
-                            lib.transform(
-                                [x[..., np.unique(self.inputs_per_library_[i, :])]]
-                            )[0]
-                        )
+                        inputs = np.unique(self.inputs_per_library_[i, :])
+                        with profile_stage(f"{type(lib).__name__}[{i}]"):
+                            xps.append(lib.transform([x[..., inputs]])[0])
                 else:
-                    xps.append(lib.transform([x])[0])
+                    with profile_stage(f"{type(lib).__name__}[{i}]"):
+                        xps.append(lib.transform([x])[0])
 
             xp = AxesArray(np.concatenate(xps, axis=xps[0].ax_coord), xps[0].__dict__)
             xp_full = xp_full + [xp]
@@ -314,6 +321,71 @@ class GeneralizedLibrary(BaseFeatureLibrary):
                 feature_names += lib.get_feature_names(input_features_i)
         return feature_names
 
+    def transform_derivative(self, x):
+        """Compute the derivatives of the generalized library features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_output_features, n_features)
+            The derivatives of each output feature with respect to each input.
+        """
+        check_is_fitted(self, attributes=["n_features_in_"])
+        x = np.asarray(x)
+        n_samples, n_features = x.shape
+
+        dxps = []
+        for i, lib in enumerate(self.libraries_full_):
+            if i < self.inputs_per_library_.shape[0]:
+                if i not in self.exclude_libs_:
+                    inputs = np.unique(self.inputs_per_library_[i, :])
+                    dxp = np.zeros((n_samples, lib.n_output_features_, n_features))
+                    dxp[..., inputs] = lib.transform_derivative(x[:, inputs])
+                    dxps.append(dxp)
+            else:
+                dxps.append(lib.transform_derivative(x))
+        return np.concatenate(dxps, axis=1)
+
+    def transform_columns(self, x, columns):
+        """Compute only some of the generalized library features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        check_is_fitted(self, attributes=["n_features_in_"])
+        x = np.asarray(x)
+
+        blocks = []
+        for i, lib in enumerate(self.libraries_full_):
+            if i < self.inputs_per_library_.shape[0]:
+                if i not in self.exclude_libs_:
+                    inputs = np.unique(self.inputs_per_library_[i, :])
+                    blocks.append(
+                        (
+                            lib.n_output_features_,
+                            partial(lib.transform_columns, x[:, inputs]),
+                        )
+                    )
+            else:
+                blocks.append(
+                    (lib.n_output_features_, partial(lib.transform_columns, x))
+                )
+        return _transform_blocks_columns(blocks, columns, x.shape[0])
+
     def calc_trajectory(self, diff_method, x, t):
         return self.libraries_[0].calc_trajectory(diff_method, x, t)
 
@@ -1,3 +1,4 @@
+import numpy as np
 from sklearn import __version__
 from sklearn.utils.validation import check_is_fitted
 
@@ -42,6 +43,8 @@ class IdentityLibrary(BaseFeatureLibrary):
     ['x0', 'x1']
     """
 
+    _pointwise = True
+
     def __init__(
         self,
         library_ensemble=False,
@@ -130,3 +133,50 @@ class IdentityLibrary(BaseFeatureLibrary):
         if self.library_ensemble:
             xp_full = self._ensemble(xp_full)
         return xp_full
+
+    def transform_columns(self, x, columns):
+        """Select some of the input features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        check_is_fitted(self)
+        x = np.asarray(x)
+        if float(__version__[:3]) >= 1.0:
+            n_input_features = self.n_features_in_
+        else:
+            n_input_features = self.n_input_features_
+        if x.shape[-1] != n_input_features:
+            raise ValueError("x shape does not match training shape")
+        return x[:, np.asarray(columns, dtype=int)]
+
+    def transform_derivative(self, x):
+        """Compute the derivatives of the identity features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_features, n_features)
+            Identity matrices, one per sample.
+        """
+        check_is_fitted(self)
+        x = np.asarray(x)
+        if x.shape[-1] != self.n_output_features_:
+            raise ValueError("x shape does not match training shape")
+        return np.broadcast_to(
+            np.eye(self.n_output_features_), (x.shape[0], *(2 * x.shape[-1:]))
+        ).copy()
@@ -9,6 +9,9 @@ from sklearn.utils.validation import check_is_fitted
 
 from ..utils import AxesArray
 from ..utils import comprehend_axes
+from .base import _evaluate_functions
+from .base import _function_arguments
+from .base import _function_feature_names
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 from pysindy.differentiation import FiniteDifference
@@ -86,6 +89,13 @@ class PDELibrary(BaseFeatureLibrary):
      diff_kwargs: dictionary,  (default {})
         Keyword options to supply to differtiantion_method.
 
+    vectorized : boolean, optional (default False)
+        Whether to call each library function once for all combinations of
+        inputs, with arguments of shape (*x.shape[:-1], n_combinations)
+        stacking the inputs of every combination, rather than once per
+        combination. Large grids are passed in slices along their first
+        axis. Use it for functions applied elementwise.
+
     Attributes
     ----------
     functions : list of functions
@@ -129,6 +139,7 @@ class PDELibrary(BaseFeatureLibrary):
         diff_kwargs={},
         is_uniform=None,
         periodic=None,
+        vectorized=False,
     ):
         super(PDELibrary, self).__init__(
             library_ensemble=library_ensemble, ensemble_indices=ensemble_indices
@@ -143,6 +154,7 @@ class PDELibrary(BaseFeatureLibrary):
         self.num_trajectories = 1
         self.differentiation_method = differentiation_method
         self.diff_kwargs = diff_kwargs
+        self.vectorized = vectorized
 
         if function_names and (len(library_functions) != len(function_names)):
             raise ValueError(
@@ -282,13 +294,10 @@ class PDELibrary(BaseFeatureLibrary):
             feature_names.append("1")
 
         # Include any non-derivative terms
-        for i, f in enumerate(self.functions):
-            for c in self._combinations(
-                n_features, f.__code__.co_argcount, self.interaction_only
-            ):
-                feature_names.append(
-                    self.function_names[i](*[input_features[j] for j in c])
-                )
+        function_feature_names = _function_feature_names(
+            self.function_names, self._function_arguments_, input_features
+        )
+        feature_names += function_feature_names
 
         def derivative_string(multiindex):
             ret = ""
@@ -316,19 +325,14 @@ class PDELibrary(BaseFeatureLibrary):
         # Include mixed non-derivative + derivative terms
         if self.include_interaction:
             for k in range(self.num_derivatives):
-                for i, f in enumerate(self.functions):
-                    for c in self._combinations(
-                        n_features,
-                        f.__code__.co_argcount,
-                        self.interaction_only,
-                    ):
-                        for jj in range(n_features):
-                            feature_names.append(
-                                self.function_names[i](*[input_features[j] for j in c])
-                                + input_features[jj]
-                                + "_"
-                                + derivative_string(self.multiindices[k])
-                            )
+                for function_name in function_feature_names:
+                    for jj in range(n_features):
+                        feature_names.append(
+                            function_name
+                            + input_features[jj]
+                            + "_"
+                            + derivative_string(self.multiindices[k])
+                        )
         return feature_names
 
     @x_sequence_or_item
@@ -351,14 +355,11 @@ class PDELibrary(BaseFeatureLibrary):
         else:
             self.n_input_features_ = n_features
 
-        n_output_features = 0
         # Count the number of non-derivative terms
-        n_output_features = 0
-        for f in self.functions:
-            n_args = f.__code__.co_argcount
-            n_output_features += len(
-                list(self._combinations(n_features, n_args, self.interaction_only))
-            )
+        self._function_arguments_ = _function_arguments(
+            self, self.functions, n_features
+        )
+        n_output_features = sum(len(calls) for calls in self._function_arguments_)
 
         # Add the mixed derivative library_terms
         if self.include_interaction:
@@ -433,22 +434,15 @@ class PDELibrary(BaseFeatureLibrary):
                 library_idx += n_features
 
             # library function terms
-            n_library_terms = 0
-            for f in self.functions:
-                for c in self._combinations(
-                    n_features, f.__code__.co_argcount, self.interaction_only
-                ):
-                    n_library_terms += 1
-
+            n_library_terms = sum(len(calls) for calls in self._function_arguments_)
             shape[-1] = n_library_terms
-            library_functions = np.empty(shape, dtype=x.dtype)
-            library_idx = 0
-            for f in self.functions:
-                for c in self._combinations(
-                    n_features, f.__code__.co_argcount, self.interaction_only
-                ):
-                    library_functions[..., library_idx] = f(*[x[..., j] for j in c])
-                    library_idx += 1
+            library_functions = _evaluate_functions(
+                self.functions,
+                self._function_arguments_,
+                x,
+                np.empty(shape, dtype=x.dtype),
+                self.vectorized,
+            )
 
             library_idx = 0
 
@@ -15,6 +15,10 @@ from ..utils import wrap_axes
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 
+# Number of entries of the output to compute in one pass over the degrees,
+# so that the parent monomials read for the next degree are still in cache
+_BLOCK_SIZE = 2**16
+
 
 class PolynomialLibrary(PolynomialFeatures, BaseFeatureLibrary):
     """Generate polynomial and interaction features.
@@ -67,6 +71,8 @@ class PolynomialLibrary(PolynomialFeatures, BaseFeatureLibrary):
         iterating over all appropriately sized combinations of input features.
     """
 
+    _pointwise = True
+
     def __init__(
         self,
         degree=2,
@@ -124,18 +130,7 @@ class PolynomialLibrary(PolynomialFeatures, BaseFeatureLibrary):
     @property
     def powers_(self):
         check_is_fitted(self)
-        if float(__version__[:3]) >= 1.0:
-            n_features = self.n_features_in_
-        else:
-            n_features = self.n_input_features_
-        combinations = self._combinations(
-            n_features,
-            self.degree,
-            self.include_interaction,
-            self.interaction_only,
-            self.include_bias,
-        )
-        return np.vstack([np.bincount(c, minlength=n_features) for c in combinations])
+        return self._powers_
 
     def get_feature_names(self, input_features=None):
         """Return feature names for output features.
@@ -194,7 +189,14 @@ class PolynomialLibrary(PolynomialFeatures, BaseFeatureLibrary):
             self.n_features_in_ = n_features
         else:
             self.n_input_features_ = n_features
-        self.n_output_features_ = sum(1 for _ in combinations)
+        combinations = list(combinations)
+        (
+            self._monomial_parents_,
+            self._monomial_factors_,
+            self._degree_bounds_,
+        ) = _monomial_tables(combinations)
+        self._powers_ = _powers(combinations, n_features)
+        self.n_output_features_ = len(combinations)
         return self
 
     @x_sequence_or_item
@@ -266,16 +268,9 @@ class PolynomialLibrary(PolynomialFeatures, BaseFeatureLibrary):
             elif sparse.isspmatrix_csc(x) and self.degree < 4:
                 return sparse.csc_matrix(self.transform(x.tocsr()))
             else:
-                combinations = self._combinations(
-                    n_features,
-                    self.degree,
-                    self.include_interaction,
-                    self.interaction_only,
-                    self.include_bias,
-                )
                 if sparse.isspmatrix(x):
                     columns = []
-                    for comb in combinations:
+                    for comb in _powers_combinations(self._powers_):
                         if comb:
                             out_col = 1
                             for col_idx in comb:
@@ -294,9 +289,162 @@ class PolynomialLibrary(PolynomialFeatures, BaseFeatureLibrary):
                         ),
                         x.__dict__,
                     )
-                    for i, comb in enumerate(combinations):
-                        xp[..., i] = x[..., comb].prod(-1)
+                    self._evaluate_monomials(np.asarray(x), np.asarray(xp))
             xp_full = xp_full + [xp]
         if self.library_ensemble:
             xp_full = self._ensemble(xp_full)
         return xp_full
+
+    def _evaluate_monomials(self, x, xp):
+        """
+        Fill xp with the monomials of x, degree by degree: every monomial of
+        degree two or more is a monomial of one degree less times one input.
+        Blocks of samples are computed with the monomials along the first
+        axis, so that every degree takes three calls on contiguous rows.
+        """
+        parents = self._monomial_parents_
+        factors = self._monomial_factors_
+        bounds = self._degree_bounds_
+        x = x.reshape(-1, x.shape[-1])
+        out = xp.reshape(x.shape[0], xp.shape[-1])
+        copy_back = not np.may_share_memory(out, xp)
+        if copy_back:
+            # F-ordered output with more than two axes
+            out = np.empty(out.shape, dtype=xp.dtype)
+        n_rows = min(4096, max(16, _BLOCK_SIZE // max(1, out.shape[1])))
+        block = np.empty((out.shape[1], n_rows), dtype=out.dtype)
+        for start in range(0, x.shape[0], n_rows):
+            x_block = np.ascontiguousarray(x[start : start + n_rows].T)
+            out_block = block[:, : x_block.shape[1]]
+            for degree in range(len(bounds) - 1):
+                lo, hi = bounds[degree], bounds[degree + 1]
+                if lo == hi:
+                    continue
+                if degree == 0:
+                    out_block[lo:hi] = 1
+                elif degree == 1:
+                    out_block[lo:hi] = x_block[factors[lo:hi]]
+                else:
+                    np.multiply(
+                        out_block[parents[lo:hi]],
+                        x_block[factors[lo:hi]],
+                        out=out_block[lo:hi],
+                    )
+            out[start : start + n_rows] = out_block.T
+        if copy_back:
+            xp[...] = out.reshape(xp.shape)
+
+    def transform_columns(self, x, columns):
+        """Compute only some of the polynomial features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The data to transform, row by row.
+
+        columns : array-like of int
+            Indices of the output features to compute.
+
+        Returns
+        -------
+        xp : np.ndarray, shape (n_samples, len(columns))
+            The requested features, in the order of ``columns``.
+        """
+        check_is_fitted(self)
+        if sparse.issparse(x):
+            return super().transform_columns(x, columns)
+        x = np.asarray(x)
+        powers = self.powers_
+        if x.shape[-1] != powers.shape[1]:
+            raise ValueError("x shape does not match training shape")
+        columns = np.asarray(columns, dtype=int)
+        xp = np.empty((x.shape[0], len(columns)), dtype=x.dtype)
+        for k, comb in enumerate(_powers_combinations(powers[columns])):
+            xp[:, k] = x[:, comb].prod(-1)
+        return xp
+
+    def transform_derivative(self, x):
+        """Compute the derivatives of the polynomial features.
+
+        Parameters
+        ----------
+        x : array-like, shape (n_samples, n_features)
+            The points at which to evaluate the derivatives.
+
+        Returns
+        -------
+        dxp : np.ndarray, shape (n_samples, n_output_features, n_features)
+            ``dxp[k, i, j]`` is the derivative of the ith polynomial feature with
+            respect to the jth input feature, evaluated at the kth sample.
+        """
+        check_is_fitted(self)
+        if sparse.issparse(x):
+            raise TypeError("Derivatives are only available for dense input")
+        x = np.asarray(x)
+        powers = self.powers_
+        if x.shape[-1] != powers.shape[1]:
+            raise ValueError("x shape does not match training shape")
+
+        dxp = np.zeros((x.shape[0], *powers.shape), dtype=x.dtype)
+        for j in range(powers.shape[1]):
+            rows = np.flatnonzero(powers[:, j])
+            if len(rows) == 0:
+                continue
+            lowered = powers[rows].copy()
+            lowered[:, j] -= 1
+            dxp[:, rows, j] = powers[rows, j] * np.prod(
+                x[:, np.newaxis, :] ** lowered, axis=-1
+            )
+        return dxp
+
+
+def _monomial_tables(combinations):
+    """
+    Index tables to compute the monomials of a polynomial library degree by
+    degree.
+
+    Parameters
+    ----------
+    combinations : list of tuple of int
+        The inputs multiplied together in each monomial, sorted by degree.
+
+    Returns
+    -------
+    parents : np.ndarray of int, shape (n_output_features,)
+        Monomial ``i`` is monomial ``parents[i]`` times input ``factors[i]``;
+        -1 for monomials of degree zero and one.
+
+    factors : np.ndarray of int, shape (n_output_features,)
+        The input multiplying the parent monomial; -1 for the constant.
+
+    bounds : np.ndarray of int, shape (degree + 2,)
+        The monomials of degree ``k`` are ``bounds[k]:bounds[k + 1]``.
+    """
+    index = {comb: i for i, comb in enumerate(combinations)}
+    parents = np.array(
+        [index[comb[:-1]] if len(comb) > 1 else -1 for comb in combinations],
+        dtype=np.intp,
+    )
+    factors = np.array(
+        [comb[-1] if comb else -1 for comb in combinations], dtype=np.intp
+    )
+    degrees = np.array([len(comb) for comb in combinations], dtype=np.intp)
+    max_degree = degrees[-1] if len(degrees) else -1
+    bounds = np.searchsorted(degrees, np.arange(max_degree + 2))
+    return parents, factors, bounds
+
+
+def _powers(combinations, n_features):
+    """Exponents of the inputs in each monomial, read-only."""
+    powers = np.zeros((len(combinations), n_features), dtype=int)
+    rows = np.repeat(np.arange(len(combinations)), [len(c) for c in combinations])
+    inputs = np.fromiter(chain.from_iterable(combinations), dtype=np.intp)
+    np.add.at(powers, (rows, inputs), 1)
+    powers.flags.writeable = False
+    return powers
+
+
+def _powers_combinations(powers):
+    """The inputs multiplied together in each monomial, from its exponents."""
+    inputs = np.arange(powers.shape[1])
+    return [np.repeat(inputs, row).tolist() for row in powers]
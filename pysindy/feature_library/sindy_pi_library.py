@@ -10,6 +10,9 @@ from sklearn import __version__
 from sklearn.utils.validation import check_is_fitted
 
 from ..utils import AxesArray
+from .base import _evaluate_functions
+from .base import _function_arguments
+from .base import _function_feature_names
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 from pysindy.differentiation import FiniteDifference
@@ -80,6 +83,12 @@ class SINDyPILibrary(BaseFeatureLibrary):
     ensemble_indices : integer array, optional (default [0])
         The indices to use for ensembling the library.
 
+    vectorized : boolean, optional (default False)
+        If True, each function of x or x_dot is called once, with arguments
+        of shape (n_samples, n_combinations) holding the inputs of all its
+        combinations, instead of once per combination. The functions must
+        then be applied elementwise.
+
     Attributes
     ----------
     functions : list of functions
@@ -150,6 +159,7 @@ class SINDyPILibrary(BaseFeatureLibrary):
         include_bias=False,
         library_ensemble=False,
         ensemble_indices=[0],
+        vectorized=False,
     ):
         super(SINDyPILibrary, self).__init__(
             library_ensemble=library_ensemble, ensemble_indices=ensemble_indices
@@ -188,6 +198,7 @@ class SINDyPILibrary(BaseFeatureLibrary):
         self.interaction_only = interaction_only
         self.t = t
         self.include_bias = include_bias
+        self.vectorized = vectorized
 
     @staticmethod
     def _combinations(n_features, n_args, interaction_only):
@@ -226,53 +237,28 @@ class SINDyPILibrary(BaseFeatureLibrary):
             feature_names.append("1")
 
         # Put in normal library for x
+        x_names = []
         if self.x_functions is not None:
-            funcs = self.x_functions
-            for i, f in enumerate(funcs):
-                for c in self._combinations(
-                    n_input_features,
-                    f.__code__.co_argcount,
-                    self.interaction_only,
-                ):
-                    feature_names.append(
-                        self.function_names[i](*[input_features[j] for j in c])
-                    )
+            x_names = _function_feature_names(
+                self.function_names, self._x_function_arguments_, input_features
+            )
+            feature_names += x_names
 
         # Put in normal library for x_dot
+        x_dot_names = []
         if self.x_dot_functions is not None:
-            funcs = self.x_dot_functions
-            for i, f in enumerate(funcs):
-                for c in self._combinations(
-                    n_input_features,
-                    f.__code__.co_argcount,
-                    self.interaction_only,
-                ):
-                    feature_names.append(
-                        self.function_names[-1 - i](*[x_dot_features[j] for j in c])
-                    )
+            x_dot_names = _function_feature_names(
+                [self.function_names[-1 - i] for i in range(len(self.x_dot_functions))],
+                self._x_dot_function_arguments_,
+                x_dot_features,
+            )
+            feature_names += x_dot_names
 
         # Put in all the mixed terms
         if self.x_dot_functions is not None and self.x_functions is not None:
-            for k, f_dot in enumerate(self.x_dot_functions):
-                for f_dot_combs in self._combinations(
-                    n_input_features,
-                    f_dot.__code__.co_argcount,
-                    self.interaction_only,
-                ):
-                    for i, f in enumerate(self.x_functions):
-                        for f_combs in self._combinations(
-                            n_input_features,
-                            f.__code__.co_argcount,
-                            self.interaction_only,
-                        ):
-                            feature_names.append(
-                                self.function_names[i](
-                                    *[input_features[comb] for comb in f_combs]
-                                )
-                                + self.function_names[-1 - k](
-                                    *[x_dot_features[comb] for comb in f_dot_combs]
-                                )
-                            )
+            feature_names += [
+                x_name + x_dot_name for x_dot_name in x_dot_names for x_name in x_names
+            ]
 
         return feature_names
 
@@ -295,30 +281,28 @@ class SINDyPILibrary(BaseFeatureLibrary):
             self.n_features_in_ = n_features
         else:
             self.n_input_features_ = n_features
-        n_x_output_features = 0
-        n_x_dot_output_features = 0
 
         # Put in normal x library
+        self._x_function_arguments_ = []
         if self.x_functions is not None:
-            funcs = self.x_functions
-            for f in funcs:
-                n_args = f.__code__.co_argcount
-                n_x_output_features += len(
-                    list(self._combinations(n_features, n_args, self.interaction_only))
-                )
-            self.n_output_features_ = n_x_output_features
+            self._x_function_arguments_ = _function_arguments(
+                self, self.x_functions, n_features
+            )
+        n_x_output_features = sum(len(c) for c in self._x_function_arguments_)
 
         # Put in normal x_dot library
+        self._x_dot_function_arguments_ = []
         if self.x_dot_functions is not None:
-            funcs = self.x_dot_functions
-            for f in funcs:
-                n_args = f.__code__.co_argcount
-                n_x_dot_output_features += len(
-                    list(self._combinations(n_features, n_args, self.interaction_only))
-                )
-            self.n_output_features_ += n_x_dot_output_features
-            if n_x_output_features != 0:
-                self.n_output_features_ += n_x_output_features * n_x_dot_output_features
+            self._x_dot_function_arguments_ = _function_arguments(
+                self, self.x_dot_functions, n_features
+            )
+        n_x_dot_output_features = sum(len(c) for c in self._x_dot_function_arguments_)
+
+        self.n_output_features_ = (
+            n_x_output_features
+            + n_x_dot_output_features
+            + n_x_output_features * n_x_dot_output_features
+        )
 
         if self.function_names is None:
             self.function_names = list(
@@ -388,46 +372,36 @@ class SINDyPILibrary(BaseFeatureLibrary):
                 library_idx += 1
 
             # Put in normal x library
+            n_x = sum(len(c) for c in self._x_function_arguments_)
+            x_library = xp[:, library_idx : library_idx + n_x]
             if self.x_functions is not None:
-                for i, f in enumerate(self.x_functions):
-                    for c in self._combinations(
-                        n_input_features,
-                        f.__code__.co_argcount,
-                        self.interaction_only,
-                    ):
-                        xp[:, library_idx] = f(*[x[:, j] for j in c])
-                        library_idx += 1
+                _evaluate_functions(
+                    self.x_functions,
+                    self._x_function_arguments_,
+                    x,
+                    x_library,
+                    self.vectorized,
+                )
+            library_idx += n_x
 
             # Put in normal x_dot library
+            n_x_dot = sum(len(c) for c in self._x_dot_function_arguments_)
+            x_dot_library = xp[:, library_idx : library_idx + n_x_dot]
             if self.x_dot_functions is not None:
-                for i, f in enumerate(self.x_dot_functions):
-                    for c in self._combinations(
-                        n_input_features,
-                        f.__code__.co_argcount,
-                        self.interaction_only,
-                    ):
-                        xp[:, library_idx] = f(*[x_dot[:, j] for j in c])
-                        library_idx += 1
+                _evaluate_functions(
+                    self.x_dot_functions,
+                    self._x_dot_function_arguments_,
+                    x_dot,
+                    x_dot_library,
+                    self.vectorized,
+                )
+            library_idx += n_x_dot
 
             # Put in mixed x, x_dot terms
             if self.x_dot_functions is not None and self.x_functions is not None:
-                for k, f_dot in enumerate(self.x_dot_functions):
-                    for f_dot_combs in self._combinations(
-                        n_input_features,
-                        f_dot.__code__.co_argcount,
-                        self.interaction_only,
-                    ):
-
-                        for i, f in enumerate(self.x_functions):
-                            for f_combs in self._combinations(
-                                n_input_features,
-                                f.__code__.co_argcount,
-                                self.interaction_only,
-                            ):
-                                xp[:, library_idx] = f(
-                                    *[x[:, comb] for comb in f_combs]
-                                ) * f_dot(*[x_dot[:, comb] for comb in f_dot_combs])
-                                library_idx += 1
+                xp[:, library_idx:] = (
+                    x_dot_library[:, :, None] * x_library[:, None, :]
+                ).reshape(n_samples, -1)
             xp_full = xp_full + [AxesArray(xp, x.__dict__)]
         if self.library_ensemble:
             xp_full = self._ensemble(xp_full)
@@ -10,6 +10,9 @@ from sklearn import __version__
 from sklearn.utils.validation import check_is_fitted
 
 from ..utils import AxesArray
+from .base import _evaluate_functions
+from .base import _function_arguments
+from .base import _function_feature_names
 from .base import BaseFeatureLibrary
 from .base import x_sequence_or_item
 from pysindy.differentiation import FiniteDifference
@@ -126,6 +129,12 @@ class WeakPDELibrary(BaseFeatureLibrary):
      diff_kwargs: dictionary,  (default {})
         Keyword options to supply to differtiantion_method.
 
+    vectorized : boolean, optional (default False)
+        Whether to evaluate all combinations of inputs of a library function
+        in one call, with arguments of shape (*x.shape[:-1], n_combinations)
+        that stack the inputs of every combination (large grids are passed
+        in slices along their first axis). Use it for functions applied
+        elementwise. By default the function is called once per combination.
 
     Attributes
     ----------
@@ -182,6 +191,7 @@ class WeakPDELibrary(BaseFeatureLibrary):
         diff_kwargs={},
         is_uniform=None,
         periodic=None,
+        vectorized=False,
     ):
         super(WeakPDELibrary, self).__init__(
             library_ensemble=library_ensemble, ensemble_indices=ensemble_indices
@@ -199,6 +209,7 @@ class WeakPDELibrary(BaseFeatureLibrary):
         self.num_trajectories = 1
         self.differentiation_method = differentiation_method
         self.diff_kwargs = diff_kwargs
+        self.vectorized = vectorized
 
         if function_names and (len(library_functions) != len(function_names)):
             raise ValueError(
@@ -672,7 +683,7 @@ class WeakPDELibrary(BaseFeatureLibrary):
         """
         K = self.K
         gdim = self.grid_ndim
-        u_dot_integral = np.zeros((K, u.shape[-1]))
+        u_dot_integral = np.zeros((K, u.shape[-1]), dtype=u.dtype)
         deriv_orders = np.zeros(gdim)
         deriv_orders[-1] = 1
 
@@ -728,13 +739,10 @@ class WeakPDELibrary(BaseFeatureLibrary):
             feature_names.append("1")
 
         # Include any non-derivative terms
-        for i, f in enumerate(self.functions):
-            for c in self._combinations(
-                n_features, f.__code__.co_argcount, self.interaction_only
-            ):
-                feature_names.append(
-                    self.function_names[i](*[input_features[j] for j in c])
-                )
+        function_feature_names = _function_feature_names(
+            self.function_names, self._function_arguments_, input_features
+        )
+        feature_names += function_feature_names
 
         if self.grid_ndim != 0:
 
@@ -762,21 +770,14 @@ class WeakPDELibrary(BaseFeatureLibrary):
             # Include mixed non-derivative + integral terms
             if self.include_interaction:
                 for k in range(self.num_derivatives):
-                    for i, f in enumerate(self.functions):
-                        for c in self._combinations(
-                            n_features,
-                            f.__code__.co_argcount,
-                            self.interaction_only,
-                        ):
-                            for jj in range(n_features):
-                                feature_names.append(
-                                    self.function_names[i](
-                                        *[input_features[j] for j in c]
-                                    )
-                                    + input_features[jj]
-                                    + "_"
-                                    + derivative_string(self.multiindices[k])
-                                )
+                    for function_name in function_feature_names:
+                        for jj in range(n_features):
+                            feature_names.append(
+                                function_name
+                                + input_features[jj]
+                                + "_"
+                                + derivative_string(self.multiindices[k])
+                            )
         return feature_names
 
     @x_sequence_or_item
@@ -798,14 +799,11 @@ class WeakPDELibrary(BaseFeatureLibrary):
         else:
             self.n_input_features_ = n_features
 
-        n_output_features = 0
-
         # Count the number of non-derivative terms
-        for f in self.functions:
-            n_args = f.__code__.co_argcount
-            n_output_features += len(
-                list(self._combinations(n_features, n_args, self.interaction_only))
-            )
+        self._function_arguments_ = _function_arguments(
+            self, self.functions, n_features
+        )
+        n_output_features = sum(len(calls) for calls in self._function_arguments_)
 
         if self.grid_ndim != 0:
             # Add the mixed derivative library_terms
@@ -851,26 +849,21 @@ class WeakPDELibrary(BaseFeatureLibrary):
             xp = np.empty((self.K, self.n_output_features_), dtype=x.dtype)
 
             # Extract the input features on indices in each domain cell
-            self.x_k = [x[np.ix_(*self.inds_k[k])] for k in range(self.K)]
+            # Locals keep transform thread-safe; attributes hold the last result
+            self.x_k = x_k = [x[np.ix_(*self.inds_k[k])] for k in range(self.K)]
 
             # library function terms
-            n_library_terms = 0
-            for f in self.functions:
-                for c in self._combinations(
-                    n_features, f.__code__.co_argcount, self.interaction_only
-                ):
-                    n_library_terms += 1
+            n_library_terms = sum(len(calls) for calls in self._function_arguments_)
             library_functions = np.empty((self.K, n_library_terms), dtype=x.dtype)
 
             # Evaluate the functions on the indices of domain cells
-            funcs = np.zeros((*x.shape[:-1], n_library_terms))
-            func_idx = 0
-            for f in self.functions:
-                for c in self._combinations(
-                    n_features, f.__code__.co_argcount, self.interaction_only
-                ):
-                    funcs[..., func_idx] = f(*[x[..., j] for j in c])
-                    func_idx += 1
+            funcs = _evaluate_functions(
+                self.functions,
+                self._function_arguments_,
+                x,
+                np.empty((*x.shape[:-1], n_library_terms), dtype=x.dtype),
+                self.vectorized,
+            )
 
             # library function terms
             for k in range(self.K):  # loop over domain cells
@@ -901,7 +894,7 @@ class WeakPDELibrary(BaseFeatureLibrary):
                             -1
                         ) ** (np.sum(self.multiindices[j])) * np.tensordot(
                             self.fullweights1[k][j],
-                            self.x_k[k],
+                            x_k[k],
                             axes=(
                                 tuple(np.arange(self.grid_ndim)),
                                 tuple(np.arange(self.grid_ndim)),
@@ -926,16 +919,15 @@ class WeakPDELibrary(BaseFeatureLibrary):
 
                     # Calculate the necessary function and feature derivatives
                     funcs_derivs = np.zeros(
-                        np.concatenate([[self.num_derivatives + 1], funcs.shape])
+                        np.concatenate([[self.num_derivatives + 1], funcs.shape]),
+                        dtype=x.dtype,
                     )
                     x_derivs = np.zeros(
-                        np.concatenate([[self.num_derivatives + 1], x.shape])
+                        np.concatenate([[self.num_derivatives + 1], x.shape]),
+                        dtype=x.dtype,
                     )
                     funcs_derivs[0] = funcs
                     x_derivs[0] = x
-                    self.dx_k_j = []
-                    self.dfx_k_j = []
-
                     for j in range(self.num_derivatives):
                         for axis in range(self.ind_range):
                             s = [0] * (self.grid_ndim + 1)
@@ -962,14 +954,14 @@ class WeakPDELibrary(BaseFeatureLibrary):
                                 )._differentiate(x, self.spatiotemporal_grid[tuple(s)])
 
                     # Extract the function and feature derivatives on the domains
-                    self.dx_k_j = [
+                    self.dx_k_j = dx_k_j = [
                         [
                             x_derivs[j][np.ix_(*self.inds_k[k])]
                             for j in range(self.num_derivatives + 1)
                         ]
                         for k in range(self.K)
                     ]
-                    self.dfx_k_j = [
+                    self.dfx_k_j = dfx_k_j = [
                         [
                             funcs_derivs[j][np.ix_(*self.inds_k[k])]
                             for j in range(self.num_derivatives + 1)
@@ -980,7 +972,9 @@ class WeakPDELibrary(BaseFeatureLibrary):
                     # Calculate the mixed integrals
                     library_idx = 0
                     for j in range(self.num_derivatives):
-                        integral = np.zeros((self.K, n_library_terms, n_features))
+                        integral = np.zeros(
+                            (self.K, n_library_terms, n_features), dtype=x.dtype
+                        )
                         # Derivative orders after integration by parts
                         derivs_mixed = self.multiindices[j] // 2
                         derivs_pure = self.multiindices[j] - derivs_mixed
@@ -1019,8 +1013,8 @@ class WeakPDELibrary(BaseFeatureLibrary):
                                     np.sum(derivs_mixed)
                                 ) * np.tensordot(
                                     weights,
-                                    self.dfx_k_j[k][j1][..., np.newaxis]
-                                    * self.dx_k_j[k][j2][..., np.newaxis, :],
+                                    dfx_k_j[k][j1][..., np.newaxis]
+                                    * dx_k_j[k][j2][..., np.newaxis, :],
                                     axes=(
                                         tuple(np.arange(self.grid_ndim)),
                                         tuple(np.arange(self.grid_ndim)),
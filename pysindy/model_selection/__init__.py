@@ -0,0 +1,4 @@
+from .sindy_cv import SINDyCV
+from .trajectory_kfold import TrajectoryKFold
+
+__all__ = ["SINDyCV", "TrajectoryKFold"]
@@ -0,0 +1,236 @@
+import warnings
+
+import numpy as np
+from joblib import delayed
+from joblib import Parallel
+from sklearn.base import BaseEstimator
+from sklearn.base import clone
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.model_selection import ParameterGrid
+
+from ..optimizers import SINDyOptimizer
+from ..pysindy import _split_ragged
+from ..pysindy import SINDy
+from ..utils import concat_sample_axis
+from ..utils import drop_nan_samples
+from ..utils import GramStatistics
+from ..utils import RaggedTrajectories
+from .trajectory_kfold import TrajectoryKFold
+
+
+class SINDyCV(BaseEstimator):
+    """Cross-validated search over optimizer hyperparameters of a SINDy model.
+
+    The derivatives and library matrix of every trajectory are computed once
+    and reduced to per-trajectory Gram statistics (see
+    :class:`pysindy.utils.GramStatistics`). The statistics of each training
+    fold are obtained by subtracting the test trajectories' blocks from the
+    total, and each fit runs on the equivalent compressed least-squares
+    problem described in :meth:`pysindy.SINDy.finalize`. Test scores are
+    computed from the test blocks as well, so no fold or parameter setting
+    touches the data again. The parameter/fold fits run as independent
+    jobs, on a process pool by default.
+
+    Since the library matrix is shared by all candidates, only parameters
+    of the optimizer can be searched. The optimizer must not fit an
+    intercept, and its loss must be a plain sum of squares (as for the
+    pysindy optimizers), not a mean over samples.
+
+    Parameters
+    ----------
+    estimator : :class:`pysindy.SINDy`
+        Model whose feature library, differentiation method and optimizer
+        are used. It is not modified.
+
+    param_grid : dict or list of dicts
+        Optimizer parameters to search, named with an ``optimizer__``
+        prefix as in :class:`sklearn.model_selection.GridSearchCV`, e.g.
+        ``{"optimizer__threshold": [0.01, 0.1]}``.
+
+    cv : int or cross-validation generator, optional (default 5)
+        Number of folds for :class:`TrajectoryKFold`, or a splitter whose
+        ``split`` yields trajectory indices.
+
+    scoring : str, optional (default "r2")
+        ``"r2"`` for the coefficient of determination of the derivatives,
+        averaged over targets as in :meth:`pysindy.SINDy.score`, or
+        ``"neg_mean_squared_error"``.
+
+    n_jobs : int, optional (default None)
+        Number of parameter/fold jobs to run in parallel.
+
+    refit : boolean, optional (default True)
+        Whether to fit ``best_estimator_`` with the best parameters on all
+        trajectories.
+
+    Attributes
+    ----------
+    cv_results_ : dict
+        ``"params"``, ``"split<k>_test_score"``, ``"mean_test_score"``,
+        ``"std_test_score"``, ``"rank_test_score"`` and
+        ``"mean_complexity"`` for every parameter setting.
+
+    best_index_ : int
+
+    best_params_ : dict
+
+    best_score_ : float
+
+    best_estimator_ : :class:`pysindy.SINDy`
+        Only if ``refit`` is True.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pysindy as ps
+    >>> from pysindy.model_selection import SINDyCV
+    >>> t = np.linspace(0, 10, 1000)
+    >>> x = [np.stack([np.cos(t + p), -np.sin(t + p)], axis=-1) for p in range(5)]
+    >>> search = SINDyCV(
+    ...     ps.SINDy(), {"optimizer__threshold": [0.01, 0.5, 2.0]}, cv=5
+    ... ).fit(x, t=t)
+    >>> search.best_params_
+    {'optimizer__threshold': 0.01}
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        cv=5,
+        scoring="r2",
+        n_jobs=None,
+        refit=True,
+    ):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.refit = refit
+
+    def fit(self, x, t=None, x_dot=None, u=None):
+        """
+        Run the search.
+
+        Parameters
+        ----------
+        x : list of array-like or :class:`pysindy.utils.RaggedTrajectories`
+            Training trajectories, as for :meth:`pysindy.SINDy.fit` with
+            ``multiple_trajectories=True``. A ``RaggedTrajectories`` is split
+            into its trajectories, which are differentiated and transformed
+            one by one.
+
+        t, x_dot, u : optional
+            Time points, precomputed derivatives and control inputs of the
+            trajectories. See :meth:`pysindy.SINDy.fit`.
+
+        Returns
+        -------
+        self : the fitted :class:`SINDyCV` instance
+        """
+        if not isinstance(self.estimator, SINDy):
+            raise TypeError("estimator must be a SINDy model")
+        if self.scoring not in ("r2", "neg_mean_squared_error"):
+            raise ValueError(f"Unknown scoring {self.scoring}")
+        candidates = list(ParameterGrid(self.param_grid))
+        for params in candidates:
+            for name in params:
+                if not name.startswith("optimizer__"):
+                    raise ValueError(
+                        f"Only optimizer parameters can be searched, got {name}"
+                    )
+        optimizers = [
+            clone(self.estimator.optimizer).set_params(
+                **{name[len("optimizer__") :]: v for name, v in params.items()}
+            )
+            for params in candidates
+        ]
+        if any(getattr(opt, "fit_intercept", False) for opt in optimizers):
+            raise ValueError("SINDyCV requires optimizers with fit_intercept=False")
+        cv = TrajectoryKFold(self.cv) if isinstance(self.cv, int) else self.cv
+
+        if isinstance(x, RaggedTrajectories):
+            # The folds need the statistics of every trajectory
+            x, t, x_dot, u = _split_ragged(x, t, x_dot, u)
+
+        model = clone(self.estimator)
+        blocks = _trajectory_statistics(model, x, t, x_dot, u)
+        total = sum(blocks[1:], blocks[0])
+        folds = []
+        for train, test in cv.split(x):
+            test_stats = sum((blocks[i] for i in test[1:]), blocks[test[0]])
+            folds.append((total - test_stats, test_stats))
+
+        unbias = getattr(self.estimator.optimizer, "unbias", True)
+        results = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_and_score)(opt, train, test, unbias, self.scoring)
+            for opt in optimizers
+            for train, test in folds
+        )
+        scores = np.array([r[0] for r in results]).reshape(len(candidates), -1)
+        complexity = np.array([r[1] for r in results]).reshape(len(candidates), -1)
+
+        self.cv_results_ = {"params": candidates}
+        for k in range(scores.shape[1]):
+            self.cv_results_[f"split{k}_test_score"] = scores[:, k]
+        mean = scores.mean(axis=1)
+        self.cv_results_["mean_test_score"] = mean
+        self.cv_results_["std_test_score"] = scores.std(axis=1)
+        self.cv_results_["rank_test_score"] = (
+            np.argsort(np.argsort(-mean, kind="stable")) + 1
+        )
+        self.cv_results_["mean_complexity"] = complexity.mean(axis=1)
+        self.best_index_ = int(np.argmax(mean))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = mean[self.best_index_]
+
+        if self.refit:
+            model.set_params(**self.best_params_)
+            model.gram_ = total
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=ConvergenceWarning)
+                model.finalize(unbias=unbias)
+            self.best_estimator_ = model
+        return self
+
+
+def _trajectory_statistics(model, x, t, x_dot, u):
+    """Differentiate and transform each trajectory once; return Gram blocks."""
+    x, x_dot, model.n_control_features_ = model._prepare_training_data(
+        x, t, x_dot, u, True
+    )
+    model.feature_library.fit(x)
+    thetas = model._transform_trajectories(x)
+    blocks = []
+    for theta, x_dot_i in zip(thetas, x_dot):
+        theta, x_dot_i = drop_nan_samples(
+            concat_sample_axis([theta]), concat_sample_axis([x_dot_i])
+        )
+        blocks.append(
+            GramStatistics(theta.shape[1], x_dot_i.shape[1]).update(theta, x_dot_i)
+        )
+    return blocks
+
+
+def _fit_and_score(optimizer, train, test, unbias, scoring):
+    """Fit one candidate on one fold's statistics and score it on the test fold."""
+    theta, x_dot = train.to_least_squares()
+    optimizer = SINDyOptimizer(clone(optimizer), unbias=unbias)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=ConvergenceWarning)
+        optimizer.fit(theta, x_dot, check_input=False)
+    coef = optimizer.coef_
+    ssr = test.residual(coef)
+    if scoring == "neg_mean_squared_error":
+        score = -np.mean(ssr) / test.n_samples
+    else:
+        sst = np.diag(test.yTy) - test.y_sum**2 / test.n_samples
+        # Like sklearn.metrics.r2_score, a constant target scores 1 if it is
+        # predicted exactly and 0 otherwise, up to the rounding error of the
+        # statistics
+        tol = test.n_samples * np.finfo(float).eps * np.diag(test.yTy)
+        constant = sst <= tol
+        r2 = 1 - ssr / np.where(constant, 1, sst)
+        score = np.mean(np.where(constant, ssr <= tol, r2))
+    return score, np.count_nonzero(coef)
@@ -0,0 +1,57 @@
+from typing import Sequence
+
+from sklearn.model_selection import KFold
+
+
+class TrajectoryKFold(KFold):
+    """K-fold cross-validation over whole trajectories.
+
+    Splits a list of trajectories into ``n_splits`` folds, so that no
+    trajectory contributes samples to both the training and the test set.
+    The indices yielded by :meth:`split` refer to trajectories, not samples.
+
+    Parameters
+    ----------
+    n_splits : int, optional (default 5)
+        Number of folds. Must be at least 2 and at most the number of
+        trajectories.
+
+    shuffle : boolean, optional (default False)
+        Whether to shuffle the trajectories before splitting them into folds.
+
+    random_state : int, RandomState instance or None, optional (default None)
+        Controls the shuffling when ``shuffle`` is True.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pysindy.model_selection import TrajectoryKFold
+    >>> x = [np.random.random((n, 2)) for n in [10, 20, 30]]
+    >>> for train, test in TrajectoryKFold(n_splits=3).split(x):
+    ...     print(train, test)
+    [1 2] [0]
+    [0 2] [1]
+    [0 1] [2]
+    """
+
+    def split(self, x, y=None, groups=None):
+        """Generate trajectory indices of the training and test sets.
+
+        Parameters
+        ----------
+        x : list of array-like
+            The trajectories.
+
+        y, groups : ignored
+
+        Yields
+        ------
+        train : np.ndarray
+            Indices of the training trajectories.
+
+        test : np.ndarray
+            Indices of the test trajectories.
+        """
+        if not isinstance(x, Sequence):
+            raise TypeError("x must be a Sequence of trajectories")
+        return super(TrajectoryKFold, self).split(x)
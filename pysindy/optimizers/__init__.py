@@ -1,27 +1,13 @@
+from importlib import import_module
+
 from .base import BaseOptimizer
 from .base import EnsembleOptimizer
 from .constrained_sr3 import ConstrainedSR3
 from .frols import FROLS
-
-try:  # Waiting on PEP 690 to lazy import gurobipy
-    from .miosr import MIOSR
-except ImportError:
-    pass
-try:  # Waiting on PEP 690 to lazy import cvxpy
-    from .trapping_sr3 import TrappingSR3
-except ImportError:
-    pass
-try:  # Waiting on PEP 690 to lazy import cvxpy
-    from .sindy_pi import SINDyPI
-except ImportError:
-    pass
-try:  # Waiting on PEP 690 to lazy import cvxpy
-    from .stable_linear_sr3 import StableLinearSR3
-except ImportError:
-    pass
 from .sindy_optimizer import SINDyOptimizer
 from .sr3 import SR3
 from .ssr import SSR
+from .stable_linear_sr3 import StableLinearSR3
 from .stlsq import STLSQ
 
 __all__ = [
@@ -38,3 +24,22 @@ __all__ = [
     "SINDyPI",
     "MIOSR",
 ]
+
+# Optimizers whose modules import gurobipy or cvxpy, which are slow to import
+# (and optional), are only loaded when first accessed.
+_lazy_optimizers = {
+    "MIOSR": ".miosr",
+    "SINDyPI": ".sindy_pi",
+    "TrappingSR3": ".trapping_sr3",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_optimizers:
+        module = import_module(_lazy_optimizers[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_optimizers))
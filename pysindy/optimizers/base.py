@@ -3,6 +3,8 @@ Base class for SINDy optimizers.
 """
 import abc
 import warnings
+from collections import deque
+from inspect import signature
 from typing import Callable
 from typing import Tuple
 
@@ -15,6 +17,7 @@ from sklearn.utils.validation import check_is_fitted
 from sklearn.utils.validation import check_X_y
 
 from ..utils import AxesArray
+from ..utils.profiling import profile_stage
 
 
 def _rescale_data(X, y, sample_weight):
@@ -53,15 +56,31 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         Normalize the columns of x (the SINDy library terms) before regression
         by dividing by the L2-norm. Note that the 'normalize' option in sklearn
         is deprecated in sklearn versions >= 1.0 and will be removed.
+        x itself is never modified: optimizers whose ``_reduce`` accepts a
+        ``column_scale`` (such as STLSQ and SR3) apply the scaling in their
+        solver, and the others regress on a scaled copy of x.
 
     copy_X : boolean, optional (default True)
-        If True, X will be copied; else, it may be overwritten.
+        If True, X will be copied; else, it may be overwritten when it is
+        centered for ``fit_intercept``. ``normalize_columns`` does not
+        depend on it.
 
     initial_guess : np.ndarray, shape (n_features,) or (n_targets, n_features),
             optional (default None)
         Initial guess for coefficients ``coef_``.
         If None, the initial guess is obtained via a least-squares fit.
 
+    max_history : int, optional (default None)
+        Number of most recent iterates kept in ``history_`` (and in the other
+        per-iteration histories of the optimizer). Must be at least 2, since
+        the convergence checks compare the last two iterates. If None, every
+        iterate is kept.
+
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data (centered if ``fit_intercept``) as
+        ``Theta_``. It is not kept by default, so that the optimizer does not
+        hold on to a possibly large library matrix after the fit.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -71,12 +90,13 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         Array of 0s and 1s indicating which coefficients of the
         weight vector have not been masked out.
 
-    history_ : list
-        History of ``coef_`` over iterations of the optimization algorithm.
+    history_ : list or collections.deque
+        History of ``coef_`` over iterations of the optimization algorithm,
+        limited to the last ``max_history`` iterates if that is set.
 
     Theta_ : np.ndarray, shape (n_samples, n_features)
-        The Theta matrix to be used in the optimization. We save it as
-        an attribute because access to the full library of terms is
+        The Theta matrix used in the optimization, only set if
+        ``store_theta`` is True. Access to the full library of terms is
         sometimes needed for various applications.
 
     """
@@ -88,11 +108,15 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         fit_intercept=False,
         initial_guess=None,
         copy_X=True,
+        max_history=None,
+        store_theta=False,
     ):
         super(BaseOptimizer, self).__init__(fit_intercept=fit_intercept, copy_X=copy_X)
 
         if max_iter <= 0:
             raise ValueError("max_iter must be positive")
+        if max_history is not None and max_history < 2:
+            raise ValueError("max_history must be at least 2")
 
         self.max_iter = max_iter
         self.iters = 0
@@ -100,6 +124,14 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
             initial_guess = initial_guess.reshape(1, -1)
         self.initial_guess = initial_guess
         self.normalize_columns = normalize_columns
+        self.max_history = max_history
+        self.store_theta = store_theta
+
+    def _new_history(self):
+        """An empty history of iterates, a ring buffer if max_history is set."""
+        if self.max_history is None:
+            return []
+        return deque(maxlen=self.max_history)
 
     # Force subclasses to implement this
     @abc.abstractmethod
@@ -111,7 +143,7 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         """
         raise NotImplementedError
 
-    def fit(self, x_, y, sample_weight=None, **reduce_kws):
+    def fit(self, x_, y, sample_weight=None, check_input=True, **reduce_kws):
         """
         Fit the model.
 
@@ -126,6 +158,11 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         sample_weight : float or numpy array of shape (n_samples,), optional
             Individual weights for each sample
 
+        check_input : bool, optional (default True)
+            Whether to validate x_ and y with ``check_X_y``. :class:`pysindy.SINDy`
+            passes False, since its library matrix and derivatives are already
+            finite float arrays. Do not pass False otherwise.
+
         reduce_kws : dict
             Optional keyword arguments to pass to the _reduce method
             (implemented by subclasses)
@@ -134,15 +171,25 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         -------
         self : returns an instance of self
         """
-        x_, y = check_X_y(x_, y, accept_sparse=[], y_numeric=True, multi_output=True)
-
-        x, y, X_offset, y_offset, X_scale = _preprocess_data(
-            x_,
-            y,
-            fit_intercept=self.fit_intercept,
-            copy=self.copy_X,
-            sample_weight=sample_weight,
-        )
+        if check_input:
+            with profile_stage("check_X_y"):
+                x_, y = check_X_y(
+                    x_, y, accept_sparse=[], y_numeric=True, multi_output=True
+                )
+        else:
+            x_, y = np.asarray(x_), np.asarray(y)
+
+        with profile_stage("_preprocess_data"):
+            # Without an intercept the data is not centered, so nothing
+            # below modifies x or y and there is no need to copy them
+            copy = self.copy_X and (self.fit_intercept or sample_weight is not None)
+            x, y, X_offset, y_offset, X_scale = _preprocess_data(
+                x_,
+                y,
+                fit_intercept=self.fit_intercept,
+                copy=copy,
+                sample_weight=sample_weight,
+            )
 
         if sample_weight is not None:
             x, y = _rescale_data(x, y, sample_weight)
@@ -154,15 +201,27 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
         coef_shape = (y.shape[1], x.shape[1])
         self.ind_ = np.ones(coef_shape, dtype=bool)
 
-        self.Theta_ = x
+        if self.store_theta:
+            # A reference to the (unnormalized) training data, not a copy
+            self.Theta_ = x
 
-        x_normed = np.copy(x)
+        x_normed = np.asarray(x)
+        column_scale = None
         if self.normalize_columns:
             reg = 1 / np.linalg.norm(x, 2, axis=0)
-            x_normed = x * reg
+            if (
+                "column_scale" in signature(self._reduce).parameters
+                and np.isfinite(reg).all()
+            ):
+                # _reduce scales the columns itself, without a scaled copy
+                column_scale = reduce_kws["column_scale"] = reg
+            else:
+                x_normed = x_normed * reg
 
         if self.initial_guess is None:
             self.coef_ = np.linalg.lstsq(x_normed, y, rcond=None)[0].T
+            if column_scale is not None:
+                self.coef_ = self.coef_ / column_scale
         else:
             if not self.initial_guess.shape == coef_shape:
                 raise ValueError(
@@ -171,11 +230,11 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
                 )
             self.coef_ = self.initial_guess
 
-        self.history_ = [self.coef_]
+        self.history_ = self._new_history()
+        self.history_.append(self.coef_)
 
-        x_normed = np.asarray(x_normed)
-
-        self._reduce(x_normed, y, **reduce_kws)
+        with profile_stage("_reduce"):
+            self._reduce(x_normed, y, **reduce_kws)
         self.ind_ = np.abs(self.coef_) > 1e-14
 
         # Rescale coefficients to original units
@@ -183,7 +242,7 @@ class BaseOptimizer(LinearRegression, ComplexityMixin):
             self.coef_ = np.multiply(reg, self.coef_)
             if hasattr(self, "coef_full_"):
                 self.coef_full_ = np.multiply(reg, self.coef_full_)
-            for i in range(np.shape(self.history_)[0]):
+            for i in range(len(self.history_)):
                 self.history_[i] = np.multiply(reg, self.history_[i])
 
         self._set_intercept(X_offset, y_offset, X_scale)
@@ -240,6 +299,10 @@ class EnsembleOptimizer(BaseOptimizer):
         array of the same shape as the arrays in the list.
         Example: :code:`lambda x: np.median(x, axis=0)`
 
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -267,6 +330,7 @@ class EnsembleOptimizer(BaseOptimizer):
         n_candidates_to_drop: int = 1,
         replace: bool = True,
         ensemble_aggregator: Callable = None,
+        store_theta: bool = False,
     ):
         if not hasattr(opt, "initial_guess"):
             opt.initial_guess = None
@@ -276,6 +340,7 @@ class EnsembleOptimizer(BaseOptimizer):
             fit_intercept=opt.fit_intercept,
             initial_guess=opt.initial_guess,
             copy_X=opt.copy_X,
+            store_theta=store_theta,
         )
         if not bagging and not library_ensemble:
             raise ValueError(
@@ -344,7 +409,11 @@ class EnsembleOptimizer(BaseOptimizer):
                     )
                 )
                 x_ensemble = x_ensemble.take(keep_inds, axis=x.ax_coord)
-            self.opt.fit(x_ensemble, y_ensemble)
+            if isinstance(self.opt, BaseOptimizer):
+                # The data was validated by this optimizer's fit
+                self.opt.fit(x_ensemble, y_ensemble, check_input=False)
+            else:
+                self.opt.fit(x_ensemble, y_ensemble)
             new_coefs = np.zeros((y.shape[1], n_features))
             new_coefs[:, keep_inds] = self.opt.coef_
             self.coef_list.append(new_coefs)
@@ -1,20 +1,19 @@
 import warnings
+from importlib.util import find_spec
 
-try:
-    import cvxpy as cp
-
-    cvxpy_flag = True
-except ImportError:
-    cvxpy_flag = False
-    pass
 import numpy as np
 from scipy.linalg import cho_factor
 from sklearn.exceptions import ConvergenceWarning
 
 from ..utils import get_regularization
 from ..utils import reorder_constraints
+from ..utils.profiling import profiled_iterations
+from ..utils.progress import record_objective
 from .sr3 import SR3
 
+# cvxpy is imported on first use, since it is slow to import
+cvxpy_flag = find_spec("cvxpy") is not None
+
 
 class ConstrainedSR3(SR3):
     """
@@ -128,6 +127,13 @@ class ConstrainedSR3(SR3):
         output should be verbose or not. Only relevant for optimizers that
         use the CVXPY package in some capabity.
 
+    max_history : int, optional (default None)
+        Number of most recent iterates to keep; see :class:`BaseOptimizer`.
+
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -167,6 +173,8 @@ class ConstrainedSR3(SR3):
         constraint_separation_index=0,
         verbose=False,
         verbose_cvxpy=False,
+        max_history=None,
+        store_theta=False,
     ):
         super(ConstrainedSR3, self).__init__(
             threshold=threshold,
@@ -180,6 +188,8 @@ class ConstrainedSR3(SR3):
             initial_guess=initial_guess,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
+            max_history=max_history,
             normalize_columns=normalize_columns,
             verbose=verbose,
         )
@@ -252,6 +262,8 @@ class ConstrainedSR3(SR3):
         return inv1.dot(rhs)
 
     def _update_coef_cvxpy(self, x, y, coef_sparse):
+        import cvxpy as cp
+
         xi = cp.Variable(coef_sparse.shape[0] * coef_sparse.shape[1])
         cost = cp.sum_squares(x @ xi - y.flatten())
         if self.thresholder.lower() == "l1":
@@ -387,7 +399,8 @@ class ConstrainedSR3(SR3):
 
         if self.use_trimming:
             trimming_array = np.repeat(1.0 - self.trimming_fraction, n_samples)
-            self.history_trimming_ = [trimming_array]
+            self.history_trimming_ = self._new_history()
+            self.history_trimming_.append(trimming_array)
 
         if self.use_constraints and self.constraint_order.lower() == "target":
             self.constraint_lhs = reorder_constraints(self.constraint_lhs, n_features)
@@ -425,7 +438,7 @@ class ConstrainedSR3(SR3):
             coef_sparse = self._update_coef_cvxpy(x_expanded, y, coef_sparse)
             objective_history.append(self._objective(x, y, 0, coef_full, coef_sparse))
         else:
-            for k in range(self.max_iter):
+            for k in profiled_iterations(self.max_iter, self):
                 if self.use_trimming:
                     x_weighted = x * trimming_array.reshape(n_samples, 1)
                     H = np.dot(x_weighted.T, x) + np.diag(
@@ -449,13 +462,12 @@ class ConstrainedSR3(SR3):
                         coef_full, trimming_array, trimming_grad
                     )
 
-                    objective_history.append(
-                        self._objective(x, y, k, coef_full, coef_sparse, trimming_array)
+                    objective = self._objective(
+                        x, y, k, coef_full, coef_sparse, trimming_array
                     )
                 else:
-                    objective_history.append(
-                        self._objective(x, y, k, coef_full, coef_sparse)
-                    )
+                    objective = self._objective(x, y, k, coef_full, coef_sparse)
+                objective_history.append(record_objective(objective))
                 if self._convergence_criterion() < self.tol:
                     # TODO: Update this for trimming/constraints
                     break
@@ -52,6 +52,10 @@ class FROLS(BaseOptimizer):
         If True, prints out the different error terms every
         iteration.
 
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -91,10 +95,12 @@ class FROLS(BaseOptimizer):
         alpha=0.05,
         ridge_kw=None,
         verbose=False,
+        store_theta=False,
     ):
         super(FROLS, self).__init__(
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
             max_iter=max_iter,
             normalize_columns=normalize_columns,
         )
@@ -94,6 +94,10 @@ class MIOSR(BaseOptimizer):
     verbose : bool, optional (default False)
         If True, prints out the Gurobi solver log.
 
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -120,11 +124,13 @@ class MIOSR(BaseOptimizer):
         copy_X=True,
         initial_guess=None,
         verbose=False,
+        store_theta=False,
     ):
         super(MIOSR, self).__init__(
             normalize_columns=normalize_columns,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
         )
 
         if target_sparsity is not None and (
@@ -4,6 +4,8 @@ from sklearn.linear_model import LinearRegression
 
 from ..utils import AxesArray
 from ..utils import drop_nan_samples
+from ..utils.profiling import profile_stage
+from .base import BaseOptimizer
 
 COEF_THRESHOLD = 1e-14
 
@@ -50,20 +52,25 @@ class SINDyOptimizer(BaseEstimator):
         self.optimizer = optimizer
         self.unbias = unbias
 
-    def fit(self, x, y):
+    def fit(self, x, y, check_input=True):
 
         x, y = drop_nan_samples(
             AxesArray(x, {"ax_sample": 0, "ax_coord": 1}),
             AxesArray(y, {"ax_sample": 0, "ax_coord": 1}),
         )
 
-        self.optimizer.fit(x, y)
+        if isinstance(self.optimizer, BaseOptimizer):
+            # See BaseOptimizer.fit
+            self.optimizer.fit(x, y, check_input=check_input)
+        else:
+            self.optimizer.fit(x, y)
         if not hasattr(self.optimizer, "coef_"):
             raise AttributeError("optimizer has no attribute coef_")
         self.ind_ = np.abs(self.coef_) > COEF_THRESHOLD
 
         if self.unbias:
-            self._unbias(x, y)
+            with profile_stage("unbias"):
+                self._unbias(x, y)
 
         return self
 
@@ -75,9 +82,14 @@ class SINDyOptimizer(BaseEstimator):
             fit_intercept = False
         for i in range(self.ind_.shape[0]):
             if np.any(self.ind_[i]):
+                if self.ind_[i].all():
+                    # Only centering the data for an intercept modifies it
+                    x_i, copy_X = x, fit_intercept
+                else:
+                    x_i, copy_X = x[:, self.ind_[i]], False
                 coef[i, self.ind_[i]] = (
-                    LinearRegression(fit_intercept=fit_intercept)
-                    .fit(x[:, self.ind_[i]], y[:, i])
+                    LinearRegression(fit_intercept=fit_intercept, copy_X=copy_X)
+                    .fit(x_i, y[:, i])
                     .coef_
                 )
         if self.optimizer.coef_.ndim == 1:
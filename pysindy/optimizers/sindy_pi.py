@@ -81,6 +81,10 @@ class SINDyPI(SR3):
         output should be verbose or not. Only relevant for optimizers that
         use the CVXPY package in some capabity.
 
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -107,6 +111,7 @@ class SINDyPI(SR3):
         model_subset=None,
         normalize_columns=False,
         verbose_cvxpy=False,
+        store_theta=False,
     ):
         super(SINDyPI, self).__init__(
             threshold=threshold,
@@ -116,6 +121,7 @@ class SINDyPI(SR3):
             max_iter=max_iter,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
             normalize_columns=normalize_columns,
         )
 
@@ -8,6 +8,8 @@ from sklearn.exceptions import ConvergenceWarning
 from ..utils import capped_simplex_projection
 from ..utils import get_prox
 from ..utils import get_regularization
+from ..utils.profiling import profiled_iterations
+from ..utils.progress import record_objective
 from .base import BaseOptimizer
 
 warnings.filterwarnings("ignore", category=UserWarning)
@@ -102,6 +104,13 @@ class SR3(BaseOptimizer):
         If True, prints out the different error terms every
         max_iter / 10 iterations.
 
+    max_history : int, optional (default None)
+        Number of most recent iterates to keep; see :class:`BaseOptimizer`.
+
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -152,12 +161,16 @@ class SR3(BaseOptimizer):
         initial_guess=None,
         normalize_columns=False,
         verbose=False,
+        max_history=None,
+        store_theta=False,
     ):
         super(SR3, self).__init__(
             max_iter=max_iter,
             initial_guess=initial_guess,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
+            max_history=max_history,
             normalize_columns=normalize_columns,
         )
 
@@ -239,13 +252,15 @@ class SR3(BaseOptimizer):
         self.use_trimming = False
         self.trimming_fraction = None
 
-    def _objective(self, x, y, q, coef_full, coef_sparse, trimming_array=None):
+    def _objective(
+        self, x, y, q, coef_full, coef_sparse, trimming_array=None, column_scale=None
+    ):
         """Objective function"""
         if q != 0:
             print_ind = q % (self.max_iter // 10.0)
         else:
             print_ind = q
-        R2 = (y - np.dot(x, coef_full)) ** 2
+        R2 = (y - np.dot(x, _scale_rows(coef_full, column_scale))) ** 2
         D2 = (coef_full - coef_sparse) ** 2
         if self.use_trimming:
             assert trimming_array is not None
@@ -325,11 +340,14 @@ class SR3(BaseOptimizer):
             return err_coef + err_trimming
         return err_coef
 
-    def _reduce(self, x, y):
+    def _reduce(self, x, y, column_scale=None):
         """
         Perform at most ``self.max_iter`` iterations of the SR3 algorithm.
 
         Assumes initial guess for coefficients is stored in ``self.coef_``.
+        If given, ``column_scale`` scales the columns of x (see
+        ``normalize_columns``). It is applied to the products with x rather
+        than to a copy of x.
         """
         if self.initial_guess is not None:
             self.coef_ = self.initial_guess
@@ -340,14 +358,18 @@ class SR3(BaseOptimizer):
         if self.use_trimming:
             coef_full = coef_sparse.copy()
             trimming_array = np.repeat(1.0 - self.trimming_fraction, n_samples)
-            self.history_trimming_ = [trimming_array]
+            self.history_trimming_ = self._new_history()
+            self.history_trimming_.append(trimming_array)
         else:
             trimming_array = None
 
         # Precompute some objects for upcoming least-squares solves.
         # Assumes that self.nu is fixed throughout optimization procedure.
-        cho = cho_factor(np.dot(x.T, x) + np.diag(np.full(x.shape[1], 1.0 / self.nu)))
-        x_transpose_y = np.dot(x.T, y)
+        cho = cho_factor(
+            _scale_gram(np.dot(x.T, x), column_scale)
+            + np.diag(np.full(x.shape[1], 1.0 / self.nu))
+        )
+        x_transpose_y = _scale_rows(np.dot(x.T, y), column_scale)
 
         # Print initial values for each term in the optimization
         if self.verbose:
@@ -364,15 +386,17 @@ class SR3(BaseOptimizer):
             )
         objective_history = []
 
-        for k in range(self.max_iter):
+        for k in profiled_iterations(self.max_iter, self):
             if self.use_trimming:
                 x_weighted = x * trimming_array.reshape(n_samples, 1)
                 cho = cho_factor(
-                    np.dot(x_weighted.T, x)
+                    _scale_gram(np.dot(x_weighted.T, x), column_scale)
                     + np.diag(np.full(x.shape[1], 1.0 / self.nu))
                 )
-                x_transpose_y = np.dot(x_weighted.T, y)
-                trimming_grad = 0.5 * np.sum((y - x.dot(coef_full)) ** 2, axis=1)
+                x_transpose_y = _scale_rows(np.dot(x_weighted.T, y), column_scale)
+                trimming_grad = 0.5 * np.sum(
+                    (y - x.dot(_scale_rows(coef_full, column_scale))) ** 2, axis=1
+                )
             coef_full = self._update_full_coef(cho, x_transpose_y, coef_sparse)
             coef_sparse = self._update_sparse_coef(coef_full)
             self.history_.append(coef_sparse.T)
@@ -381,7 +405,11 @@ class SR3(BaseOptimizer):
                     coef_full, trimming_array, trimming_grad
                 )
             objective_history.append(
-                self._objective(x, y, k, coef_full, coef_sparse, trimming_array)
+                record_objective(
+                    self._objective(
+                        x, y, k, coef_full, coef_sparse, trimming_array, column_scale
+                    )
+                )
             )
             if self._convergence_criterion() < self.tol:
                 # Could not (further) select important features
@@ -398,3 +426,17 @@ class SR3(BaseOptimizer):
         if self.use_trimming:
             self.trimming_array = trimming_array
         self.objective_history = objective_history
+
+
+def _scale_gram(gram, column_scale):
+    """The Gram matrix of x * column_scale, from that of x."""
+    if column_scale is None:
+        return gram
+    return column_scale[:, np.newaxis] * gram * column_scale
+
+
+def _scale_rows(a, column_scale):
+    """Multiply the rows of a, which correspond to the columns of x."""
+    if column_scale is None:
+        return a
+    return column_scale[:, np.newaxis] * a
@@ -1,6 +1,7 @@
 import numpy as np
 from sklearn.linear_model import ridge_regression
 
+from ..utils.profiling import profiled_iterations
 from .base import BaseOptimizer
 
 
@@ -55,6 +56,10 @@ class SSR(BaseOptimizer):
     verbose : bool, optional (default False)
         If True, prints out the different error terms every iteration.
 
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -99,11 +104,13 @@ class SSR(BaseOptimizer):
         criteria="coefficient_value",
         kappa=None,
         verbose=False,
+        store_theta=False,
     ):
         super(SSR, self).__init__(
             max_iter=max_iter,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
             normalize_columns=normalize_columns,
         )
 
@@ -199,7 +206,7 @@ class SSR(BaseOptimizer):
             )
 
         self.err_history_ = []
-        for k in range(self.max_iter):
+        for k in profiled_iterations(self.max_iter, self):
             for i in range(n_targets):
                 if self.criteria == "coefficient_value":
                     coef[i, :], ind = self._coefficient_value(coef[i, :])
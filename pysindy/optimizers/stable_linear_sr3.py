@@ -1,17 +1,12 @@
 import warnings
 
-try:
-    import cvxpy as cp
-
-    cvxpy_flag = True
-except ImportError:
-    cvxpy_flag = False
-    pass
 import numpy as np
 from scipy.linalg import cho_factor
 from sklearn.exceptions import ConvergenceWarning
 
 from ..utils import reorder_constraints
+from ..utils.profiling import profiled_iterations
+from ..utils.progress import record_objective
 from .constrained_sr3 import ConstrainedSR3
 
 
@@ -129,6 +124,13 @@ class StableLinearSR3(ConstrainedSR3):
         output should be verbose or not. Only relevant for optimizers that
         use the CVXPY package in some capabity.
 
+    max_history : int, optional (default None)
+        Number of most recent iterates to keep; see :class:`BaseOptimizer`.
+
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -169,6 +171,8 @@ class StableLinearSR3(ConstrainedSR3):
         verbose=False,
         verbose_cvxpy=False,
         gamma=-1e-8,
+        max_history=None,
+        store_theta=False,
     ):
         super(StableLinearSR3, self).__init__(
             threshold=threshold,
@@ -182,6 +186,8 @@ class StableLinearSR3(ConstrainedSR3):
             initial_guess=initial_guess,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
+            max_history=max_history,
             normalize_columns=normalize_columns,
             verbose=verbose,
             verbose_cvxpy=verbose_cvxpy,
@@ -212,6 +218,8 @@ class StableLinearSR3(ConstrainedSR3):
         Update the coefficients using CVXPY. This function is called if
         the sparsity threshold is nonzero or constraints are used.
         """
+        import cvxpy as cp
+
         xi = cp.Variable(coef_sparse.shape[0] * coef_sparse.shape[1])
         cost = cp.sum_squares(x @ xi - y.flatten())
         cost = cost + cp.sum_squares(xi - coef_negative_definite.flatten()) / (
@@ -372,7 +380,8 @@ class StableLinearSR3(ConstrainedSR3):
 
         if self.use_trimming:
             trimming_array = np.repeat(1.0 - self.trimming_fraction, n_samples)
-            self.history_trimming_ = [trimming_array]
+            self.history_trimming_ = self._new_history()
+            self.history_trimming_.append(trimming_array)
 
         if self.use_constraints and self.constraint_order.lower() == "target":
             self.constraint_lhs = reorder_constraints(self.constraint_lhs, n_features)
@@ -405,7 +414,7 @@ class StableLinearSR3(ConstrainedSR3):
         objective_history = []
         eigs_history = []
         coef_history = []
-        for k in range(self.max_iter):
+        for k in profiled_iterations(self.max_iter, self):
             if not np.isclose(self.threshold, 0.0) or self.use_constraints:
                 coef_sparse = self._update_coef_cvxpy(
                     x_expanded, y, coef_sparse, coef_negative_definite
@@ -420,7 +429,9 @@ class StableLinearSR3(ConstrainedSR3):
                 coef_sparse,
             ).T
             objective_history.append(
-                self._objective(x, y, k, coef_negative_definite, coef_sparse)
+                record_objective(
+                    self._objective(x, y, k, coef_negative_definite, coef_sparse)
+                )
             )
             eigs_history.append(np.sort(np.linalg.svd(coef_sparse, compute_uv=False)))
             coef_history.append(coef_sparse)
@@ -1,11 +1,14 @@
 import warnings
 
 import numpy as np
+from scipy.linalg import LinAlgError
 from scipy.linalg import LinAlgWarning
+from scipy.linalg import solve
 from sklearn.exceptions import ConvergenceWarning
 from sklearn.linear_model import ridge_regression
 from sklearn.utils.validation import check_is_fitted
 
+from ..utils.profiling import profiled_iterations
 from .base import BaseOptimizer
 
 
@@ -62,6 +65,13 @@ class STLSQ(BaseOptimizer):
     verbose : bool, optional (default False)
         If True, prints out the different error terms every iteration.
 
+    max_history : int, optional (default None)
+        Number of most recent iterates to keep; see :class:`BaseOptimizer`.
+
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -107,11 +117,15 @@ class STLSQ(BaseOptimizer):
         copy_X=True,
         initial_guess=None,
         verbose=False,
+        max_history=None,
+        store_theta=False,
     ):
         super(STLSQ, self).__init__(
             max_iter=max_iter,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
+            max_history=max_history,
             normalize_columns=normalize_columns,
         )
 
@@ -134,20 +148,39 @@ class STLSQ(BaseOptimizer):
         c[~big_ind] = 0
         return c, big_ind
 
-    def _regress(self, x, y):
-        """Perform the ridge regression"""
+    def _regress(self, x, y, column_scale=None):
+        """Perform the ridge regression (of ``x * column_scale`` if given)"""
         kw = self.ridge_kw or {}
 
         with warnings.catch_warnings():
             warnings.filterwarnings("ignore", category=LinAlgWarning)
             try:
-                coef = ridge_regression(x, y, self.alpha, **kw)
+                if column_scale is None:
+                    coef = ridge_regression(x, y, self.alpha, **kw)
+                else:
+                    coef = self._scaled_ridge_regression(x, y, column_scale, kw)
             except LinAlgWarning:
                 # increase alpha until warning stops
                 self.alpha = 2 * self.alpha
         self.iters += 1
         return coef
 
+    def _scaled_ridge_regression(self, x, y, column_scale, kw):
+        """The ridge regression of ``x * column_scale``, without forming it."""
+        n_samples, n_features = x.shape
+        if not kw and n_features <= n_samples:
+            # The Cholesky solver that ridge_regression picks for dense x,
+            # with the columns scaled in the normal equations
+            a = column_scale[:, np.newaxis] * np.dot(x.T, x) * column_scale
+            a.flat[:: n_features + 1] += self.alpha
+            try:
+                return solve(
+                    a, column_scale * np.dot(x.T, y), assume_a="pos", overwrite_a=True
+                )
+            except LinAlgError:
+                pass
+        return ridge_regression(x * column_scale, y, self.alpha, **kw)
+
     def _no_change(self):
         """Check if the coefficient mask has changed after thresholding"""
         this_coef = self.history_[-1].flatten()
@@ -157,12 +190,13 @@ class STLSQ(BaseOptimizer):
             last_coef = np.zeros_like(this_coef)
         return all(bool(i) == bool(j) for i, j in zip(this_coef, last_coef))
 
-    def _reduce(self, x, y):
+    def _reduce(self, x, y, column_scale=None):
         """Performs at most ``self.max_iter`` iterations of the
         sequentially-thresholded least squares algorithm.
 
         Assumes an initial guess for coefficients and support are saved in
-        ``self.coef_`` and ``self.ind_``.
+        ``self.coef_`` and ``self.ind_``. If given, ``column_scale`` scales
+        the columns of x (see ``normalize_columns``).
         """
         if self.initial_guess is not None:
             self.coef_ = self.initial_guess
@@ -186,7 +220,7 @@ class STLSQ(BaseOptimizer):
                 " ... {: >10}".format(*row)
             )
 
-        for k in range(self.max_iter):
+        for k in profiled_iterations(self.max_iter, self):
             if np.count_nonzero(ind) == 0:
                 warnings.warn(
                     "Sparsity parameter is too big ({}) and eliminated all "
@@ -203,7 +237,10 @@ class STLSQ(BaseOptimizer):
                         "coefficients".format(self.threshold)
                     )
                     continue
-                coef_i = self._regress(x[:, ind[i]], y[:, i])
+                # Avoid copying x while every term is still active
+                x_i = x if ind[i].all() else x[:, ind[i]]
+                scale_i = None if column_scale is None else column_scale[ind[i]]
+                coef_i = self._regress(x_i, y[:, i], scale_i)
                 coef_i, ind_i = self._sparse_coefficients(
                     n_features, ind[i], coef_i, self.threshold
                 )
@@ -212,7 +249,8 @@ class STLSQ(BaseOptimizer):
 
             self.history_.append(coef)
             if self.verbose:
-                R2 = np.sum((y - np.dot(x, coef.T)) ** 2)
+                scaled_coef = coef if column_scale is None else coef * column_scale
+                R2 = np.sum((y - np.dot(x, scaled_coef.T)) ** 2)
                 L2 = self.alpha * np.sum(coef**2)
                 L0 = np.count_nonzero(coef)
                 row = [k, R2, L2, L0, R2 + L2]
@@ -7,6 +7,8 @@ from scipy.linalg import cho_solve
 from sklearn.exceptions import ConvergenceWarning
 
 from ..utils import reorder_constraints
+from ..utils.profiling import profiled_iterations
+from ..utils.progress import record_objective
 from .sr3 import SR3
 
 
@@ -154,6 +156,13 @@ class TrappingSR3(SR3):
         output should be verbose or not. Only relevant for optimizers that
         use the CVXPY package in some capabity.
 
+    max_history : int, optional (default None)
+        Number of most recent iterates to keep; see :class:`BaseOptimizer`.
+
+    store_theta : boolean, optional (default False)
+        Whether to keep the training data as ``Theta_``; see
+        :class:`BaseOptimizer`.
+
     Attributes
     ----------
     coef_ : array, shape (n_features,) or (n_targets, n_features)
@@ -245,6 +254,8 @@ class TrappingSR3(SR3):
         constraint_order="target",
         verbose=False,
         verbose_cvxpy=False,
+        max_history=None,
+        store_theta=False,
     ):
         super(TrappingSR3, self).__init__(
             threshold=threshold,
@@ -252,6 +263,8 @@ class TrappingSR3(SR3):
             normalize_columns=normalize_columns,
             fit_intercept=fit_intercept,
             copy_X=copy_X,
+            store_theta=store_theta,
+            max_history=max_history,
             thresholder=thresholder,
             thresholds=thresholds,
             verbose=verbose,
@@ -308,11 +321,6 @@ class TrappingSR3(SR3):
         self.tol_m = tol_m
         self.accel = accel
         self.verbose_cvxpy = verbose_cvxpy
-        self.A_history_ = []
-        self.m_history_ = []
-        self.PW_history_ = []
-        self.PWeigs_history_ = []
-        self.history_ = []
         self.objective_history = objective_history
         self.unbias = False
         self.use_constraints = (constraint_lhs is not None) and (
@@ -689,6 +697,10 @@ class TrappingSR3(SR3):
         # Define PL and PQ tensors, only relevant if the stability term in
         # trapping SINDy is turned on.
         self.PL_unsym_, self.PL_, self.PQ_ = self._set_Ptensors(r)
+        self.A_history_ = self._new_history()
+        self.m_history_ = self._new_history()
+        self.PW_history_ = self._new_history()
+        self.PWeigs_history_ = self._new_history()
         # make sure dimensions/symmetries are correct
         self._check_P_matrix(r, n_features, N)
 
@@ -744,7 +756,7 @@ class TrappingSR3(SR3):
 
         # Begin optimization loop
         objective_history = []
-        for k in range(self.max_iter):
+        for k in profiled_iterations(self.max_iter, self):
 
             # update P tensor from the newest m
             mPQ = np.tensordot(m, self.PQ_, axes=([0], [0]))
@@ -796,7 +808,9 @@ class TrappingSR3(SR3):
             self.PWeigs_history_.append(np.sort(eigvals))
 
             # update objective
-            objective_history.append(self._objective(x, y, coef_sparse, A, PW, k))
+            objective_history.append(
+                record_objective(self._objective(x, y, coef_sparse, A, PW, k))
+            )
 
             if (
                 self._m_convergence_criterion() < self.tol_m
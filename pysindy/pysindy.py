@@ -1,41 +1,59 @@
+import asyncio
+import os
+import sys
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from copy import copy
+from copy import deepcopy
+from functools import partial
 from itertools import product
 from typing import Collection
 from typing import Sequence
 
 import numpy as np
+from joblib import delayed
+from joblib import Parallel
 from scipy.integrate import odeint
 from scipy.integrate import solve_ivp
 from scipy.interpolate import interp1d
 from scipy.linalg import LinAlgWarning
+from scipy.sparse import block_diag
 from sklearn import __version__
 from sklearn.base import BaseEstimator
+from sklearn.base import clone
 from sklearn.exceptions import ConvergenceWarning
 from sklearn.metrics import r2_score
 from sklearn.pipeline import Pipeline
 from sklearn.utils.validation import check_is_fitted
 
+from .codegen import numpy_source
 from .differentiation import FiniteDifference
 from .feature_library import PolynomialLibrary
 from .optimizers import EnsembleOptimizer
 from .optimizers import SINDyOptimizer
-
-try:  # Waiting on PEP 690 to lazy import CVXPY
-    from .optimizers import SINDyPI
-
-    sindy_pi_flag = True
-except ImportError:
-    sindy_pi_flag = False
 from .optimizers import STLSQ
+from .serialization import load_model
+from .serialization import save_model
 from .utils import AxesArray
 from .utils import comprehend_axes
 from .utils import concat_sample_axis
 from .utils import drop_nan_samples
 from .utils import equations
+from .utils import fingerprint
+from .utils import FitProfile
+from .utils import GramStatistics
+from .utils import RaggedTrajectories
 from .utils import SampleConcatter
 from .utils import validate_control_variables
 from .utils import validate_input
 from .utils import validate_no_reshape
+from .utils.cache import _TRANSIENT_ATTRIBUTES
+from .utils.profiling import profile_stage
+from .utils.progress import _FitMonitor
+
+
+DEFAULT_BLOCK_SIZE = 10000
 
 
 class SINDy(BaseEstimator):
@@ -74,6 +92,35 @@ class SINDy(BaseEstimator):
         one time step. If False, dynamical system is assumed to be a flow
         (right-hand side functions predict continuous time derivatives).
 
+    feature_cache : :class:`pysindy.utils.FeatureCache`, optional (default None)
+        If given, :meth:`fit` stores the derivatives and library matrix it
+        computes in this cache, and reuses them when called again with the
+        same data, differentiation method and feature library. Sharing one
+        cache between models makes sweeps over optimizer hyperparameters
+        cost only the optimization. Not used with the deprecated ensemble
+        arguments of :meth:`fit`, nor with blockwise fitting.
+
+    n_jobs : int, optional (default None)
+        Number of jobs used to differentiate and transform the trajectories
+        of multiple-trajectory data concurrently. ``None`` means one job and
+        ``-1`` all processors. Threads are used by default, since most of
+        the work happens in NumPy routines that release the GIL; a process
+        pool can be selected with :func:`joblib.parallel_backend`. Results
+        are always assembled in trajectory order.
+
+    dtype : numpy floating point type, optional (default None)
+        Precision in which to fit, e.g. ``np.float32`` to halve the memory
+        taken by the derivatives and the library matrix of large data sets.
+        Training data (and derivatives and control inputs) is converted to
+        this type, and the differentiation methods, feature libraries and
+        optimizers keep it. Gram statistics (see :meth:`partial_fit`) are
+        always accumulated in float64. If None, the type of the data is
+        kept.
+
+    lean : boolean, optional (default False)
+        If True, :meth:`compact` is called after every fit, so that the
+        fitted model only holds what prediction and simulation need.
+
     Attributes
     ----------
     model : ``sklearn.multioutput.MultiOutputRegressor`` object
@@ -159,6 +206,10 @@ class SINDy(BaseEstimator):
         feature_names=None,
         t_default=1,
         discrete_time=False,
+        feature_cache=None,
+        n_jobs=None,
+        dtype=None,
+        lean=False,
     ):
         if optimizer is None:
             optimizer = STLSQ()
@@ -177,6 +228,12 @@ class SINDy(BaseEstimator):
             self.t_default = t_default
         self.feature_names = feature_names
         self.discrete_time = discrete_time
+        self.feature_cache = feature_cache
+        self.n_jobs = n_jobs
+        if dtype is not None and not np.issubdtype(dtype, np.floating):
+            raise ValueError("dtype must be a floating point type")
+        self.dtype = dtype
+        self.lean = lean
 
     def fit(
         self,
@@ -194,6 +251,8 @@ class SINDy(BaseEstimator):
         n_subset=None,
         n_models=None,
         ensemble_aggregator=None,
+        block_size=None,
+        profile=False,
     ):
         """
         Fit a SINDy model.
@@ -203,7 +262,14 @@ class SINDy(BaseEstimator):
         x: array-like or list of array-like, shape (n_samples, n_input_features)
             Training data. If training data contains multiple trajectories,
             x should be a list containing data for each trajectory. Individual
-            trajectories may contain different numbers of samples.
+            trajectories may contain different numbers of samples. Many short
+            trajectories are best passed as a
+            :class:`pysindy.utils.RaggedTrajectories`, which is always treated
+            as multiple trajectories and is differentiated and transformed
+            with a few vectorized calls rather than once per trajectory. x_dot
+            and u then are either ``RaggedTrajectories`` with the same offsets
+            or arrays of shape (total_samples, ...), and t is a float or an
+            array of shape (total_samples,) (by default, ``x.t``).
 
         t: float, numpy array of shape (n_samples,), or list of numpy arrays, optional \
                 (default None)
@@ -295,10 +361,48 @@ class SINDy(BaseEstimator):
             array of the same shape as the arrays in the list.
             Example: :code:`lambda x: np.median(x, axis=0)`
 
+        block_size : int, optional (default None)
+            Number of time points to process at once. If given, or if x is an
+            ``np.memmap`` or the path of a ``.npy`` file (which is opened with
+            ``mmap_mode="r"``), the data is differentiated and transformed one
+            block of time points at a time and only the Gram statistics of the
+            library are kept, as in :meth:`partial_fit`. Blocks overlap by the
+            stencil width of the differentiation method, so the derivatives
+            match those computed on the whole trajectory. Memory-mapped data
+            without a block size is processed in blocks of
+            ``DEFAULT_BLOCK_SIZE`` time points.
+
+        profile : boolean, optional (default False)
+            Whether to record the wall time, call count and peak allocated
+            memory of each stage of the fit (and of each optimizer
+            iteration) in ``fit_profile_``. See :class:`pysindy.FitProfile`
+            for the stages and the format of the report.
+
         Returns
         -------
         self: a fitted :class:`SINDy` instance
         """
+        if profile:
+            with FitProfile() as fit_profile:
+                self.fit(
+                    x,
+                    t=t,
+                    x_dot=x_dot,
+                    u=u,
+                    multiple_trajectories=multiple_trajectories,
+                    unbias=unbias,
+                    quiet=quiet,
+                    ensemble=ensemble,
+                    library_ensemble=library_ensemble,
+                    replace=replace,
+                    n_candidates_to_drop=n_candidates_to_drop,
+                    n_subset=n_subset,
+                    n_models=n_models,
+                    ensemble_aggregator=ensemble_aggregator,
+                    block_size=block_size,
+                )
+            self.fit_profile_ = fit_profile.to_dict()
+            return self
 
         if ensemble or library_ensemble:
             # DeprecationWarning are ignored by default...
@@ -307,57 +411,54 @@ class SINDy(BaseEstimator):
                 "Use the EnsembleOptimizer class instead.",
                 UserWarning,
             )
-        if t is None:
-            t = self.t_default
-
-        if not multiple_trajectories:
-            x, t, x_dot, u = _adapt_to_multiple_trajectories(x, t, x_dot, u)
-            multiple_trajectories = True
-        elif (
-            not isinstance(x, Sequence)
-            or (not isinstance(x_dot, Sequence) and x_dot is not None)
-            or (not isinstance(u, Sequence) and u is not None)
-        ):
-            raise TypeError(
-                "If multiple trajectories set, x and if included,"
-                "x_dot and u, must be Sequences"
-            )
-        x, x_dot, u = _comprehend_and_validate_inputs(
-            x, t, x_dot, u, self.feature_library
-        )
-
         if (n_models is not None) and n_models <= 0:
             raise ValueError("n_models must be a positive integer")
         if (n_subset is not None) and n_subset <= 0:
             raise ValueError("n_subset must be a positive integer")
 
-        if u is None:
-            self.n_control_features_ = 0
-        else:
-            u = validate_control_variables(
+        if block_size is not None or _is_out_of_core(x):
+            if ensemble or library_ensemble:
+                raise ValueError("Ensembling is not supported for blockwise fitting")
+            if hasattr(self, "gram_"):
+                del self.gram_
+            if isinstance(x, RaggedTrajectories):
+                x, t, x_dot, u = _split_ragged(x, t, x_dot, u)
+                multiple_trajectories = True
+            self._fit_blocks(
                 x,
+                t,
+                x_dot,
                 u,
-                trim_last_point=(self.discrete_time and x_dot is None),
+                multiple_trajectories,
+                DEFAULT_BLOCK_SIZE if block_size is None else block_size,
+            )
+            return self.finalize(unbias=unbias, quiet=quiet)
+
+        # A full fit starts any later partial_fit stream from scratch
+        if hasattr(self, "gram_"):
+            del self.gram_
+        if library_ensemble:
+            self.feature_library.library_ensemble = False
+        with _filter_fit_warnings(quiet):
+            x, theta, x_dot = self._library_features(
+                x,
+                t,
+                x_dot,
+                u,
+                multiple_trajectories,
+                use_cache=not (ensemble or library_ensemble),
             )
-            self.n_control_features_ = u[0].shape[u[0].ax_coord]
-        x, x_dot = self._process_multiple_trajectories(x, t, x_dot)
 
         # Set ensemble variables
         self.ensemble = ensemble
         self.library_ensemble = library_ensemble
 
-        # Append control variables
-        if u is not None:
-            x = [np.concatenate((xi, ui), axis=xi.ax_coord) for xi, ui in zip(x, u)]
-
         if hasattr(self.optimizer, "unbias"):
             unbias = self.optimizer.unbias
 
         # backwards compatibility for ensemble options
         if ensemble and n_subset is None:
             n_subset = x[0].shape[x[0].ax_time]
-        if library_ensemble:
-            self.feature_library.library_ensemble = False
         if ensemble and not library_ensemble:
             if n_subset is None:
                 n_sample_tot = np.sum([xi.shape[xi.ax_time] for xi in x])
@@ -404,15 +505,467 @@ class SINDy(BaseEstimator):
             ("shaping", SampleConcatter()),
             ("model", optimizer),
         ]
-        x_dot = concat_sample_axis(x_dot)
         self.model = Pipeline(steps)
-        action = "ignore" if quiet else "default"
-        with warnings.catch_warnings():
-            warnings.filterwarnings(action, category=ConvergenceWarning)
-            warnings.filterwarnings(action, category=LinAlgWarning)
-            warnings.filterwarnings(action, category=UserWarning)
-            self.model.fit(x, x_dot)
+        with _filter_fit_warnings(quiet), profile_stage("optimizer"):
+            optimizer.fit(theta, x_dot, check_input=False)
+
+        self._set_fitted_attributes()
+        return self
+
+    async def afit(self, x, *args, executor=None, progress=None, **kwargs):
+        """
+        Fit the model without blocking the event loop.
+
+        Coroutine version of :meth:`fit`, which runs in ``executor``. If the
+        task awaiting ``afit`` is cancelled, the fit stops at the start of
+        the next optimizer iteration (or stage of the fit, such as the
+        differentiation of the data) and ``asyncio.CancelledError`` is raised.
+
+        Parameters
+        ----------
+        x, args, kwargs
+            The arguments of :meth:`fit`.
+
+        executor: concurrent.futures.Executor, optional (default None)
+            Executor to run the fit in. If None, the default executor of the
+            event loop (a thread pool) is used. With a
+            ``concurrent.futures.ProcessPoolExecutor`` the model and data
+            are pickled to a worker process and the fitted model is copied
+            back; a fit in a process can only be cancelled before it starts,
+            and reports no progress.
+
+        progress: :class:`pysindy.FitProgress`, optional (default None)
+            If given, reports the objective value of every optimizer
+            iteration as the fit runs; iterate over it with ``async for``.
+
+        Returns
+        -------
+        self: a fitted :class:`SINDy` instance
+
+        Notes
+        -----
+        The model must not be used, or fit again, while ``afit`` runs; use
+        one model per concurrent fit (e.g. with :func:`sklearn.base.clone`).
+        """
+        fitted = await _run_in_executor(
+            self, "fit", (x,) + args, kwargs, executor, progress
+        )
+        if fitted is not self:
+            # Fitted in another process
+            self.__dict__.update(fitted.__dict__)
+        return self
+
+    def fit_path(
+        self,
+        x,
+        thresholds,
+        t=None,
+        x_dot=None,
+        u=None,
+        multiple_trajectories=False,
+        unbias=True,
+        quiet=False,
+    ):
+        """
+        Fit the optimizer for a sequence of thresholds on the same data.
+
+        Derivatives and the feature library are computed once. Unless the
+        optimizer fits an intercept, the Gram matrix of the library is formed
+        once and each threshold is fit on the
+        equivalent compressed problem described in :meth:`finalize`, so
+        each fit costs time independent of the number of samples. Each fit
+        is warm-started from the coefficients of the previous threshold,
+        so thresholds are best given in increasing order.
+
+        The model itself is not refit; choose a threshold from the returned
+        path and call :meth:`fit` (cheaply, with a ``feature_cache``) to
+        obtain the final model.
+
+        Parameters
+        ----------
+        x: array-like or list of array-like, shape (n_samples, n_input_features)
+            Training data. See :meth:`fit`.
+
+        thresholds: array-like of floats
+            Values of the optimizer's ``threshold`` parameter.
+
+        t, x_dot, u, multiple_trajectories, unbias, quiet:
+            See :meth:`fit`.
+
+        Returns
+        -------
+        path: dict
+            ``"thresholds"``: the thresholds, shape (n_thresholds,).
+            ``"coefficients"``: the coefficients for each threshold, shape
+            (n_thresholds, n_targets, n_output_features).
+            ``"intercepts"``: shape (n_thresholds, n_targets).
+            ``"residuals"``: sum of squared residuals of each target over
+            the training data, shape (n_thresholds, n_targets).
+            ``"complexity"``: number of nonzero coefficients (and
+            intercepts), shape (n_thresholds,).
+            ``"n_samples"``: number of training samples used.
+        """
+        if "threshold" not in self.optimizer.get_params():
+            raise ValueError(
+                f"{type(self.optimizer).__name__} has no threshold parameter"
+            )
+        thresholds = np.asarray(thresholds, dtype=float).ravel()
+        with _filter_fit_warnings(quiet):
+            _, theta, x_dot = self._library_features(
+                x, t, x_dot, u, multiple_trajectories
+            )
+        theta, x_dot = drop_nan_samples(theta, x_dot)
+        gram = GramStatistics(theta.shape[1], x_dot.shape[1]).update(theta, x_dot)
+        if hasattr(self.optimizer, "unbias"):
+            unbias = self.optimizer.unbias
+        compress = not getattr(self.optimizer, "fit_intercept", False)
+        if compress:
+            theta, x_dot = gram.to_least_squares()
+        warm_start = "initial_guess" in self.optimizer.get_params()
+
+        coefs, intercepts = [], []
+        for threshold in thresholds:
+            params = {"threshold": threshold}
+            if warm_start and coefs:
+                params["initial_guess"] = coefs[-1]
+            optimizer = SINDyOptimizer(
+                clone(self.optimizer).set_params(**params), unbias=unbias
+            )
+            with _filter_fit_warnings(quiet):
+                optimizer.fit(theta, x_dot, check_input=False)
+            coefs.append(np.array(optimizer.coef_))
+            intercepts.append(np.broadcast_to(optimizer.intercept_, x_dot.shape[1]))
+
+        coefs = np.array(coefs)
+        intercepts = np.array(intercepts, dtype=float)
+        if compress:
+            residuals = np.array([gram.residual(coef) for coef in coefs])
+        else:
+            residuals = np.array(
+                [
+                    np.sum((x_dot - theta @ coef.T - intercept) ** 2, axis=0)
+                    for coef, intercept in zip(coefs, intercepts)
+                ]
+            )
+        return {
+            "thresholds": thresholds,
+            "coefficients": coefs,
+            "intercepts": intercepts,
+            "residuals": residuals,
+            "complexity": np.count_nonzero(coefs, axis=(1, 2))
+            + np.count_nonzero(intercepts, axis=1),
+            "n_samples": gram.n_samples,
+        }
+
+    def _library_features(self, x, t, x_dot, u, multiple_trajectories, use_cache=True):
+        """
+        Compute the library matrix and derivatives used for fitting.
+
+        Fits the feature library, and looks up or stores the result in
+        ``feature_cache`` if one is set. Returns the list of validated
+        trajectories (None on a cache hit), the concatenated library matrix
+        and the concatenated derivatives.
+        """
+        key = None
+        if self.feature_cache is not None and use_cache:
+            with profile_stage("feature_cache"):
+                key = fingerprint(
+                    x,
+                    self.t_default if t is None else t,
+                    x_dot,
+                    u,
+                    multiple_trajectories,
+                    self.discrete_time,
+                    self.differentiation_method,
+                    self.feature_library,
+                    self.dtype,
+                )
+                cached = self.feature_cache.get(key)
+            if cached is not None:
+                theta, x_dot, self.n_control_features_, library_state = cached
+                self.feature_library.__dict__.update(deepcopy(library_state))
+                return None, theta, x_dot
+
+        x, x_dot, self.n_control_features_ = self._prepare_training_data(
+            x, t, x_dot, u, multiple_trajectories
+        )
+        with profile_stage("library_fit"):
+            self.feature_library.fit(x)
+        theta = concat_sample_axis(self._transform_trajectories(x))
+        x_dot = concat_sample_axis(x_dot)
+        if key is not None:
+            library_state = {
+                k: v
+                for k, v in self.feature_library.__dict__.items()
+                if k not in _TRANSIENT_ATTRIBUTES
+            }
+            self.feature_cache.put(
+                key,
+                (theta, x_dot, self.n_control_features_, deepcopy(library_state)),
+            )
+        return x, theta, x_dot
+
+    def partial_fit(self, x, t=None, x_dot=None, u=None, multiple_trajectories=False):
+        """
+        Accumulate a chunk of training data without storing it.
+
+        Each chunk is differentiated (unless ``x_dot`` is given) and passed
+        through the feature library, and only the Gram statistics
+        :math:`\\Theta^\\top \\Theta`, :math:`\\Theta^\\top \\dot X`,
+        :math:`\\dot X^\\top \\dot X` and the sample count are kept (see
+        :class:`pysindy.utils.GramStatistics`). Memory use therefore depends
+        only on the library size, not on the amount of data. Call
+        :meth:`finalize` to run the optimizer on the accumulated statistics.
+
+        The feature library is fit on the first chunk. Chunks are
+        differentiated independently, so each chunk should be long compared
+        with the stencil of the differentiation method.
+
+        Parameters
+        ----------
+        x: array-like or list of array-like, shape (n_samples, n_input_features)
+            Chunk of training data. See :meth:`fit`.
+
+        t: float, numpy array of shape (n_samples,), or list of numpy arrays, optional \
+                (default None)
+            Time step or sample times of the chunk. See :meth:`fit`.
 
+        x_dot: array-like or list of array-like, optional (default None)
+            Optional pre-computed derivatives of the chunk.
+
+        u: array-like or list of array-like, optional (default None)
+            Control variables of the chunk. Must be given for every chunk
+            if it is given for the first one.
+
+        multiple_trajectories: boolean, optional, (default False)
+            Whether the chunk consists of several trajectories.
+
+        Returns
+        -------
+        self: the updated :class:`SINDy` instance
+        """
+        x, x_dot, n_control_features = self._prepare_training_data(
+            x, t, x_dot, u, multiple_trajectories
+        )
+        return self._accumulate(x, x_dot, n_control_features)
+
+    def _accumulate(self, x, x_dot, n_control_features):
+        """Fold validated trajectories into the running Gram statistics."""
+        if not hasattr(self, "gram_"):
+            with profile_stage("library_fit"):
+                self.feature_library.fit(x)
+            self.n_control_features_ = n_control_features
+            self.gram_ = GramStatistics(
+                self.feature_library.n_output_features_,
+                x_dot[0].shape[x_dot[0].ax_coord],
+            )
+        elif n_control_features != self.n_control_features_:
+            raise ValueError(
+                "Number of control features changed between calls to partial_fit"
+            )
+        theta, x_dot = drop_nan_samples(
+            concat_sample_axis(self._transform_trajectories(x)),
+            concat_sample_axis(x_dot),
+        )
+        with profile_stage("gram_update"):
+            self.gram_.update(theta, x_dot)
+        return self
+
+    def finalize(self, unbias=True, quiet=False):
+        """
+        Fit the model from the statistics accumulated by :meth:`partial_fit`.
+
+        The optimizer is run on a least-squares problem with at most
+        ``n_output_features`` rows whose normal equations match those of
+        the accumulated data, which gives the same coefficients as calling
+        :meth:`fit` on all chunks at once for optimizers that only depend
+        on the data through a least-squares loss (e.g. :class:`STLSQ`,
+        :class:`SR3`). More data can still be added with :meth:`partial_fit`
+        and :meth:`finalize` called again.
+
+        Parameters
+        ----------
+        unbias: boolean, optional (default True)
+            See :meth:`fit`.
+
+        quiet: boolean, optional (default False)
+            Whether or not to suppress warnings during model fitting.
+
+        Returns
+        -------
+        self: a fitted :class:`SINDy` instance
+        """
+        if not hasattr(self, "gram_"):
+            raise ValueError("partial_fit must be called before finalize")
+        if getattr(self.optimizer, "fit_intercept", False):
+            raise ValueError(
+                "Fitting from accumulated statistics requires fit_intercept=False"
+            )
+        if hasattr(self.optimizer, "unbias"):
+            unbias = self.optimizer.unbias
+
+        theta, x_dot = self.gram_.to_least_squares()
+        optimizer = SINDyOptimizer(self.optimizer, unbias=unbias)
+        with _filter_fit_warnings(quiet), profile_stage("optimizer"):
+            optimizer.fit(theta, x_dot, check_input=False)
+        self.model = Pipeline(
+            [
+                ("features", self.feature_library),
+                ("shaping", SampleConcatter()),
+                ("model", optimizer),
+            ]
+        )
+        self._set_fitted_attributes()
+        return self
+
+    def _fit_blocks(self, x, t, x_dot, u, multiple_trajectories, block_size):
+        """
+        Accumulate Gram statistics over blocks of time points.
+
+        Each block is read from (possibly memory-mapped) storage together with
+        a halo of neighbouring time points, differentiated, trimmed back to
+        the block and folded into the statistics.
+        """
+        if not isinstance(block_size, int) or block_size <= 0:
+            raise ValueError("block_size must be a positive integer")
+        if t is None:
+            t = self.t_default
+        if not multiple_trajectories:
+            x, t, x_dot, u = _adapt_to_multiple_trajectories(
+                _open_out_of_core(x), t, x_dot, u
+            )
+        elif not isinstance(x, Sequence):
+            raise TypeError("If multiple trajectories set, x must be a Sequence")
+        library = self.feature_library
+        if hasattr(library, "K") or getattr(library, "implicit_terms", False):
+            raise ValueError(
+                "Blockwise fitting is not supported for libraries that "
+                "integrate or differentiate in time"
+            )
+        if x_dot is not None or self.discrete_time:
+            halo = 0
+        else:
+            halo = _differentiation_halo(self.differentiation_method)
+
+        for i, xi in enumerate(x):
+            xi = _open_out_of_core(xi)
+            if xi.ndim == 1:
+                xi = xi[:, np.newaxis]
+            ti = t[i] if isinstance(t, Sequence) else t
+            x_dot_i = None if x_dot is None else _open_out_of_core(x_dot[i])
+            if x_dot_i is not None and x_dot_i.ndim == 1:
+                x_dot_i = x_dot_i[:, np.newaxis]
+            u_i = None if u is None else _open_out_of_core(u[i])
+            n_time = xi.shape[-2]
+            # Discrete-time blocks need the first point of the next block
+            overlap = 1 if self.discrete_time and x_dot is None else 0
+            for start in range(0, n_time - overlap, block_size):
+                stop = min(start + block_size, n_time - overlap)
+                lo, hi = max(start - halo, 0), min(stop + halo + overlap, n_time)
+                t_block = ti[lo:hi] if np.ndim(ti) > 0 else ti
+                xb, x_dot_b, n_control = self._prepare_training_data(
+                    np.asarray(xi[..., lo:hi, :]),
+                    t_block,
+                    None if x_dot_i is None else np.asarray(x_dot_i[..., lo:hi, :]),
+                    None if u_i is None else _time_slice(u_i, xi, lo, hi),
+                    False,
+                )
+                keep = slice(start - lo, start - lo + stop - start)
+                self._accumulate(
+                    [xb[0][..., keep, :]], [x_dot_b[0][..., keep, :]], n_control
+                )
+
+    def _prepare_training_data(self, x, t, x_dot, u, multiple_trajectories):
+        """
+        Validate training data, compute derivatives and append control inputs.
+
+        Returns the lists of (possibly control-augmented) trajectories and
+        their derivatives, along with the number of control features.
+        """
+        if isinstance(x, RaggedTrajectories):
+            if self.feature_library._pointwise:
+                return self._prepare_ragged_data(x, t, x_dot, u)
+            # Libraries that mix samples need each trajectory on its own
+            x, t, x_dot, u = _split_ragged(x, t, x_dot, u)
+            multiple_trajectories = True
+        if t is None:
+            t = self.t_default
+
+        if not multiple_trajectories:
+            x, t, x_dot, u = _adapt_to_multiple_trajectories(x, t, x_dot, u)
+        elif (
+            not isinstance(x, Sequence)
+            or (not isinstance(x_dot, Sequence) and x_dot is not None)
+            or (not isinstance(u, Sequence) and u is not None)
+        ):
+            raise TypeError(
+                "If multiple trajectories set, x and if included,"
+                "x_dot and u, must be Sequences"
+            )
+        x, x_dot, u = _comprehend_and_validate_inputs(
+            x, t, x_dot, u, self.feature_library
+        )
+        if self.dtype is not None:
+            x, x_dot, u = (
+                None if v is None else [vi.astype(self.dtype, copy=False) for vi in v]
+                for v in (x, x_dot, u)
+            )
+
+        if u is None:
+            n_control_features = 0
+        else:
+            u = validate_control_variables(
+                x,
+                u,
+                trim_last_point=(self.discrete_time and x_dot is None),
+            )
+            n_control_features = u[0].shape[u[0].ax_coord]
+        with profile_stage("differentiation"):
+            x, x_dot = self._process_multiple_trajectories(x, t, x_dot)
+
+        # Append control variables
+        if u is not None:
+            x = [np.concatenate((xi, ui), axis=xi.ax_coord) for xi, ui in zip(x, u)]
+        return x, x_dot, n_control_features
+
+    def _prepare_ragged_data(self, x, t, x_dot, u):
+        """
+        Vectorized ``_prepare_training_data`` for RaggedTrajectories.
+
+        The samples of all trajectories are differentiated together (see
+        ``_differentiate_ragged``) and returned as a single "trajectory",
+        which the pointwise feature library can transform in one call.
+        """
+        if t is None:
+            t = self.t_default if x.t is None else x.t
+        data = _ragged_buffer(x, x)
+        x_dot = None if x_dot is None else _ragged_buffer(x_dot, x)
+        u = None if u is None else _ragged_buffer(u, x)
+        if self.dtype is not None:
+            data, x_dot, u = (
+                None if v is None else v.astype(self.dtype, copy=False)
+                for v in (data, x_dot, u)
+            )
+        n_control_features = 0 if u is None else u.shape[1]
+
+        with profile_stage("differentiation"):
+            if x_dot is None and self.discrete_time:
+                last = np.zeros(len(data), dtype=bool)
+                last[x.offsets[1:] - 1] = True
+                x_dot = data[np.roll(~last, 1)]
+                data = data[~last]
+                u = None if u is None else u[~last]
+            elif x_dot is None:
+                x_dot = _differentiate_ragged(
+                    self.differentiation_method, x.like(data), t
+                )
+
+        if u is not None:
+            data = np.concatenate((data, u), axis=1)
+        axes = {"ax_time": 0, "ax_coord": 1}
+        return [AxesArray(data, axes)], [AxesArray(x_dot, axes)], n_control_features
+
+    def _set_fitted_attributes(self):
         # New version of sklearn changes attribute name
         if float(__version__[:3]) >= 1.0:
             self.n_features_in_ = self.model.steps[0][1].n_features_in_
@@ -429,13 +982,52 @@ class SINDy(BaseEstimator):
             for i in range(self.n_control_features_):
                 feature_names.append("u" + str(i))
             self.feature_names = feature_names
+        if self.lean:
+            self.compact()
+
+    def compact(self):
+        """
+        Drop the training data and per-fit buffers held by the fitted model.
 
+        A fitted model keeps a reference to the whole library matrix in the
+        optimizer (``Theta_``), every iterate of the optimization
+        (``history_`` and the other histories of the optimizer) and, for weak
+        libraries, the scratch arrays of the last transform, so its size
+        (in memory and pickled) grows with the training data. None of this
+        is needed by :meth:`predict`, :meth:`simulate`, :meth:`score` or
+        :meth:`equations`, which keep working after compacting. The Gram
+        statistics of :meth:`partial_fit` are kept, so more data can still
+        be added.
+
+        See also the ``max_history`` parameter of the iterative optimizers,
+        which bounds the history during the fit.
+
+        Returns
+        -------
+        self: the compacted :class:`SINDy` instance
+        """
+        check_is_fitted(self, "model")
+        for optimizer in _nested_estimators(
+            [self.optimizer, self.model.steps[-1][1]], ("optimizer", "opt")
+        ):
+            for name in list(vars(optimizer)):
+                if name == "Theta_" or "history" in name and name.endswith("_"):
+                    delattr(optimizer, name)
+        for library in _nested_estimators(
+            [self.feature_library, self.model.steps[0][1]],
+            ("libraries", "libraries_", "libraries_full_"),
+        ):
+            for name in _TRANSIENT_ATTRIBUTES.intersection(vars(library)):
+                delattr(library, name)
         return self
 
     def predict(self, x, u=None, multiple_trajectories=False):
         """
         Predict the time derivatives using the SINDy model.
 
+        Only the library features with a nonzero coefficient are computed, if
+        the feature library acts on each sample separately.
+
         Parameters
         ----------
         x: array-like or list of array-like, shape (n_samples, n_input_features)
@@ -454,8 +1046,18 @@ class SINDy(BaseEstimator):
         Returns
         -------
         x_dot: array-like or list of array-like, shape (n_samples, n_input_features)
-            Predicted time derivatives
+            Predicted time derivatives. A RaggedTrajectories x gives a
+            RaggedTrajectories of predictions.
         """
+        if isinstance(x, RaggedTrajectories):
+            if not self.feature_library._pointwise:
+                x_list, _, _, u = _split_ragged(x, None, None, u)
+                return RaggedTrajectories.from_list(
+                    self.predict(x_list, u, multiple_trajectories=True)
+                )
+            u = None if u is None else [_ragged_buffer(u, x)]
+            result = self.predict([x.data], u, multiple_trajectories=True)[0]
+            return x.like(result, x.t)
         if not multiple_trajectories:
             x, _, _, u = _adapt_to_multiple_trajectories(x, None, None, u)
         x, _, u = _comprehend_and_validate_inputs(x, 1, None, u, self.feature_library)
@@ -474,7 +1076,16 @@ class SINDy(BaseEstimator):
         if u is not None:
             u = validate_control_variables(x, u)
             x = [np.concatenate((xi, ui), axis=xi.ax_coord) for xi, ui in zip(x, u)]
-        result = [self.model.predict([xi]) for xi in x]
+        if self._evaluates_active_terms():
+            library, active, coef_T, intercept = self._active_terms()
+            result = []
+            for xi in x:
+                theta = library.transform_columns(
+                    np.asarray(xi).reshape(-1, xi.shape[-1]), active
+                )
+                result.append(theta @ coef_T + intercept)
+        else:
+            result = [self.model.predict([xi]) for xi in x]
         result = [
             self.feature_library.reshape_samples_to_spatial_grid(pred)
             for pred in result
@@ -525,7 +1136,7 @@ class SINDy(BaseEstimator):
             Precision to be used when printing out model coefficients.
         """
         eqns = self.equations(precision)
-        if sindy_pi_flag and isinstance(self.optimizer, SINDyPI):
+        if _is_sindy_pi(self.optimizer):
             feature_names = self.get_feature_names()
         else:
             feature_names = self.feature_names
@@ -534,7 +1145,7 @@ class SINDy(BaseEstimator):
                 names = "(" + feature_names[i] + ")"
                 print(names + "[k+1] = " + eqn)
             elif lhs is None:
-                if not sindy_pi_flag or not isinstance(self.optimizer, SINDyPI):
+                if not _is_sindy_pi(self.optimizer):
                     names = "(" + feature_names[i] + ")"
                     print(names + "' = " + eqn)
                 else:
@@ -551,7 +1162,7 @@ class SINDy(BaseEstimator):
         u=None,
         multiple_trajectories=False,
         metric=r2_score,
-        **metric_kws
+        **metric_kws,
     ):
         """
         Returns a score for the time derivative prediction produced by the model.
@@ -600,6 +1211,12 @@ class SINDy(BaseEstimator):
         score: float
             Metric function value for the model prediction of x_dot.
         """
+        if isinstance(x, RaggedTrajectories):
+            if not self.feature_library._pointwise:
+                x, t, x_dot, u = _split_ragged(x, t, x_dot, u)
+                multiple_trajectories = True
+            else:
+                return self._score_ragged(x, t, x_dot, u, metric, **metric_kws)
 
         if t is None:
             t = self.t_default
@@ -624,6 +1241,37 @@ class SINDy(BaseEstimator):
         x_dot, x_dot_predict = drop_nan_samples(x_dot, x_dot_predict)
         return metric(x_dot, x_dot_predict, **metric_kws)
 
+    async def ascore(self, x, *args, executor=None, **kwargs):
+        """
+        Score the model without blocking the event loop.
+
+        Coroutine version of :meth:`score`, run in ``executor`` (see
+        :meth:`afit`).
+
+        Returns
+        -------
+        score: float
+        """
+        return await _run_in_executor(
+            self, "score", (x,) + args, kwargs, executor, None
+        )
+
+    def _score_ragged(self, x, t, x_dot, u, metric, **metric_kws):
+        """Vectorized ``score`` for RaggedTrajectories and a pointwise library."""
+        x_dot_predict = self.predict(x, u)
+        if x_dot is not None:
+            x_dot = _ragged_buffer(x_dot, x)
+        elif self.discrete_time:
+            x_dot = x.trim(start=1).data
+            x_dot_predict = x_dot_predict.trim(stop=1)
+        else:
+            x_dot = self.differentiate(x, t).data
+        axes = {"ax_sample": 0, "ax_coord": 1}
+        x_dot, x_dot_predict = drop_nan_samples(
+            AxesArray(x_dot, axes), AxesArray(x_dot_predict.data, axes)
+        )
+        return metric(x_dot, x_dot_predict, **metric_kws)
+
     def _process_multiple_trajectories(self, x, t, x_dot):
         """
         Calculate derivatives of input data, iterating through trajectories.
@@ -662,14 +1310,32 @@ class SINDy(BaseEstimator):
                 x_dot = [xi[1:] for xi in x]
                 x = [xi[:-1] for xi in x]
             else:
-                x_dot = [
-                    self.feature_library.calc_trajectory(
-                        self.differentiation_method, xi, ti
-                    )
-                    for xi, ti in _zip_like_sequence(x, t)
-                ]
+                # Differentiation methods cache stencils on themselves, so
+                # each trajectory gets its own shallow copy
+                x_dot = self._map_trajectories(
+                    lambda xi, ti: self.feature_library.calc_trajectory(
+                        copy(self.differentiation_method), xi, ti
+                    ),
+                    _zip_like_sequence(x, t),
+                )
         return x, x_dot
 
+    def _transform_trajectories(self, x):
+        """Apply the fitted feature library to each trajectory in x."""
+        with profile_stage("library_transform"):
+            return self._map_trajectories(
+                lambda xi: self.feature_library.transform([xi])[0], zip(x)
+            )
+
+    def _map_trajectories(self, func, args):
+        """Call func on each tuple of arguments, in parallel if ``n_jobs`` is set."""
+        args = list(args)
+        if self.n_jobs in (None, 1) or len(args) < 2:
+            return [func(*a) for a in args]
+        return Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(func)(*a) for a in args
+        )
+
     def differentiate(self, x, t=None, multiple_trajectories=False):
         """
         Apply the model's differentiation method
@@ -693,12 +1359,23 @@ class SINDy(BaseEstimator):
         -------
         x_dot: array-like or list of array-like, shape (n_samples, n_input_features)
             Time derivatives computed by using the model's differentiation
-            method
+            method. A RaggedTrajectories x gives a RaggedTrajectories of
+            derivatives.
         """
+        if isinstance(x, RaggedTrajectories) and t is None:
+            t = x.t
         if t is None:
             t = self.t_default
         if self.discrete_time:
             raise RuntimeError("No differentiation implemented for discrete time model")
+        if isinstance(x, RaggedTrajectories):
+            if not self.feature_library._pointwise:
+                x_list, t_list, _, _ = _split_ragged(x, t, None, None)
+                return RaggedTrajectories.from_list(
+                    self.differentiate(x_list, t_list, multiple_trajectories=True)
+                )
+            x_dot = _differentiate_ragged(self.differentiation_method, x, t)
+            return x.like(x_dot, x.t)
         if not multiple_trajectories:
             x, t, _, _ = _adapt_to_multiple_trajectories(x, t, None, None)
         x, _, _ = _comprehend_and_validate_inputs(
@@ -737,6 +1414,285 @@ class SINDy(BaseEstimator):
             input_features=self.feature_names
         )
 
+    def compile_rhs(self, u=None):
+        """
+        Build a lightweight right-hand side function for the fitted model.
+
+        The fitted feature library, coefficients and intercept are captured
+        once, so evaluating the returned function skips the input validation,
+        axis bookkeeping and pipeline dispatch performed by :meth:`predict`
+        on every call. This is the function that :meth:`simulate` hands to
+        the integrator.
+
+        Parameters
+        ----------
+        u: function from R^1 to R^{n_control_features}, optional (default None)
+            Control inputs as a function of time. Required if the model was fit
+            with control variables, ignored otherwise.
+
+        Returns
+        -------
+        rhs: callable
+            Function ``rhs(t, x)`` returning the time derivative (or, for a
+            discrete time model, the next state) at state ``x``. ``x`` may be a
+            single state of shape (n_features,) or a batch of states of shape
+            (n_samples, n_features); the result has the same shape as ``x``.
+        """
+        check_is_fitted(self, "model")
+        if u is None and self.n_control_features_ > 0:
+            raise TypeError("Model was fit using control variables, so u is required")
+        if self.n_control_features_ == 0:
+            u = None
+
+        n_control_features = self.n_control_features_
+        if not self._evaluates_active_terms():
+
+            def rhs(t, x):
+                x = np.asarray(x)
+                x_2d = x.reshape(-1, x.shape[-1])
+                if u is None:
+                    return self.predict(x_2d).reshape(x.shape)
+                u_t = np.reshape(u(t), (-1, n_control_features))
+                u_t = np.broadcast_to(u_t, (x_2d.shape[0], n_control_features))
+                return self.predict(x_2d, u_t).reshape(x.shape)
+
+            return rhs
+
+        library, active, coef_T, intercept = self._active_terms()
+
+        def rhs(t, x):
+            x = np.asarray(x)
+            x_2d = x.reshape(-1, x.shape[-1])
+            if u is not None:
+                u_t = np.reshape(u(t), (-1, n_control_features))
+                u_t = np.broadcast_to(u_t, (x_2d.shape[0], n_control_features))
+                x_2d = np.concatenate((x_2d, u_t), axis=1)
+            theta = library.transform_columns(x_2d, active)
+            return (theta @ coef_T + intercept).reshape(x.shape)
+
+        return rhs
+
+    def export(self, path, target="numpy"):
+        """
+        Write the fitted model as a standalone Python module.
+
+        The generated module only imports NumPy, and defines ``rhs(x)`` and
+        ``jacobian(x)`` (``rhs(x, u)`` and ``jacobian(x, u)`` if the model
+        was fit with control variables), which evaluate the right-hand side
+        of the model and its analytic Jacobian for a single state or a batch
+        of states. Only the active library terms are computed, and products of
+        inputs shared between terms are computed once.
+
+        Parameters
+        ----------
+        path: str or os.PathLike
+            File to write the module to, e.g. ``"model.py"``.
+
+        target: str, optional (default "numpy")
+            Language or framework of the generated code. Only ``"numpy"`` is
+            supported.
+
+        Notes
+        -----
+        The feature library must be built from
+        :class:`pysindy.PolynomialLibrary`, :class:`pysindy.IdentityLibrary`
+        and :class:`pysindy.FourierLibrary`, possibly combined with
+        :class:`pysindy.ConcatLibrary`, :class:`pysindy.TensoredLibrary` or
+        :class:`pysindy.GeneralizedLibrary`; a ``NotImplementedError`` is
+        raised otherwise.
+        """
+        if target != "numpy":
+            raise ValueError(
+                "Unknown export target {!r}; only 'numpy' is supported".format(target)
+            )
+        source = numpy_source(self)
+        with open(path, "w") as f:
+            f.write(source)
+
+    def save(self, path):
+        """
+        Save the fitted model to a file, to be restored with :meth:`load`.
+
+        Unlike pickling, only what is needed to rebuild the model is stored:
+        the coefficients (as a coordinate list if the coefficient matrix is
+        large and sparse), the parameters of the model, feature library,
+        optimizer and differentiation method, and the fitted sizes, feature
+        names and number of control inputs. The file is an uncompressed
+        ``.npz`` archive with a versioned JSON description of the model, see
+        :mod:`pysindy.serialization`.
+
+        Parameters
+        ----------
+        path: str or os.PathLike
+            File to write the model to, e.g. ``"model.npz"``.
+
+        Notes
+        -----
+        Models whose feature library is not applied sample by sample (PDE,
+        weak and SINDy-PI libraries), or whose library, optimizer or
+        differentiation method hold custom functions, cannot be saved and
+        raise a ``NotImplementedError``.
+        """
+        save_model(self, path)
+
+    @staticmethod
+    def load(path, mmap_mode="r"):
+        """
+        Load a model saved with :meth:`save`.
+
+        The loaded model can predict, simulate, score and print its equations;
+        the optimizer holds the coefficients but not the state of the fit
+        (e.g. its history).
+
+        Parameters
+        ----------
+        path: str or os.PathLike
+            File the model was saved to.
+
+        mmap_mode: {None, "r", "c"}, optional (default "r")
+            If not None, the coefficient matrix is memory-mapped from the file
+            rather than read into memory, so that loading many models is fast
+            and their coefficients are shared between processes.
+
+        Returns
+        -------
+        model: a fitted :class:`SINDy` instance
+        """
+        return load_model(path, mmap_mode)
+
+    def _active_terms(self):
+        """
+        The fitted library, the indices of the library features with a nonzero
+        coefficient in some equation, their coefficients (transposed) and the
+        intercept.
+
+        :meth:`predict` and :meth:`compile_rhs` only evaluate these features
+        (see ``transform_columns`` of the feature libraries), so their cost
+        scales with the number of terms in the model rather than with the
+        size of the library.
+        """
+        optimizer = self.model.steps[-1][1]
+        coef = np.asarray(optimizer.coef_)
+        active = np.flatnonzero(np.any(coef != 0, axis=0))
+        return self.model.steps[0][1], active, coef[:, active].T, optimizer.intercept_
+
+    def _evaluates_active_terms(self):
+        """
+        Whether the model can be evaluated with :meth:`_active_terms`.
+
+        This needs a pointwise library whose coefficients index the features
+        of ``transform_columns``. Library ensembling breaks the latter, since
+        ``transform`` then drops the features at ``ensemble_indices``.
+        """
+        library = self.model.steps[0][1]
+        coef = self.model.steps[-1][1].coef_
+        return library._pointwise and np.shape(coef)[-1] == library.n_output_features_
+
+    def compile_jacobian(self, u=None):
+        """
+        Build a function evaluating the analytic Jacobian of the fitted model.
+
+        The model is linear in the library features, so its Jacobian is the
+        coefficient matrix applied to the derivatives of the features, which
+        the feature library computes in closed form
+        (see ``transform_derivative``). Like :meth:`compile_rhs`, all fitted
+        state is captured once.
+
+        Parameters
+        ----------
+        u: function from R^1 to R^{n_control_features}, optional (default None)
+            Control inputs as a function of time. Required if the model was fit
+            with control variables, ignored otherwise.
+
+        Returns
+        -------
+        jac: callable
+            Function ``jac(t, x)`` returning the Jacobian of the right-hand side
+            with respect to the state at ``x``. ``x`` may be a single state of
+            shape (n_features,), giving an array of shape
+            (n_features, n_features), or a batch of states of shape
+            (n_samples, n_features), giving an array of shape
+            (n_samples, n_features, n_features).
+        """
+        check_is_fitted(self, "model")
+        if u is None and self.n_control_features_ > 0:
+            raise TypeError("Model was fit using control variables, so u is required")
+        if self.n_control_features_ == 0:
+            u = None
+
+        library = self.model.steps[0][1]
+        coef = np.asarray(self.model.steps[-1][1].coef_)
+        if coef.shape[-1] != library.n_output_features_:
+            raise NotImplementedError(
+                "The Jacobian of a model fit with library ensembling is not supported"
+            )
+        n_control_features = self.n_control_features_
+
+        def jac(t, x):
+            x = np.asarray(x)
+            x_2d = x.reshape(-1, x.shape[-1])
+            if u is not None:
+                u_t = np.reshape(u(t), (-1, n_control_features))
+                u_t = np.broadcast_to(u_t, (x_2d.shape[0], n_control_features))
+                x_2d = np.concatenate((x_2d, u_t), axis=1)
+            dtheta = library.transform_derivative(x_2d)[..., : x.shape[-1]]
+            return np.matmul(coef, dtheta).reshape(x.shape[:-1] + 2 * x.shape[-1:])
+
+        return jac
+
+    def jacobian(self, x, u=None):
+        """
+        Evaluate the Jacobian of the fitted right-hand side.
+
+        Parameters
+        ----------
+        x: numpy array, shape (n_features,) or (n_samples, n_features)
+            State(s) at which to evaluate the Jacobian.
+
+        u: numpy array, shape (n_control_features,) or \
+                (n_samples, n_control_features), optional (default None)
+            Control inputs at the given state(s). Required if the model was fit
+            with control variables.
+
+        Returns
+        -------
+        jac: numpy array, shape (n_features, n_features) or \
+                (n_samples, n_features, n_features)
+            ``jac[..., i, j]`` is the derivative of the ith equation with respect
+            to the jth state variable.
+        """
+        if u is not None:
+            u_values = np.asarray(u)
+            return self.compile_jacobian(u=lambda t: u_values)(None, x)
+        return self.compile_jacobian()(None, x)
+
+    def _integrator_jacobian(
+        self, integrator, integrator_kws, t0, x0, u=None, use_jacobian=None
+    ):
+        """Analytic Jacobian to pass to the integrator, or None.
+
+        See ``use_jacobian`` of :meth:`simulate`. Never returned if the user
+        supplied a Jacobian, or if it cannot be evaluated at the initial
+        condition, in which case the integrator approximates it as usual.
+        """
+        if use_jacobian is False:
+            return None
+        if integrator == "solve_ivp":
+            methods = ("Radau", "BDF", "LSODA") if use_jacobian else ("Radau", "BDF")
+            if "jac" in integrator_kws or integrator_kws.get("method") not in methods:
+                return None
+        elif integrator == "odeint":
+            if "Dfun" in integrator_kws or not use_jacobian:
+                return None
+        else:
+            return None
+        try:
+            jac = self.compile_jacobian(u=u)
+            jac(t0, x0)
+        except Exception:
+            return None
+        return jac
+
     def simulate(
         self,
         x0,
@@ -747,6 +1703,7 @@ class SINDy(BaseEstimator):
         interpolator=None,
         integrator_kws={"method": "LSODA", "rtol": 1e-12, "atol": 1e-12},
         interpolator_kws={},
+        use_jacobian=None,
     ):
         """
         Simulate the SINDy model forward in time.
@@ -793,6 +1750,14 @@ class SINDy(BaseEstimator):
         interpolator_kws: dict, optional (default {})
             Optional keyword arguments to pass to the control input interpolator
 
+        use_jacobian: bool, optional (default None)
+            Whether to pass the analytic Jacobian of the model (see
+            :meth:`compile_jacobian`) to the integrator. By default it is only
+            passed to the implicit ``Radau`` and ``BDF`` methods of
+            ``solve_ivp``; True also passes it to ``LSODA`` and ``odeint``, and
+            False never passes it. It is not passed if ``integrator_kws``
+            supplies a Jacobian, or if the feature library cannot evaluate it.
+
         Returns
         -------
         x: numpy array, shape (n_samples, n_features)
@@ -832,15 +1797,13 @@ class SINDy(BaseEstimator):
                         "Control variables u were ignored because control "
                         "variables were not used when the model was fit"
                     )
-                for i in range(1, t):
-                    x[i] = self.predict(x[i - 1 : i])
-                    if check_stop_condition(x[i]):
-                        return x[: i + 1]
+                step = self.compile_rhs()
             else:
-                for i in range(1, t):
-                    x[i] = self.predict(x[i - 1 : i], u=u[i - 1, np.newaxis])
-                    if check_stop_condition(x[i]):
-                        return x[: i + 1]
+                step = self.compile_rhs(u=lambda k: u[k])
+            for i in range(1, t):
+                x[i] = step(i - 1, x[i - 1])
+                if check_stop_condition(x[i]):
+                    return x[: i + 1]
             return x
         else:
             if np.isscalar(t):
@@ -856,52 +1819,187 @@ class SINDy(BaseEstimator):
                         "variables were not used when the model was fit"
                     )
 
-                def rhs(t, x):
-                    return self.predict(x[np.newaxis, :])[0]
+                u_fun = None
 
             else:
-                if not callable(u):
-                    if interpolator is None:
-                        u_fun = interp1d(
-                            t, u, axis=0, kind="cubic", fill_value="extrapolate"
-                        )
-                    else:
-                        u_fun = interpolator(t, u, **interpolator_kws)
-
-                    t = t[:-1]
-                    warnings.warn(
-                        "Last time point dropped in simulation because "
-                        "interpolation of control input was used. To avoid "
-                        "this, pass in a callable for u."
-                    )
-                else:
-                    u_fun = u
-
-                if u_fun(t[0]).ndim == 1:
-
-                    def rhs(t, x):
-                        return self.predict(x[np.newaxis, :], u_fun(t).reshape(1, -1))[
-                            0
-                        ]
-
-                else:
-
-                    def rhs(t, x):
-                        return self.predict(x[np.newaxis, :], u_fun(t))[0]
+                u_fun, t = _control_function(t, u, interpolator, interpolator_kws)
+            rhs = self.compile_rhs(u=u_fun)
 
             # Need to hard-code below, because odeint and solve_ivp
             # have different syntax and integration options.
             if integrator == "solve_ivp":
+                jac = self._integrator_jacobian(
+                    integrator, integrator_kws, t[0], x0, u_fun, use_jacobian
+                )
+                if jac is not None:
+                    integrator_kws = {**integrator_kws, "jac": jac}
                 return (
                     (solve_ivp(rhs, (t[0], t[-1]), x0, t_eval=t, **integrator_kws)).y
                 ).T
             elif integrator == "odeint":
                 if integrator_kws.get("method") == "LSODA":
                     integrator_kws = {}
+                jac = self._integrator_jacobian(
+                    integrator, integrator_kws, t[0], x0, u_fun, use_jacobian
+                )
+                if jac is not None:
+                    integrator_kws = {**integrator_kws, "Dfun": jac}
                 return odeint(rhs, x0, t, tfirst=True, **integrator_kws)
             else:
                 raise ValueError("Integrator not supported, exiting")
 
+    async def asimulate(self, x0, t, *args, executor=None, **kwargs):
+        """
+        Simulate the model without blocking the event loop.
+
+        Coroutine version of :meth:`simulate`, run in ``executor`` (see
+        :meth:`afit`).
+
+        Returns
+        -------
+        x_sim: numpy array, shape (n_samples, n_features)
+        """
+        return await _run_in_executor(
+            self, "simulate", (x0, t) + args, kwargs, executor, None
+        )
+
+    def simulate_batch(
+        self,
+        x0,
+        t,
+        u=None,
+        integrator="solve_ivp",
+        interpolator=None,
+        integrator_kws={"method": "LSODA", "rtol": 1e-12, "atol": 1e-12},
+        interpolator_kws={},
+        use_jacobian=None,
+    ):
+        """
+        Simulate the SINDy model forward in time from many initial conditions.
+
+        All initial conditions are advanced together, so every evaluation of
+        the right-hand side transforms the whole batch with a single call to
+        the feature library. In continuous time the batch is integrated as one
+        system of size ``n_initial_conditions * n_features``: the integrator
+        chooses a common step size and its error control covers all
+        trajectories at once. For large, non-stiff batches an explicit method
+        (e.g. ``integrator_kws={"method": "RK45", ...}``) avoids LSODA building
+        dense Jacobians of the full system.
+
+        Parameters
+        ----------
+        x0: numpy array, shape (n_initial_conditions, n_features)
+            Initial conditions from which to simulate.
+
+        t: int or numpy array of size [n_samples]
+            If the model is in continuous time, t must be an array of time
+            points at which to simulate. If the model is in discrete time,
+            t must be an integer indicating how many steps to predict.
+
+        u: function from R^1 to R^{n_control_features} or list/array, optional \
+            (default None)
+            Control inputs, shared by all initial conditions. See
+            :meth:`simulate` for the accepted formats.
+
+        integrator: string, optional (default ``solve_ivp``)
+            Function to use to integrate the system.
+            Default is ``scipy.integrate.solve_ivp``. The only options
+            currently supported are solve_ivp and odeint.
+
+        interpolator: callable, optional (default ``interp1d``)
+            Function used to interpolate control inputs if ``u`` is an array.
+            Default is ``scipy.interpolate.interp1d``.
+
+        integrator_kws: dict, optional (default {})
+            Optional keyword arguments to pass to the integrator
+
+        interpolator_kws: dict, optional (default {})
+            Optional keyword arguments to pass to the control input interpolator
+
+        use_jacobian: bool, optional (default None)
+            Whether to pass the analytic Jacobian of the model to the ``Radau``
+            and ``BDF`` methods of ``solve_ivp``, which is done unless False.
+            See :meth:`simulate`.
+
+        Returns
+        -------
+        x: numpy array, shape (n_initial_conditions, n_samples, n_features)
+            Simulation results
+        """
+        check_is_fitted(self, "model")
+        if u is None and self.n_control_features_ > 0:
+            raise TypeError("Model was fit using control variables, so u is required")
+        if u is not None and self.n_control_features_ == 0:
+            warnings.warn(
+                "Control variables u were ignored because control "
+                "variables were not used when the model was fit"
+            )
+            u = None
+
+        x0 = np.asarray(x0)
+        if x0.ndim != 2:
+            raise ValueError("x0 must have shape (n_initial_conditions, n_features)")
+        n_ic, n_features = x0.shape
+
+        if self.discrete_time:
+            if not isinstance(t, int) or t <= 0:
+                raise ValueError(
+                    "For discrete time model, t must be an integer (indicating"
+                    "the number of steps to predict)"
+                )
+            if u is None:
+                step = self.compile_rhs()
+            else:
+                step = self.compile_rhs(u=lambda k: u[k])
+            x = np.zeros((n_ic, t, n_features))
+            x[:, 0] = x0
+            for i in range(1, t):
+                x[:, i] = step(i - 1, x[:, i - 1])
+            return x
+
+        if np.isscalar(t):
+            raise ValueError(
+                "For continuous time model, t must be an array of time"
+                " points at which to simulate"
+            )
+        if u is None:
+            u_fun = None
+        else:
+            u_fun, t = _control_function(t, u, interpolator, interpolator_kws)
+        rhs = self.compile_rhs(u=u_fun)
+
+        def batch_rhs(t, x):
+            return rhs(t, x.reshape(n_ic, n_features)).ravel()
+
+        # The batch Jacobian is block diagonal, which only the integrators
+        # accepting sparse Jacobians can exploit.
+        if integrator == "solve_ivp" and integrator_kws.get("method") in (
+            "Radau",
+            "BDF",
+        ):
+            jac = self._integrator_jacobian(
+                integrator, integrator_kws, t[0], x0, u_fun, use_jacobian
+            )
+            if jac is not None:
+
+                def batch_jac(t, x):
+                    return block_diag(jac(t, x.reshape(n_ic, n_features)), "csc")
+
+                integrator_kws = {**integrator_kws, "jac": batch_jac}
+
+        if integrator == "solve_ivp":
+            sol = solve_ivp(
+                batch_rhs, (t[0], t[-1]), x0.ravel(), t_eval=t, **integrator_kws
+            )
+            x = sol.y.T
+        elif integrator == "odeint":
+            if integrator_kws.get("method") == "LSODA":
+                integrator_kws = {}
+            x = odeint(batch_rhs, x0.ravel(), t, tfirst=True, **integrator_kws)
+        else:
+            raise ValueError("Integrator not supported, exiting")
+        return np.transpose(x.reshape(-1, n_ic, n_features), (1, 0, 2))
+
     @property
     def complexity(self):
         """
@@ -910,6 +2008,201 @@ class SINDy(BaseEstimator):
         return self.model.steps[-1][1].complexity
 
 
+async def _run_in_executor(model, method, args, kwargs, executor, progress):
+    """
+    Await ``model.method(*args, **kwargs)`` run in ``executor``, monitored
+    for cancellation and progress unless the executor is a process pool.
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(executor, ProcessPoolExecutor):
+        if progress is not None:
+            raise ValueError("Progress cannot be reported from a process pool")
+        return await loop.run_in_executor(
+            executor, _call_method, model, method, args, kwargs
+        )
+    monitor = _FitMonitor(None if progress is None else progress._bind())
+    try:
+        return await loop.run_in_executor(
+            executor, partial(monitor.run, _call_method, model, method, args, kwargs)
+        )
+    except asyncio.CancelledError:
+        monitor.cancel()
+        raise
+    finally:
+        if progress is not None:
+            progress._close()
+
+
+def _call_method(model, method, args, kwargs):
+    # Module level, so that it can be sent to a process pool
+    return getattr(model, method)(*args, **kwargs)
+
+
+def _nested_estimators(estimators, attributes):
+    """The estimators and, recursively, those held in the given attributes."""
+    seen = set()
+    stack = list(estimators)
+    while stack:
+        estimator = stack.pop()
+        if id(estimator) in seen or not hasattr(estimator, "__dict__"):
+            continue
+        seen.add(id(estimator))
+        yield estimator
+        for name in attributes:
+            value = getattr(estimator, name, None)
+            if isinstance(value, (list, tuple)):
+                stack.extend(value)
+            elif value is not None:
+                stack.append(value)
+
+
+@contextmanager
+def _filter_fit_warnings(quiet):
+    """Silence (or show once) the warnings commonly raised while fitting."""
+    action = "ignore" if quiet else "default"
+    with warnings.catch_warnings():
+        warnings.filterwarnings(action, category=ConvergenceWarning)
+        warnings.filterwarnings(action, category=LinAlgWarning)
+        warnings.filterwarnings(action, category=UserWarning)
+        yield
+
+
+def _is_sindy_pi(optimizer):
+    """Whether optimizer is a SINDyPI, without importing it (and cvxpy)."""
+    module = sys.modules.get("pysindy.optimizers.sindy_pi")
+    return module is not None and isinstance(optimizer, module.SINDyPI)
+
+
+def _is_out_of_core(x):
+    """Whether x (or any trajectory in it) lives on disk."""
+    if isinstance(x, RaggedTrajectories):
+        return isinstance(x.data, np.memmap)
+    if isinstance(x, Sequence) and not isinstance(x, str):
+        return any(_is_out_of_core(xi) for xi in x)
+    return isinstance(x, (np.memmap, str, os.PathLike))
+
+
+def _open_out_of_core(x):
+    """Memory-map ``.npy`` paths; leave arrays (and memmaps) untouched."""
+    if isinstance(x, (str, os.PathLike)):
+        return np.load(x, mmap_mode="r")
+    return x
+
+
+def _time_slice(u, x, lo, hi):
+    """Read time points lo:hi of a control input shaped like x or (n_time, ...)."""
+    if np.ndim(u) == x.ndim:
+        return np.asarray(u[..., lo:hi, :])
+    if np.ndim(u) == 1 and x.ndim == 2:
+        return np.asarray(u[lo:hi])
+    raise ValueError("Blockwise fitting requires u to have the same shape as x")
+
+
+def _differentiation_halo(differentiation_method):
+    """Number of neighbouring time points needed to differentiate a block."""
+    if not isinstance(differentiation_method, FiniteDifference):
+        raise ValueError(
+            "Blockwise fitting requires a FiniteDifference-based "
+            "differentiation method or precomputed x_dot"
+        )
+    if differentiation_method.periodic:
+        raise ValueError("Blockwise fitting does not support periodic differences")
+    halo = differentiation_method.n_stencil
+    smoother_kws = getattr(differentiation_method, "smoother_kws", {})
+    return halo + smoother_kws.get("window_length", 0)
+
+
+def _ragged_buffer(v, x):
+    """Validated (total_samples, n) array of v, which is shaped like x."""
+    if isinstance(v, RaggedTrajectories):
+        if not np.array_equal(v.offsets, x.offsets):
+            raise ValueError("RaggedTrajectories must have the same offsets as x")
+        v = v.data
+    v = np.asarray(v)
+    if v.ndim == 1:
+        v = v.reshape(-1, 1)
+    if v.ndim != 2 or len(v) != len(x.data):
+        raise ValueError(
+            "Arrays accompanying a RaggedTrajectories must have shape "
+            "(total_samples, n)"
+        )
+    return validate_no_reshape(v)
+
+
+def _split_ragged(x, t, x_dot, u):
+    """Convert RaggedTrajectories arguments to lists of trajectories."""
+
+    def split(v):
+        if v is None:
+            return None
+        v = _ragged_buffer(v, x)
+        return [v[lo:hi] for lo, hi in zip(x.offsets[:-1], x.offsets[1:])]
+
+    return list(x), x.trajectory_times(t), split(x_dot), split(u)
+
+
+def _differentiate_ragged(differentiation_method, x, t):
+    """
+    Differentiate every trajectory of the RaggedTrajectories x.
+
+    Finite differences with a uniform time step are applied to the whole
+    buffer at once, as if it were one trajectory. Only the rows near the ends
+    of each trajectory, whose stencils straddle two trajectories, are wrong;
+    they are recomputed from windows of ``2 * halo`` rows at both ends of
+    every trajectory, which are stacked side by side and differentiated in a
+    single call as well. Other differentiation methods (and trajectories too
+    short for a window) are applied to all trajectories of the same length
+    at once. Only trajectories without a shared, uniform time step are
+    differentiated one by one.
+    """
+    dt = x.uniform_step(t)
+    if dt is None:
+        return np.concatenate(
+            [
+                copy(differentiation_method)(xi, t=ti)
+                for xi, ti in zip(x, x.trajectory_times(t))
+            ]
+        )
+    lengths = x.lengths
+    if (
+        isinstance(differentiation_method, FiniteDifference)
+        and not differentiation_method.periodic
+    ):
+        halo = _differentiation_halo(differentiation_method)
+        x_dot = copy(differentiation_method)(x.data, t=dt)
+        windowed = lengths >= 2 * halo
+        n_windowed = np.count_nonzero(windowed)
+        if n_windowed:
+            window = np.arange(2 * halo)
+            rows = np.concatenate(
+                [
+                    x.starts[windowed, np.newaxis] + window,
+                    x.offsets[1:][windowed, np.newaxis] - window[::-1] - 1,
+                ]
+            )
+            x_dot_ends = _differentiate_stacked(
+                differentiation_method, x.data[rows], dt
+            )
+            x_dot[rows[:n_windowed, :halo]] = x_dot_ends[:n_windowed, :halo]
+            x_dot[rows[n_windowed:, halo:]] = x_dot_ends[n_windowed:, halo:]
+        whole = ~windowed
+    else:
+        x_dot = np.empty(x.data.shape, dtype=np.result_type(x.data, np.float32))
+        whole = np.ones(len(lengths), dtype=bool)
+    for length in np.unique(lengths[whole]):
+        rows = x.starts[whole & (lengths == length), np.newaxis] + np.arange(length)
+        x_dot[rows] = _differentiate_stacked(differentiation_method, x.data[rows], dt)
+    return x_dot
+
+
+def _differentiate_stacked(differentiation_method, x, dt):
+    """Differentiate the (n_trajectories, n_time, n_coord) array x in one call."""
+    n_trajectories, n_time, n_coord = x.shape
+    columns = np.moveaxis(x, 0, 1).reshape(n_time, n_trajectories * n_coord)
+    x_dot = copy(differentiation_method)(columns, t=dt)
+    return np.moveaxis(np.reshape(x_dot, (n_time, n_trajectories, n_coord)), 1, 0)
+
+
 def _zip_like_sequence(x, t):
     """Create an iterable like zip(x, t), but works if t is scalar."""
     if isinstance(t, Sequence):
@@ -918,6 +2211,25 @@ def _zip_like_sequence(x, t):
         return product(x, [t])
 
 
+def _control_function(t, u, interpolator, interpolator_kws):
+    """Turn control inputs into a function of time for the integrators.
+
+    Returns the control function and the (possibly truncated) time points.
+    """
+    if callable(u):
+        return u, t
+    if interpolator is None:
+        u_fun = interp1d(t, u, axis=0, kind="cubic", fill_value="extrapolate")
+    else:
+        u_fun = interpolator(t, u, **interpolator_kws)
+    warnings.warn(
+        "Last time point dropped in simulation because "
+        "interpolation of control input was used. To avoid "
+        "this, pass in a callable for u."
+    )
+    return u_fun, t[:-1]
+
+
 def _adapt_to_multiple_trajectories(x, t, x_dot, u):
     """Adapt model data not already in multiple_trajectories to that format.
 
@@ -0,0 +1,310 @@
+"""
+Saving and loading of fitted SINDy models.
+
+A model is stored in a single uncompressed ``.npz`` archive (readable with
+:func:`numpy.load`) holding the coefficient arrays and a ``model.json``
+member with everything else: the format version, the parameters of the
+model, its feature library, optimizer and differentiation method, and the
+fitted sizes and feature names. Because the archive is not compressed,
+the arrays can be memory-mapped straight from the file when loading.
+"""
+import importlib
+import inspect
+import json
+import struct
+import types
+import zipfile
+
+import numpy as np
+from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+
+from .feature_library.base import BaseFeatureLibrary
+from .optimizers import SINDyOptimizer
+from .optimizers.sindy_optimizer import COEF_THRESHOLD
+from .utils import AxesArray
+from .utils import SampleConcatter
+
+FORMAT_NAME = "pysindy.SINDy"
+FORMAT_VERSION = 1
+
+# Coefficient matrices with at least this many entries are stored as
+# coordinate lists when that is smaller than the dense matrix
+COO_MIN_SIZE = 256
+
+_METADATA_MEMBER = "model.json"
+# Packages from which saved estimators and functions may be restored
+_TRUSTED_PACKAGES = {"pysindy", "sklearn", "scipy", "numpy"}
+_ESTIMATOR_TYPES = (BaseEstimator, BaseFeatureLibrary)
+# Constructor arguments stored under another attribute name
+_PARAM_ATTRIBUTES = {"exclude_libraries": "exclude_libs_"}
+
+
+def save_model(model, path):
+    """
+    Save a fitted SINDy model to a versioned ``.npz`` archive.
+
+    Parameters
+    ----------
+    model : pysindy.SINDy
+        A fitted model. Its feature library must be applied sample by sample
+        (so not a :class:`pysindy.PDELibrary`, :class:`pysindy.WeakPDELibrary`
+        or :class:`pysindy.SINDyPILibrary`), and its library, optimizer and
+        differentiation method must only have parameters that are numbers,
+        strings, arrays, lists, dicts or other pysindy or scikit-learn
+        estimators, e.g. no custom functions.
+
+    path : str or os.PathLike
+        File to write the model to.
+    """
+    check_is_fitted(model, "model")
+    library = model.model.steps[0][1]
+    if not library._pointwise:
+        raise NotImplementedError("{} cannot be saved".format(type(library).__name__))
+    optimizer = model.model.steps[-1][1]
+    coef = np.asarray(optimizer.coef_)
+    metadata = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "params": {
+            "feature_names": list(model.feature_names),
+            "t_default": model.t_default,
+            "discrete_time": model.discrete_time,
+            "n_jobs": model.n_jobs,
+            "dtype": None if model.dtype is None else np.dtype(model.dtype).name,
+            "lean": model.lean,
+            "feature_library": _encode(model.feature_library),
+            "optimizer": _encode(model.optimizer),
+            "differentiation_method": _encode(model.differentiation_method),
+        },
+        "n_features_in": len(model.feature_names),
+        "n_output_features": model.n_output_features_,
+        "n_control_features": model.n_control_features_,
+        "library_feature_names": library.get_feature_names(model.feature_names),
+        "coef_shape": list(coef.shape),
+    }
+    arrays = {"intercept": np.asarray(optimizer.intercept_)}
+    nnz = np.count_nonzero(coef)
+    index_dtype = np.min_scalar_type(max(coef.shape))
+    coo_nbytes = nnz * (coef.itemsize + 2 * index_dtype.itemsize)
+    if coef.size >= COO_MIN_SIZE and coo_nbytes < coef.nbytes:
+        metadata["coef_format"] = "coo"
+        rows, cols = np.nonzero(coef)
+        arrays["coef_rows"] = rows.astype(index_dtype)
+        arrays["coef_cols"] = cols.astype(index_dtype)
+        arrays["coef_data"] = coef[rows, cols]
+    else:
+        metadata["coef_format"] = "dense"
+        arrays["coef"] = coef
+
+    # Record the layout of the arrays, so that loading does not need to
+    # parse their headers
+    metadata["arrays"] = {
+        name: {"dtype": array.dtype.str, "shape": list(array.shape)}
+        for name, array in arrays.items()
+    }
+    with zipfile.ZipFile(path, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, array in arrays.items():
+            with archive.open(name + ".npy", mode="w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.require(array, requirements="C"))
+        archive.writestr(_METADATA_MEMBER, json.dumps(metadata, indent=1))
+
+
+def load_model(path, mmap_mode="r"):
+    """
+    Load a model saved with :func:`save_model`.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        File the model was saved to.
+
+    mmap_mode : {None, "r", "c"}, optional (default "r")
+        If not None, the dense coefficient matrix is memory-mapped from the
+        file with this mode (see :func:`numpy.memmap`) rather than read.
+
+    Returns
+    -------
+    model : pysindy.SINDy
+        A fitted model, ready for prediction and simulation.
+    """
+    from .pysindy import SINDy
+
+    if mmap_mode not in (None, "r", "c"):
+        raise ValueError("mmap_mode must be None, 'r' or 'c'")
+    with zipfile.ZipFile(path) as archive:
+        if _METADATA_MEMBER not in archive.namelist():
+            raise ValueError("{} is not a saved SINDy model".format(path))
+        metadata = json.loads(archive.read(_METADATA_MEMBER))
+        if metadata.get("format") != FORMAT_NAME:
+            raise ValueError("{} is not a saved SINDy model".format(path))
+        if metadata["version"] > FORMAT_VERSION:
+            raise ValueError(
+                "{} was saved in format version {}, but only versions up to {} "
+                "can be loaded; upgrade pysindy".format(
+                    path, metadata["version"], FORMAT_VERSION
+                )
+            )
+        arrays = {
+            name: _read_member(
+                path, archive, archive.getinfo(name + ".npy"), layout, mmap_mode
+            )
+            for name, layout in metadata["arrays"].items()
+        }
+
+    params = {k: _decode(v) for k, v in metadata["params"].items()}
+    if params["dtype"] is not None:
+        params["dtype"] = np.dtype(params["dtype"]).type
+    model = SINDy(**params)
+
+    n_features_in = metadata["n_features_in"]
+    library = model.feature_library
+    library.fit(AxesArray(np.zeros((1, n_features_in)), {"ax_time": 0, "ax_coord": 1}))
+    if library.n_output_features_ != metadata["n_output_features"]:
+        raise ValueError("The feature library of {} could not be restored".format(path))
+
+    if metadata["coef_format"] == "coo":
+        data = arrays["coef_data"]
+        coef = np.zeros(metadata["coef_shape"], dtype=data.dtype)
+        coef[arrays["coef_rows"], arrays["coef_cols"]] = data
+    else:
+        coef = arrays["coef"]
+    # The intercept is small, read it into memory
+    intercept = np.array(arrays["intercept"])
+    optimizer = model.optimizer
+    optimizer.coef_ = coef
+    optimizer.intercept_ = intercept[()] if intercept.ndim == 0 else intercept
+    optimizer.ind_ = np.abs(coef) > COEF_THRESHOLD
+    wrapper = SINDyOptimizer(optimizer, unbias=False)
+    wrapper.ind_ = optimizer.ind_
+
+    model.model = Pipeline(
+        [
+            ("features", library),
+            ("shaping", SampleConcatter()),
+            ("model", wrapper),
+        ]
+    )
+    model.n_control_features_ = metadata["n_control_features"]
+    model._set_fitted_attributes()
+    return model
+
+
+def _read_member(path, archive, info, layout, mmap_mode):
+    """Read (or memory-map) the .npy array stored in an archive member."""
+    if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+        with archive.open(info) as f:
+            return np.lib.format.read_array(f)
+    dtype = np.dtype(layout["dtype"])
+    shape = tuple(layout["shape"])
+    if dtype.hasobject:
+        raise ValueError("Saved models cannot contain object arrays")
+    with open(path, "rb") as f:
+        # The member data follows its local header, whose size depends on
+        # the lengths of the file name and extra field. The .npy data in
+        # turn follows the magic string, the format version and the header.
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", f.read(4))
+        f.seek(name_length + extra_length, 1)
+        major, minor = np.lib.format.read_magic(f)
+        if major == 1:
+            (header_length,) = struct.unpack("<H", f.read(2))
+        else:
+            (header_length,) = struct.unpack("<I", f.read(4))
+        offset = f.tell() + header_length
+    if np.prod(shape) == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape)
+
+
+def _encode(value):
+    """JSON representation of an estimator parameter."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        return {"__dict__": {k: _encode(v) for k, v in value.items()}}
+    if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        return {"__ndarray__": value.tolist(), "dtype": value.dtype.str}
+    if isinstance(value, type) and issubclass(value, np.generic):
+        return {"__dtype__": np.dtype(value).str}
+    if isinstance(value, _ESTIMATOR_TYPES) and _is_trusted(type(value)):
+        return {
+            "__estimator__": type(value).__module__ + "." + type(value).__qualname__,
+            "params": {k: _encode(v) for k, v in _init_params(value).items()},
+        }
+    if isinstance(value, types.FunctionType) and _is_trusted(value):
+        return {"__function__": value.__module__ + "." + value.__qualname__}
+    raise NotImplementedError(
+        "Parameters of type {} cannot be saved".format(type(value).__name__)
+    )
+
+
+def _init_params(estimator):
+    """
+    The arguments of the constructor of an estimator, read from the
+    attributes of the same name as in ``get_params``. Composite libraries
+    keep some of their arguments with a trailing underscore instead.
+    """
+    params = {}
+    signature = inspect.signature(type(estimator).__init__)
+    for name, parameter in signature.parameters.items():
+        if name == "self" or parameter.kind in (
+            parameter.VAR_POSITIONAL,
+            parameter.VAR_KEYWORD,
+        ):
+            continue
+        for attribute in (name, name + "_", _PARAM_ATTRIBUTES.get(name)):
+            if attribute is not None and hasattr(estimator, attribute):
+                params[name] = getattr(estimator, attribute)
+                break
+        else:
+            raise NotImplementedError(
+                "{} cannot be saved".format(type(estimator).__name__)
+            )
+    return params
+
+
+def _decode(value):
+    """Inverse of :func:`_encode`."""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__dict__" in value:
+        return {k: _decode(v) for k, v in value["__dict__"].items()}
+    if "__ndarray__" in value:
+        return np.array(value["__ndarray__"], dtype=value["dtype"])
+    if "__dtype__" in value:
+        return np.dtype(value["__dtype__"]).type
+    if "__estimator__" in value:
+        cls = _import_trusted(value["__estimator__"])
+        if not (isinstance(cls, type) and issubclass(cls, _ESTIMATOR_TYPES)):
+            raise ValueError("Cannot restore {}".format(value["__estimator__"]))
+        return cls(**{k: _decode(v) for k, v in value["params"].items()})
+    if "__function__" in value:
+        function = _import_trusted(value["__function__"])
+        if not isinstance(function, types.FunctionType):
+            raise ValueError("Cannot restore {}".format(value["__function__"]))
+        return function
+    raise ValueError("Invalid saved parameter {!r}".format(value))
+
+
+def _is_trusted(obj):
+    """Whether obj is defined at the top level of a module of a known package."""
+    return (
+        obj.__module__.split(".")[0] in _TRUSTED_PACKAGES
+        and "." not in obj.__qualname__
+        and "<" not in obj.__qualname__
+    )
+
+
+def _import_trusted(path):
+    module, _, name = path.rpartition(".")
+    if module.split(".")[0] not in _TRUSTED_PACKAGES:
+        raise ValueError("Cannot restore {}".format(path))
+    return getattr(importlib.import_module(module), name)
@@ -9,6 +9,8 @@ from .base import equations
 from .base import flatten_2d_tall
 from .base import get_prox
 from .base import get_regularization
+from .base import gram_to_least_squares
+from .base import GramStatistics
 from .base import print_model
 from .base import prox_cad
 from .base import prox_l0
@@ -22,6 +24,8 @@ from .base import supports_multiple_targets
 from .base import validate_control_variables
 from .base import validate_input
 from .base import validate_no_reshape
+from .cache import FeatureCache
+from .cache import fingerprint
 from .odes import bacterial
 from .odes import burgers_galerkin
 from .odes import cubic_damped_SHO
@@ -47,6 +51,9 @@ from .odes import pendulum_on_cart
 from .odes import rossler
 from .odes import van_der_pol
 from .odes import yeast
+from .profiling import FitProfile
+from .progress import FitProgress
+from .ragged import RaggedTrajectories
 
 # from .base import convert_u_dot_integral
 # from .base import integrate
@@ -65,6 +72,11 @@ __all__ = [
     "equations",
     "get_prox",
     "get_regularization",
+    "gram_to_least_squares",
+    "GramStatistics",
+    "FitProfile",
+    "FitProgress",
+    "RaggedTrajectories",
     "print_model",
     "prox_cad",
     "prox_l0",
@@ -79,6 +91,8 @@ __all__ = [
     "validate_input",
     "validate_no_reshape",
     "flatten_2d_tall",
+    "FeatureCache",
+    "fingerprint",
     "linear_damped_SHO",
     "cubic_damped_SHO",
     "linear_3D",
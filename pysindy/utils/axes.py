@@ -43,6 +43,16 @@ class AxesArray(np.lib.mixins.NDArrayOperatorsMixin, np.ndarray):
         self.ax_sample = getattr(obj, "ax_sample", None)
         self.ax_spatial = getattr(obj, "ax_spatial", [])
 
+    def __reduce__(self):
+        # Keep the axis labels when pickling, e.g. to send data to a process pool
+        reconstruct, args, state = super().__reduce__()
+        return reconstruct, args, (state, self.__dict__)
+
+    def __setstate__(self, state):
+        array_state, axes = state
+        super().__setstate__(array_state)
+        self.__dict__.update(axes)
+
     @property
     def n_spatial(self):
         return tuple(self.shape[ax] for ax in self.ax_spatial)
@@ -161,6 +171,9 @@ def concat_sample_axis(x_list: List[AxesArray]):
         n_samples = np.prod([x.shape[ax] for ax in sample_axes])
         arr = AxesArray(x.reshape((n_samples, x.shape[x.ax_coord])), new_axes)
         new_arrs.append(arr)
+    if len(new_arrs) == 1:
+        # A single trajectory is returned as a (usually copy-free) reshape
+        return new_arrs[0]
     return np.concatenate(new_arrs, axis=new_arrs[0].ax_sample)
 
 
@@ -13,6 +13,10 @@ from sklearn.utils.validation import check_array
 # no checks on t.
 T_DEFAULT = object()
 
+# Rows of lower precision data converted to float64 at a time when
+# accumulating Gram statistics
+GRAM_BLOCK_ROWS = 4096
+
 
 def flatten_2d_tall(x):
     return x.reshape(x.size // x.shape[-1], x.shape[-1])
@@ -126,7 +130,10 @@ def drop_nan_samples(x, y):
     y_non_sample_axes = tuple(ax for ax in range(y.ndim) if ax != y.ax_sample)
     x_good_samples = (~np.isnan(x)).any(axis=x_non_sample_axes)
     y_good_samples = (~np.isnan(y)).any(axis=y_non_sample_axes)
-    good_sample_ind = np.nonzero(x_good_samples & y_good_samples)[0]
+    good_samples = x_good_samples & y_good_samples
+    if good_samples.all():
+        return x, y
+    good_sample_ind = np.nonzero(good_samples)[0]
     x = x.take(good_sample_ind, axis=x.ax_sample)
     y = y.take(good_sample_ind, axis=y.ax_sample)
     return x, y
@@ -333,3 +340,124 @@ def supports_multiple_targets(estimator):
         return estimator._more_tags()["multioutput"]
     except (AttributeError, KeyError):
         return False
+
+
+class GramStatistics:
+    """Running sufficient statistics of a linear least-squares problem.
+
+    Accumulates :math:`\\Theta^\\top \\Theta`, :math:`\\Theta^\\top y`,
+    :math:`y^\\top y` and the sample count over batches of rows, so that a
+    regression on arbitrarily many samples can be solved with memory that
+    depends only on the number of features and targets.
+
+    Parameters
+    ----------
+    n_features : int
+        Number of columns of the library matrix :math:`\\Theta`.
+
+    n_targets : int
+        Number of columns of the target matrix :math:`y`.
+
+    Attributes
+    ----------
+    ThetaTTheta : np.ndarray, shape (n_features, n_features)
+
+    ThetaTy : np.ndarray, shape (n_features, n_targets)
+
+    yTy : np.ndarray, shape (n_targets, n_targets)
+
+    y_sum : np.ndarray, shape (n_targets,)
+
+    n_samples : int
+        Number of rows accumulated so far.
+    """
+
+    def __init__(self, n_features, n_targets):
+        self.ThetaTTheta = np.zeros((n_features, n_features))
+        self.ThetaTy = np.zeros((n_features, n_targets))
+        self.yTy = np.zeros((n_targets, n_targets))
+        self.y_sum = np.zeros(n_targets)
+        self.n_samples = 0
+
+    def update(self, theta, y):
+        """Fold the rows of ``theta`` and ``y`` into the statistics.
+
+        The statistics are accumulated in float64. Lower precision inputs
+        are converted a block of rows at a time rather than all at once.
+        """
+        theta = np.asarray(theta)
+        y = np.asarray(y).reshape(theta.shape[0], -1)
+        if theta.shape[1] != self.ThetaTTheta.shape[0]:
+            raise ValueError(
+                f"Expected {self.ThetaTTheta.shape[0]} library terms, "
+                f"received {theta.shape[1]}."
+            )
+        if y.shape[1] != self.ThetaTy.shape[1]:
+            raise ValueError(
+                f"Expected {self.ThetaTy.shape[1]} targets, received {y.shape[1]}."
+            )
+        step = max(theta.shape[0], 1)
+        if theta.dtype != np.float64 or y.dtype != np.float64:
+            step = GRAM_BLOCK_ROWS
+        for start in range(0, theta.shape[0], step):
+            theta_block = theta[start : start + step].astype(np.float64, copy=False)
+            y_block = y[start : start + step].astype(np.float64, copy=False)
+            self.ThetaTTheta += theta_block.T @ theta_block
+            self.ThetaTy += theta_block.T @ y_block
+            self.yTy += y_block.T @ y_block
+            self.y_sum += y_block.sum(axis=0)
+        self.n_samples += theta.shape[0]
+        return self
+
+    def __add__(self, other):
+        return self._combine(other, 1)
+
+    def __sub__(self, other):
+        return self._combine(other, -1)
+
+    def _combine(self, other, sign):
+        result = GramStatistics(*self.ThetaTy.shape)
+        result.ThetaTTheta = self.ThetaTTheta + sign * other.ThetaTTheta
+        result.ThetaTy = self.ThetaTy + sign * other.ThetaTy
+        result.yTy = self.yTy + sign * other.yTy
+        result.y_sum = self.y_sum + sign * other.y_sum
+        result.n_samples = self.n_samples + sign * other.n_samples
+        return result
+
+    def to_least_squares(self, rtol=None):
+        """Build a small problem with the same normal equations.
+
+        Returns ``(R, b)`` with :math:`R^\\top R = \\Theta^\\top \\Theta` and
+        :math:`R^\\top b = \\Theta^\\top y`, so that any optimizer minimizing
+        :math:`\\|y - \\Theta \\xi\\|^2` plus a penalty on :math:`\\xi` finds the
+        same coefficients on ``(R, b)``. ``R`` has at most ``n_features`` rows;
+        directions with eigenvalues below ``rtol`` times the largest one are
+        dropped.
+        """
+        return gram_to_least_squares(self.ThetaTTheta, self.ThetaTy, rtol=rtol)
+
+    def residual(self, coef):
+        """Sum of squared residuals :math:`\\|y - \\Theta \\xi^\\top\\|^2` per target.
+
+        ``coef`` has shape (n_targets, n_features).
+        """
+        coef = np.atleast_2d(coef)
+        quad = np.einsum("ij,jk,ik->i", coef, self.ThetaTTheta, coef)
+        cross = np.einsum("ij,ji->i", coef, self.ThetaTy)
+        return np.maximum(np.diag(self.yTy) - 2 * cross + quad, 0)
+
+
+def gram_to_least_squares(ThetaTTheta, ThetaTy, rtol=None):
+    """Convert normal-equation statistics into an equivalent least-squares problem.
+
+    See :meth:`GramStatistics.to_least_squares`.
+    """
+    s, V = np.linalg.eigh(ThetaTTheta)
+    if rtol is None:
+        rtol = ThetaTTheta.shape[0] * np.finfo(s.dtype).eps
+    keep = s > rtol * max(s.max(), 0)
+    s, V = s[keep], V[:, keep]
+    sqrt_s = np.sqrt(s)
+    R = sqrt_s[:, np.newaxis] * V.T
+    b = (V.T @ ThetaTy) / sqrt_s[:, np.newaxis]
+    return R, b
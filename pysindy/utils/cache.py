@@ -0,0 +1,182 @@
+"""
+Cache of derivatives and library matrices shared between repeated fits.
+"""
+import functools
+import hashlib
+import threading
+import types
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.base import BaseEstimator
+
+# Scratch attributes that feature libraries overwrite on every transform
+_TRANSIENT_ATTRIBUTES = {"x_k", "dx_k_j", "dfx_k_j"}
+
+
+class FeatureCache:
+    """Least-recently-used cache of derivatives and library matrices.
+
+    Passing the same cache to several :class:`pysindy.SINDy` models (or
+    fitting one model repeatedly) lets fits on identical data, time points,
+    differentiation method and feature library skip straight to the
+    optimizer, e.g. when sweeping optimizer hyperparameters. Entries are
+    keyed on a fingerprint of all of these (see :func:`fingerprint`), so
+    changing any of them recomputes the features.
+
+    Cached arrays are marked read-only. Cloning an estimator that holds a
+    cache shares the cache rather than copying it.
+
+    Parameters
+    ----------
+    max_bytes : int, optional (default 2**30)
+        Upper bound on the total size of the cached arrays. The least
+        recently used entries are evicted when it is exceeded; entries
+        larger than ``max_bytes`` are not cached.
+
+    Attributes
+    ----------
+    nbytes : int
+        Total size of the cached arrays.
+
+    hits : int
+        Number of lookups that found an entry.
+
+    misses : int
+        Number of lookups that did not.
+    """
+
+    def __init__(self, max_bytes=2**30):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the entry stored under key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store a tuple of arrays (and small metadata) under key."""
+        nbytes = sum(v.nbytes for v in value if isinstance(v, np.ndarray))
+        if nbytes > self.max_bytes:
+            return
+        for v in value:
+            if isinstance(v, np.ndarray):
+                v.flags.writeable = False
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def fingerprint(*objs):
+    """Hash arrays, estimators, functions and containers by value.
+
+    Arrays are hashed by dtype, shape and contents. Estimators are hashed
+    by class and ``get_params()``, other objects by class and attributes,
+    skipping fitted attributes (ending in an underscore). Functions are
+    hashed by their byte code, constants, defaults and closure contents.
+
+    Returns
+    -------
+    key : str
+        Hex digest identifying the objects.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for obj in objs:
+        _update_hash(h, obj, set())
+    return h.hexdigest()
+
+
+def _update_hash(h, obj, seen):
+    def update(*items):
+        for item in items:
+            _update_hash(h, item, seen)
+
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, np.generic)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    elif isinstance(obj, bytes):
+        h.update(b"bytes:" + obj + b";")
+    elif isinstance(obj, np.ndarray):
+        h.update(f"ndarray:{obj.dtype.str}:{obj.shape};".encode())
+        if obj.dtype == object:
+            update(obj.ravel().tolist())
+        else:
+            h.update(np.ascontiguousarray(obj).data)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}:{len(obj)};".encode())
+        update(*obj)
+    elif isinstance(obj, dict):
+        h.update(f"dict:{len(obj)};".encode())
+        for k in sorted(obj, key=repr):
+            update(k, obj[k])
+    elif isinstance(obj, (set, frozenset)):
+        h.update(f"set:{sorted(map(repr, obj))};".encode())
+    elif id(obj) in seen:
+        h.update(b"cycle;")
+    elif isinstance(obj, types.FunctionType):
+        seen.add(id(obj))
+        closure = [cell.cell_contents for cell in obj.__closure__ or ()]
+        update(obj.__qualname__, obj.__code__, obj.__defaults__, closure)
+    elif isinstance(obj, types.CodeType):
+        update(obj.co_code, obj.co_consts, obj.co_names)
+    elif isinstance(obj, functools.partial):
+        seen.add(id(obj))
+        update("partial", obj.func, obj.args, obj.keywords)
+    elif isinstance(obj, type) or callable(obj) and not hasattr(obj, "__dict__"):
+        # Classes, builtins and ufuncs
+        name = getattr(obj, "__qualname__", getattr(obj, "__name__", repr(obj)))
+        h.update(f"callable:{getattr(obj, '__module__', '')}.{name};".encode())
+    elif isinstance(obj, BaseEstimator):
+        seen.add(id(obj))
+        update(type(obj), obj.get_params(deep=False))
+    elif hasattr(obj, "__dict__"):
+        seen.add(id(obj))
+        params = {
+            k: v
+            for k, v in vars(obj).items()
+            if not k.endswith("_") and k not in _TRANSIENT_ATTRIBUTES
+        }
+        update(type(obj), params)
+    else:
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
@@ -0,0 +1,181 @@
+"""
+Wall time, call count and memory instrumentation of the stages of a fit.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .progress import _active_monitor
+
+_active_profile = ContextVar("pysindy_fit_profile", default=None)
+
+
+class FitProfile:
+    """Record the cost of each stage of the fits run inside a ``with`` block.
+
+    While active, :meth:`pysindy.SINDy.fit` and the pysindy optimizers and
+    feature libraries report the stages they go through: preparing and
+    differentiating the data, fitting and applying the feature library (and
+    each sub-library of a :class:`pysindy.ConcatLibrary` or
+    :class:`pysindy.GeneralizedLibrary`), and the optimizer's ``check_X_y``
+    (skipped for the library matrix built by ``SINDy.fit``),
+    ``_preprocess_data``, ``_reduce`` and unbiasing steps, along with every
+    iteration of ``_reduce``. Nested stages are named by their path, e.g.
+    ``"optimizer/_reduce/iteration"``.
+
+    ``SINDy.fit(..., profile=True)`` runs the fit inside a ``FitProfile``
+    and stores the report in ``fit_profile_``.
+
+    Stages run in worker threads (see ``n_jobs`` of :class:`pysindy.SINDy`)
+    are only accounted for as part of the stage that started them.
+
+    Parameters
+    ----------
+    trace_memory : bool, optional (default True)
+        Whether to record peak allocated bytes with :mod:`tracemalloc`.
+        Tracing slows down allocations noticeably, so disable it when only
+        timings are of interest.
+
+    Attributes
+    ----------
+    stages : dict
+        Maps each stage path to a dict with the number of ``"calls"``, the
+        total ``"wall_time"`` in seconds and the ``"peak_bytes"`` allocated
+        above the memory in use when the stage started (the maximum over
+        calls; 0 without ``trace_memory``).
+
+    iterations : list of dict
+        One entry per optimizer iteration, with the ``"optimizer"`` class
+        name, the ``"iteration"`` index, ``"wall_time"`` and ``"peak_bytes"``.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import pysindy as ps
+    >>> t = np.linspace(0, 1, 100)
+    >>> x = np.stack([np.exp(-t), np.exp(-2 * t)], axis=-1)
+    >>> with ps.FitProfile() as profile:
+    ...     model = ps.SINDy().fit(x, t=t)
+    >>> profile.stages["optimizer/_reduce"]["calls"]
+    1
+    """
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.iterations = []
+        self._stack = []
+
+    def __enter__(self):
+        self._started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._token = _active_profile.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active_profile.reset(self._token)
+        if self._started_tracing:
+            tracemalloc.stop()
+        return False
+
+    def to_dict(self):
+        """Return the report as plain dicts and lists, e.g. for logging."""
+        return {
+            "stages": {name: dict(stats) for name, stats in self.stages.items()},
+            "iterations": [dict(it) for it in self.iterations],
+        }
+
+    def _push(self, name):
+        path = f"{self._stack[-1][0]}/{name}" if self._stack else name
+        current = 0
+        if self._memory_traced():
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the peak seen so far into the enclosing stage before
+            # resetting it for this one
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+            _reset_peak()
+        frame = [path, time.perf_counter(), current, current]
+        self._stack.append(frame)
+        return frame
+
+    def _pop(self, frame):
+        wall_time = time.perf_counter() - frame[1]
+        while self._stack and self._stack[-1] is not frame:
+            self._stack.pop()
+        if self._stack:
+            self._stack.pop()
+        peak_bytes = 0
+        if self._memory_traced():
+            peak = max(frame[3], tracemalloc.get_traced_memory()[1])
+            peak_bytes = peak - frame[2]
+            if self._stack:
+                self._stack[-1][3] = max(self._stack[-1][3], peak)
+        stats = self.stages.setdefault(
+            frame[0], {"calls": 0, "wall_time": 0.0, "peak_bytes": 0}
+        )
+        stats["calls"] += 1
+        stats["wall_time"] += wall_time
+        stats["peak_bytes"] = max(stats["peak_bytes"], peak_bytes)
+        return wall_time, peak_bytes
+
+    def _memory_traced(self):
+        return self.trace_memory and tracemalloc.is_tracing()
+
+    def _iterations(self, n, optimizer):
+        for k in range(n):
+            frame = self._push("iteration")
+            try:
+                yield k
+            finally:
+                wall_time, peak_bytes = self._pop(frame)
+                self.iterations.append(
+                    {
+                        "optimizer": optimizer,
+                        "iteration": k,
+                        "wall_time": wall_time,
+                        "peak_bytes": peak_bytes,
+                    }
+                )
+
+
+def _reset_peak():
+    # tracemalloc.reset_peak is only available from Python 3.9; before that
+    # the peak of a stage includes the peaks of earlier stages
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+@contextmanager
+def profile_stage(name):
+    """Account the enclosed code to stage ``name`` of the active profile."""
+    monitor = _active_monitor.get()
+    if monitor is not None:
+        # Stage boundaries are also where cancelled fits stop
+        monitor.check()
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    frame = profile._push(name)
+    try:
+        yield
+    finally:
+        profile._pop(frame)
+
+
+def profiled_iterations(n, optimizer):
+    """
+    ``range(n)``, recording each iteration of ``optimizer`` if profiling, and
+    reporting it (or stopping the fit if it was cancelled) if monitored by
+    :meth:`pysindy.SINDy.afit`.
+    """
+    name = type(optimizer).__name__
+    profile = _active_profile.get()
+    iterations = range(n) if profile is None else profile._iterations(n, name)
+    monitor = _active_monitor.get()
+    if monitor is not None:
+        iterations = monitor._iterations(iterations, name)
+    return iterations
@@ -0,0 +1,134 @@
+"""
+Progress reporting and cancellation of fits run from asyncio code.
+"""
+import asyncio
+import threading
+from contextvars import ContextVar
+
+_active_monitor = ContextVar("pysindy_fit_monitor", default=None)
+
+_DONE = object()
+
+
+class FitProgress:
+    """Asynchronous iterator over the optimizer iterations of a fit.
+
+    Pass a ``FitProgress`` as the ``progress`` argument of
+    :meth:`pysindy.SINDy.afit` and iterate over it with ``async for`` while
+    the fit runs. Every optimizer iteration yields a dict with the
+    ``"optimizer"`` class name, the ``"iteration"`` index and the
+    ``"objective"`` value the optimizer computed for that iteration (for
+    :class:`pysindy.SR3` and its variants; None for optimizers without an
+    objective such as :class:`pysindy.STLSQ`). Iteration ends when the fit
+    finishes, fails or is cancelled.
+
+    A ``FitProgress`` reports a single fit and can only be iterated once.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> import numpy as np
+    >>> import pysindy as ps
+    >>> t = np.linspace(0, 1, 100)
+    >>> x = np.stack([np.exp(-t), np.exp(-2 * t)], axis=-1)
+    >>> async def main():
+    ...     model = ps.SINDy(optimizer=ps.SR3(threshold=0.1))
+    ...     progress = ps.FitProgress()
+    ...     fit = asyncio.create_task(model.afit(x, t=t, progress=progress))
+    ...     objectives = [update["objective"] async for update in progress]
+    ...     await fit
+    ...     return objectives
+    >>> objectives = asyncio.run(main())
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._queue = None
+        self._started = False
+
+    def _bind(self):
+        # Called from the event loop thread, before the fit is started
+        if self._started:
+            raise ValueError("A FitProgress can only report a single fit")
+        self._started = True
+        self._get_queue()
+        return self
+
+    def _get_queue(self):
+        if self._queue is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+        return self._queue
+
+    def _put(self, item):
+        # Called from the thread running the fit
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def _close(self):
+        self._get_queue().put_nowait(_DONE)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._get_queue().get()
+        if item is _DONE:
+            # Let other iterations end too
+            self._queue.put_nowait(_DONE)
+            raise StopAsyncIteration
+        return item
+
+
+class _FitMonitor:
+    """Per-iteration hooks of a fit: progress reports and cancellation."""
+
+    def __init__(self, progress=None):
+        self.progress = progress
+        self._cancelled = threading.Event()
+        self._objective = None
+
+    def cancel(self):
+        """Stop the fit at the next optimizer iteration or stage."""
+        self._cancelled.set()
+
+    def check(self):
+        if self._cancelled.is_set():
+            raise asyncio.CancelledError("The fit was cancelled")
+
+    def run(self, func, *args, **kwargs):
+        """Call func with this monitor active, e.g. in a worker thread."""
+        token = _active_monitor.set(self)
+        try:
+            self.check()
+            return func(*args, **kwargs)
+        finally:
+            _active_monitor.reset(token)
+
+    def _iterations(self, iterations, optimizer):
+        for k in iterations:
+            self.check()
+            self._objective = None
+            try:
+                yield k
+            finally:
+                # Also report the last iteration when the optimizer breaks
+                # out of its loop
+                if self.progress is not None:
+                    self.progress._put(
+                        {
+                            "optimizer": optimizer,
+                            "iteration": k,
+                            "objective": self._objective,
+                        }
+                    )
+
+
+def record_objective(value):
+    """Report the objective value of the current optimizer iteration.
+
+    Returns ``value``, so that it can wrap the computation of the objective.
+    """
+    monitor = _active_monitor.get()
+    if monitor is not None:
+        monitor._objective = value
+    return value
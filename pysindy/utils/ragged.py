@@ -0,0 +1,195 @@
+"""
+Storage for many (short) trajectories of different lengths.
+"""
+from collections.abc import Sequence
+
+import numpy as np
+
+from .axes import AxesArray
+
+
+class RaggedTrajectories(Sequence):
+    """Many trajectories stored back to back in a single array.
+
+    A list of thousands of short trajectories costs a Python-level validation,
+    differentiation and library call per trajectory when passed to
+    :meth:`pysindy.SINDy.fit`. ``RaggedTrajectories`` keeps the samples of all
+    trajectories in one contiguous ``(total_samples, n_coord)`` buffer along
+    with the offsets at which each trajectory starts, so that
+    :class:`pysindy.SINDy` can differentiate and transform all of them in a
+    handful of vectorized calls.
+
+    It behaves like a read-only sequence of trajectories: ``len`` is the
+    number of trajectories and indexing returns a view of one trajectory, so
+    it can also be passed anywhere a list of trajectories is accepted.
+
+    Parameters
+    ----------
+    data : array-like, shape (total_samples, n_coord)
+        Samples of all trajectories, concatenated along the first axis.
+
+    offsets : array-like of int, shape (n_trajectories + 1,)
+        Row of ``data`` at which each trajectory starts, followed by
+        ``total_samples``. Trajectory ``i`` is
+        ``data[offsets[i]:offsets[i + 1]]``.
+
+    t : float or array-like of shape (total_samples,), optional (default None)
+        Time step shared by all trajectories, or the time of each row of
+        ``data``. Times must be strictly increasing within each trajectory.
+        If None, the time passed to (or the default of) the SINDy model is
+        used.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pysindy.utils import RaggedTrajectories
+    >>> x = RaggedTrajectories.from_list([np.ones((3, 2)), np.zeros((5, 2))])
+    >>> len(x), x.offsets, x.data.shape
+    (2, array([0, 3, 8]), (8, 2))
+    """
+
+    def __init__(self, data, offsets, t=None):
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        if data.ndim != 2:
+            raise ValueError("data must have shape (total_samples, n_coord)")
+        offsets = np.asarray(offsets)
+        if (
+            offsets.ndim != 1
+            or len(offsets) < 2
+            or not np.issubdtype(offsets.dtype, np.integer)
+        ):
+            raise ValueError("offsets must be a 1D integer array of length >= 2")
+        if offsets[0] != 0 or offsets[-1] != len(data):
+            raise ValueError("offsets must start at 0 and end at len(data)")
+        if np.any(np.diff(offsets) <= 0):
+            raise ValueError("offsets must be strictly increasing")
+        self.data = data
+        self.offsets = offsets.astype(np.intp, copy=False)
+        self.t = None if t is None else self._validate_time(t)
+
+    @classmethod
+    def from_list(cls, trajectories, t=None):
+        """Concatenate a list of trajectories into a ``RaggedTrajectories``.
+
+        Parameters
+        ----------
+        trajectories : list of array-like, each of shape (n_samples_i, n_coord)
+            The trajectories.
+
+        t : float, list of float or list of array-like, optional (default None)
+            Time step shared by all trajectories, the time step of each
+            trajectory, or the times of the samples of each trajectory.
+
+        Returns
+        -------
+        ragged : RaggedTrajectories
+        """
+        trajectories = [
+            np.asarray(xi).reshape(-1, 1) if np.ndim(xi) == 1 else np.asarray(xi)
+            for xi in trajectories
+        ]
+        offsets = np.cumsum([0] + [len(xi) for xi in trajectories])
+        if t is not None and not np.isscalar(t):
+            t = np.concatenate(
+                [
+                    np.arange(len(xi)) * ti if np.isscalar(ti) else np.asarray(ti)
+                    for xi, ti in zip(trajectories, t)
+                ]
+            )
+        return cls(np.concatenate(trajectories), offsets, t)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not isinstance(i, (int, np.integer)):
+            raise TypeError("RaggedTrajectories indices must be integers")
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("trajectory index out of range")
+        return AxesArray(
+            self.data[self.offsets[i] : self.offsets[i + 1]],
+            {"ax_time": 0, "ax_coord": 1},
+        )
+
+    def __repr__(self):
+        return (
+            f"RaggedTrajectories(n_trajectories={len(self)}, "
+            f"total_samples={len(self.data)}, n_coord={self.data.shape[1]})"
+        )
+
+    @property
+    def lengths(self):
+        """Number of samples in each trajectory."""
+        return np.diff(self.offsets)
+
+    @property
+    def starts(self):
+        """Row of ``data`` at which each trajectory starts."""
+        return self.offsets[:-1]
+
+    def like(self, data, t=None):
+        """A ``RaggedTrajectories`` of other data with the same segmentation."""
+        return RaggedTrajectories(data, self.offsets, t)
+
+    def trim(self, start=0, stop=0):
+        """Drop the first ``start`` and last ``stop`` samples of every trajectory.
+
+        Returns
+        -------
+        trimmed : RaggedTrajectories
+        """
+        lengths = self.lengths - start - stop
+        if np.any(lengths <= 0):
+            raise ValueError("Trimming would leave an empty trajectory")
+        position = np.arange(len(self.data)) - np.repeat(self.starts, self.lengths)
+        keep = (position >= start) & (
+            position < self.lengths.repeat(self.lengths) - stop
+        )
+        t = self.t if self.t is None or np.isscalar(self.t) else self.t[keep]
+        return RaggedTrajectories(
+            self.data[keep], np.concatenate([[0], np.cumsum(lengths)]), t
+        )
+
+    def trajectory_times(self, t=None):
+        """Split the times ``t`` (default ``self.t``) by trajectory.
+
+        Returns t itself if it is a scalar time step, and a list with the times
+        of each trajectory otherwise.
+        """
+        t = self.t if t is None else self._validate_time(t)
+        if t is None or np.isscalar(t):
+            return t
+        return [t[lo:hi] for lo, hi in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def uniform_step(self, t=None):
+        """The time step shared by all trajectories, or None if there isn't one.
+
+        ``t`` defaults to ``self.t``. Array times count as uniform if their
+        spacing within every trajectory is the same up to round-off.
+        """
+        t = self.t if t is None else self._validate_time(t)
+        if t is None or np.isscalar(t):
+            return t
+        steps = np.delete(np.diff(t), self.offsets[1:-1] - 1)
+        if len(steps) == 0 or not np.allclose(steps, steps[0]):
+            return None
+        return float(steps[0])
+
+    def _validate_time(self, t):
+        if np.ndim(t) == 0:
+            if t <= 0:
+                raise ValueError("t must be positive")
+            return float(t)
+        t = np.asarray(t)
+        if t.shape != (len(self.data),):
+            raise ValueError("t must be a scalar or have shape (total_samples,)")
+        if np.any(np.delete(np.diff(t), self.offsets[1:-1] - 1) <= 0):
+            raise ValueError(
+                "Values in t should be in strictly increasing order "
+                "within each trajectory."
+            )
+        return t
@@ -43,7 +43,7 @@ setup(
     author=AUTHOR,
     author_email=EMAIL,
     url=URL,
-    packages=find_packages(exclude=["test", "examples"]),
+    packages=find_packages(exclude=["test", "examples", "benchmarks"]),
     install_requires=REQUIRED,
     python_requires=PYTHON,
     extras_require={"miosr": ["gurobipy"]},
@@ -382,3 +382,25 @@ def test_centered_difference_noaxis_vs_axis(data_2d_resolved_pde):
             slow_differences_t,
             atol=atol,
         )
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        FiniteDifference(),
+        FiniteDifference(order=4),
+        FiniteDifference(periodic=True),
+        SmoothedFiniteDifference(),
+        SpectralDerivative(),
+        SINDyDerivative(kind="finite_difference", k=1),
+    ],
+)
+@pytest.mark.parametrize("uniform", [True, False])
+def test_float32_preserved(method, uniform):
+    t = np.linspace(0, 1, 100)
+    if not uniform:
+        t = t**2
+    x = np.stack([np.sin(t), np.cos(t)], axis=-1)
+    x_dot = method(x.astype(np.float32), t)
+    assert x_dot.dtype == np.float32
+    np.testing.assert_allclose(x_dot, method(x, t), rtol=1e-3, atol=1e-3)
@@ -11,6 +11,7 @@ from sklearn.utils.validation import check_is_fitted
 
 from pysindy import SINDy
 from pysindy.differentiation import FiniteDifference
+from pysindy.feature_library import base
 from pysindy.feature_library import ConcatLibrary
 from pysindy.feature_library import CustomLibrary
 from pysindy.feature_library import FourierLibrary
@@ -25,6 +26,7 @@ from pysindy.feature_library import WeakPDELibrary
 from pysindy.feature_library.base import BaseFeatureLibrary
 from pysindy.optimizers import SINDyPI
 from pysindy.optimizers import STLSQ
+from pysindy.utils import AxesArray
 
 
 def test_form_custom_library():
@@ -362,6 +364,44 @@ def test_polynomial_options(data_lorenz, kwargs, sparse_format):
     check_is_fitted(library)
 
 
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"degree": 4},
+        {"degree": 3, "include_bias": False},
+        {"degree": 3, "include_interaction": False},
+        {"degree": 3, "interaction_only": True},
+        {"degree": 3, "order": "F"},
+        {"degree": 0},
+    ],
+)
+@pytest.mark.parametrize("spatial", [False, True])
+def test_polynomial_monomials(data_lorenz, kwargs, spatial):
+    x, t = data_lorenz
+    # More samples than fit in one block
+    x = np.tile(x, (5, 1))
+    if spatial:
+        x = AxesArray(
+            x.reshape(25, 100, -1),
+            {"ax_spatial": 0, "ax_time": 1, "ax_coord": 2},
+        )
+    library = PolynomialLibrary(**kwargs).fit(x)
+    xp = library.transform(x)
+    expected = np.prod(np.asarray(x)[..., np.newaxis, :] ** library.powers_, axis=-1)
+    np.testing.assert_allclose(xp, expected)
+    assert xp.shape == expected.shape
+
+
+def test_polynomial_powers_cached(data_lorenz):
+    x, t = data_lorenz
+    library = PolynomialLibrary(degree=3).fit(x)
+    assert library.powers_ is library.powers_
+    assert not library.powers_.flags.writeable
+    empty = PolynomialLibrary(degree=0, include_bias=False).fit(x)
+    assert empty.powers_.shape == (0, x.shape[1])
+    assert empty.get_feature_names() == []
+
+
 # Catch-all for various combinations of options and
 # inputs for Fourier features
 def test_fourier_options(data_lorenz):
@@ -372,6 +412,152 @@ def test_fourier_options(data_lorenz):
     check_is_fitted(library)
 
 
+@pytest.mark.parametrize("include_sin, include_cos", [(1, 1), (1, 0), (0, 1)])
+def test_fourier_harmonics(data_lorenz, include_sin, include_cos):
+    x, t = data_lorenz
+    library = FourierLibrary(
+        n_frequencies=4, include_sin=include_sin, include_cos=include_cos
+    ).fit(x)
+    functions = [np.sin] * include_sin + [np.cos] * include_cos
+    expected = [
+        f((i + 1) * x[:, j]) for i in range(4) for j in range(3) for f in functions
+    ]
+    np.testing.assert_allclose(library.transform(x), np.stack(expected, axis=-1))
+
+
+def test_fourier_recurrence_accuracy():
+    if np.finfo(np.longdouble).eps >= np.finfo(float).eps:
+        pytest.skip("Needs extended precision for the reference values")
+    # Large inputs, where sin(k x) evaluated directly loses accuracy
+    x = np.random.default_rng(0).uniform(-100, 100, size=(1000, 2))
+    n_frequencies = 10
+    library = FourierLibrary(n_frequencies=n_frequencies).fit(x)
+    xp = np.asarray(library.transform(x)).reshape(len(x), n_frequencies, 2, 2)
+    k = np.arange(1, n_frequencies + 1)
+    kx = k[:, np.newaxis] * x.astype(np.longdouble)[:, np.newaxis, :]
+    error = np.abs(xp - np.stack([np.sin(kx), np.cos(kx)], axis=-1))
+    bound = 2 * k[:, np.newaxis, np.newaxis] * np.finfo(float).eps
+    assert np.all(error <= bound)
+
+
+@pytest.mark.parametrize(
+    "library",
+    [
+        IdentityLibrary(),
+        PolynomialLibrary(),
+        PolynomialLibrary(degree=3, include_bias=False),
+        PolynomialLibrary(degree=3, include_interaction=False),
+        PolynomialLibrary(degree=3, interaction_only=True),
+        FourierLibrary(n_frequencies=3),
+        FourierLibrary(include_cos=False),
+        PolynomialLibrary() + FourierLibrary(),
+        IdentityLibrary() * FourierLibrary(),
+        pytest.lazy_fixture("data_generalized_library"),
+    ],
+)
+def test_transform_derivative(data_lorenz, library):
+    x, t = data_lorenz
+    x = x[::50] / 10
+    library.fit(x)
+    dxp = library.transform_derivative(x)
+    assert dxp.shape == (x.shape[0], library.n_output_features_, x.shape[1])
+
+    eps = 1e-6
+    for j in range(x.shape[1]):
+        step = np.zeros(x.shape[1])
+        step[j] = eps
+        fd = (library.transform(x + step) - library.transform(x - step)) / (2 * eps)
+        np.testing.assert_allclose(dxp[..., j], fd, rtol=1e-6, atol=1e-6)
+
+
+@pytest.mark.parametrize(
+    "library",
+    [
+        IdentityLibrary(),
+        PolynomialLibrary(degree=3),
+        PolynomialLibrary(degree=3, include_interaction=False),
+        FourierLibrary(n_frequencies=3),
+        FourierLibrary(include_sin=False),
+        pytest.lazy_fixture("data_custom_library"),
+        PolynomialLibrary() + FourierLibrary(),
+        PolynomialLibrary() * FourierLibrary(),
+        pytest.lazy_fixture("data_generalized_library"),
+        pytest.lazy_fixture("data_custom_library_bias"),
+    ],
+)
+def test_transform_columns(data_lorenz, library):
+    x, t = data_lorenz
+    xp = np.asarray(library.fit_transform(x))
+    columns = np.random.default_rng(0).permutation(xp.shape[1])[: xp.shape[1] // 2]
+    np.testing.assert_allclose(library.transform_columns(x, columns), xp[:, columns])
+    assert library.transform_columns(x, []).shape == (x.shape[0], 0)
+
+
+@pytest.mark.parametrize("interaction_only", [True, False])
+def test_vectorized_functions(data_lorenz, interaction_only, monkeypatch):
+    # Small blocks, so that functions are called on several blocks of samples
+    monkeypatch.setattr(base, "_VECTORIZED_BLOCK_SIZE", 50)
+    x, t = data_lorenz
+    grid = np.linspace(0, 10, 30)
+    spatiotemporal_grid = np.stack(np.meshgrid(grid, grid, indexing="ij"), axis=-1)
+    u = np.random.default_rng(0).standard_normal((30, 30, 2))
+    functions = [lambda x: x, lambda x, y: x * y, lambda x, y: np.sin(x + y)]
+    options = {"interaction_only": interaction_only}
+    cases = [
+        (lambda **kw: CustomLibrary(functions, include_bias=True, **kw), x),
+        (
+            lambda **kw: SINDyPILibrary(
+                library_functions=functions,
+                x_dot_library_functions=functions[:2],
+                t=t,
+                **kw,
+            ),
+            x,
+        ),
+        (
+            lambda **kw: PDELibrary(
+                functions, derivative_order=2, spatial_grid=grid, **kw
+            ),
+            u,
+        ),
+        (
+            lambda **kw: WeakPDELibrary(
+                functions,
+                derivative_order=2,
+                spatiotemporal_grid=spatiotemporal_grid,
+                K=10,
+                **kw,
+            ),
+            u,
+        ),
+    ]
+    for make_library, data in cases:
+        np.random.seed(0)
+        expected = make_library(**options).fit_transform(data)
+        np.random.seed(0)
+        library = make_library(vectorized=True, **options)
+        np.testing.assert_allclose(library.fit_transform(data), expected)
+
+    library = CustomLibrary(functions, include_bias=True, vectorized=True).fit(x)
+    columns = [4, 0, 2, 7]
+    np.testing.assert_allclose(
+        library.transform_columns(x, columns),
+        np.asarray(library.transform(x))[:, columns],
+    )
+
+
+def test_custom_library_pointwise():
+    assert not CustomLibrary([np.sin])._pointwise
+    assert CustomLibrary([np.sin], vectorized=True)._pointwise
+
+
+def test_transform_derivative_not_implemented(data_lorenz, data_custom_library):
+    x, t = data_lorenz
+    data_custom_library.fit(x)
+    with pytest.raises(NotImplementedError):
+        data_custom_library.transform_derivative(x)
+
+
 def test_not_implemented(data_lorenz):
     x, t = data_lorenz
     library = BaseFeatureLibrary()
@@ -410,6 +596,36 @@ def test_tensored(data_lorenz):
     check_is_fitted(tensored_lib)
 
 
+def test_tensored_transforms_each_library_once(data_lorenz, monkeypatch):
+    x, t = data_lorenz
+    libraries = [PolynomialLibrary(degree=2), FourierLibrary(), IdentityLibrary()]
+    tensored_lib = TensoredLibrary(libraries).fit(x)
+    features = [np.asarray(lib.transform(x)) for lib in tensored_lib.libraries_]
+    expected = np.concatenate(
+        [
+            (features[i][:, :, np.newaxis] * features[j][:, np.newaxis, :]).reshape(
+                len(x), -1
+            )
+            for i, j in [(0, 1), (0, 2), (1, 2)]
+        ],
+        axis=1,
+    )
+
+    calls = []
+    for lib in tensored_lib.libraries_:
+
+        def transform(x_full, transform=lib.transform):
+            calls.append(len(x_full))
+            return transform(x_full)
+
+        monkeypatch.setattr(lib, "transform", transform)
+    xp = tensored_lib.transform([x, x[:100]])
+    assert calls == [2, 2, 2]
+    np.testing.assert_allclose(xp[0], expected)
+    np.testing.assert_allclose(xp[1], expected[:100])
+    assert expected.shape[1] == len(tensored_lib.get_feature_names())
+
+
 @pytest.mark.parametrize(
     "library",
     [
@@ -806,6 +1022,27 @@ def test_1D_weak_pdes():
     pde_library_helper(pde_lib, u, 1)
 
 
+def test_weak_pde_float32():
+    n = 20
+    x = np.linspace(0, 10, n)
+    t = np.linspace(0, 10, n)
+    X, T = np.meshgrid(x, t, indexing="ij")
+    u = (np.sin(X) * np.exp(-0.1 * T))[..., np.newaxis]
+    np.random.seed(0)
+    pde_lib = WeakPDELibrary(
+        library_functions=[lambda x: x, lambda x: x * x],
+        function_names=[lambda x: x, lambda x: x + x],
+        derivative_order=2,
+        spatiotemporal_grid=np.stack([X, T], axis=-1),
+        K=5,
+        include_bias=True,
+    ).fit([u])
+    xp = pde_lib.transform([u.astype(np.float32)])[0]
+    assert xp.dtype == np.float32
+    assert pde_lib.convert_u_dot_integral(u.astype(np.float32)).dtype == np.float32
+    np.testing.assert_allclose(xp, pde_lib.transform([u])[0], rtol=1e-3, atol=1e-4)
+
+
 def test_2D_weak_pdes():
     n = 10
     t = np.linspace(0, 10, n)
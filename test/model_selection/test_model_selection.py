@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+from sklearn.model_selection import KFold
+
+from pysindy import SINDy
+from pysindy.model_selection import SINDyCV
+from pysindy.model_selection import TrajectoryKFold
+from pysindy.optimizers import SR3
+from pysindy.optimizers import STLSQ
+from pysindy.utils import RaggedTrajectories
+
+
+def test_trajectory_kfold(data_multiple_trajctories):
+    x, _ = data_multiple_trajctories
+    splits = list(TrajectoryKFold(n_splits=3).split(x))
+    assert len(splits) == 3
+    for i, (train, test) in enumerate(splits):
+        np.testing.assert_array_equal(test, [i])
+        assert sorted(np.concatenate([train, test])) == [0, 1, 2]
+    with pytest.raises(TypeError):
+        next(TrajectoryKFold(n_splits=3).split(x[0]))
+
+
+def _brute_force_scores(x, t, thresholds, n_splits, scoring):
+    scores = np.zeros((len(thresholds), n_splits))
+    for i, threshold in enumerate(thresholds):
+        for k, (train, test) in enumerate(TrajectoryKFold(n_splits).split(x)):
+            model = SINDy(optimizer=STLSQ(threshold=threshold))
+            model.fit([x[j] for j in train], t=t, multiple_trajectories=True)
+            x_test = [x[j] for j in test]
+            if scoring == "r2":
+                scores[i, k] = model.score(x_test, t=t, multiple_trajectories=True)
+            else:
+                x_dot = np.concatenate(
+                    model.differentiate(x_test, t=t, multiple_trajectories=True)
+                )
+                x_dot_pred = np.concatenate(
+                    model.predict(x_test, multiple_trajectories=True)
+                )
+                scores[i, k] = -np.mean((x_dot - x_dot_pred) ** 2)
+    return scores
+
+
+@pytest.mark.parametrize("scoring", ["r2", "neg_mean_squared_error"])
+def test_sindy_cv_matches_refits(data_lorenz, scoring):
+    x, t = data_lorenz
+    x = [x[i : i + 100] for i in range(0, 500, 100)]
+    t = t[:100]
+    thresholds = [0.01, 0.5, 5.0]
+    search = SINDyCV(
+        SINDy(),
+        {"optimizer__threshold": thresholds},
+        cv=TrajectoryKFold(n_splits=5),
+        scoring=scoring,
+    ).fit(x, t=t)
+
+    expected = _brute_force_scores(x, t, thresholds, 5, scoring)
+    for k in range(5):
+        np.testing.assert_allclose(
+            search.cv_results_[f"split{k}_test_score"], expected[:, k], rtol=1e-6
+        )
+    assert search.best_index_ == np.argmax(expected.mean(axis=1))
+    assert search.cv_results_["rank_test_score"][search.best_index_] == 1
+
+    best = SINDy(optimizer=STLSQ(threshold=thresholds[search.best_index_]))
+    best.fit(x, t=t, multiple_trajectories=True)
+    np.testing.assert_allclose(
+        search.best_estimator_.coefficients(), best.coefficients(), atol=1e-8
+    )
+
+
+@pytest.mark.parametrize("constant", [0.0, 3.0])
+def test_sindy_cv_constant_target(data_lorenz, constant):
+    x, t = data_lorenz
+    x = [x[i : i + 100] for i in range(0, 500, 100)]
+    t = t[:100]
+    x_dot = [
+        np.column_stack([np.gradient(xi[:, :2], t, axis=0), np.full(len(t), constant)])
+        for xi in x
+    ]
+    thresholds = [0.01, 0.5, 5.0]
+    search = SINDyCV(
+        SINDy(), {"optimizer__threshold": thresholds}, cv=TrajectoryKFold(n_splits=5)
+    ).fit(x, t=t, x_dot=x_dot)
+    scores = search.cv_results_["mean_test_score"]
+    assert np.all(np.isfinite(scores))
+    assert np.all(scores <= 1)
+    if constant == 0:
+        # Exactly predicted, so the constant target scores 1 as in r2_score
+        expected = np.zeros(len(thresholds))
+        for i, threshold in enumerate(thresholds):
+            for train, test in TrajectoryKFold(n_splits=5).split(x):
+                model = SINDy(optimizer=STLSQ(threshold=threshold))
+                model.fit(
+                    [x[j] for j in train],
+                    t=t,
+                    x_dot=[x_dot[j] for j in train],
+                    multiple_trajectories=True,
+                )
+                expected[i] += model.score(
+                    [x[j] for j in test],
+                    t=t,
+                    x_dot=[x_dot[j] for j in test],
+                    multiple_trajectories=True,
+                )
+        np.testing.assert_allclose(scores, expected / 5, rtol=1e-6)
+
+
+def test_sindy_cv_parallel(data_multiple_trajctories):
+    x, t = data_multiple_trajctories
+    x = x + [xi[::-1] for xi in x]
+    t = t + t
+    param_grid = [
+        {"optimizer__threshold": [0.1, 1.0]},
+        {"optimizer__alpha": [0.01, 1.0], "optimizer__threshold": [0.1]},
+    ]
+    serial = SINDyCV(SINDy(), param_grid, cv=3).fit(x, t=t)
+    parallel = SINDyCV(SINDy(), param_grid, cv=3, n_jobs=2).fit(x, t=t)
+    np.testing.assert_array_equal(
+        serial.cv_results_["mean_test_score"], parallel.cv_results_["mean_test_score"]
+    )
+    assert len(serial.cv_results_["params"]) == 4
+    assert parallel.best_params_ == serial.best_params_
+
+
+def test_sindy_cv_ragged(data_lorenz):
+    x, t = data_lorenz
+    x = [x[i : i + 100] for i in range(0, 500, 100)]
+    dt = t[1] - t[0]
+    param_grid = {"optimizer__threshold": [0.01, 0.5, 5.0]}
+    expected = SINDyCV(SINDy(), param_grid, cv=5).fit(x, t=dt)
+    search = SINDyCV(SINDy(), param_grid, cv=5).fit(
+        RaggedTrajectories.from_list(x), t=dt
+    )
+    np.testing.assert_allclose(
+        search.cv_results_["mean_test_score"], expected.cv_results_["mean_test_score"]
+    )
+    np.testing.assert_allclose(
+        search.best_estimator_.coefficients(), expected.best_estimator_.coefficients()
+    )
+
+
+def test_sindy_cv_errors(data_multiple_trajctories):
+    x, t = data_multiple_trajctories
+    with pytest.raises(ValueError):
+        SINDyCV(SINDy(), {"feature_library__degree": [1, 2]}, cv=3).fit(x, t=t)
+    with pytest.raises(ValueError):
+        SINDyCV(
+            SINDy(optimizer=SR3(fit_intercept=True)), {"optimizer__threshold": [0.1]}
+        ).fit(x, t=t)
+    with pytest.raises(ValueError):
+        SINDyCV(SINDy(), {"optimizer__threshold": [0.1]}, scoring="max").fit(x, t=t)
+    with pytest.raises(TypeError):
+        SINDyCV(STLSQ(), {"optimizer__threshold": [0.1]}).fit(x, t=t)
+    with pytest.raises(ValueError):
+        SINDyCV(SINDy(), {"optimizer__threshold": [0.1]}, cv=KFold(5)).fit(x, t=t)
@@ -6,6 +6,7 @@ import pytest
 from numpy.linalg import norm
 from scipy.integrate import solve_ivp
 from sklearn.base import BaseEstimator
+from sklearn.base import clone
 from sklearn.exceptions import ConvergenceWarning
 from sklearn.exceptions import NotFittedError
 from sklearn.linear_model import ElasticNet
@@ -186,7 +187,9 @@ def test_sample_weight_optimizers(data_lorenz, optimizer):
 
 
 @pytest.mark.parametrize("optimizer", [STLSQ, SR3, ConstrainedSR3, StableLinearSR3])
-@pytest.mark.parametrize("params", [dict(threshold=-1), dict(max_iter=0)])
+@pytest.mark.parametrize(
+    "params", [dict(threshold=-1), dict(max_iter=0), dict(max_history=1)]
+)
 def test_general_bad_parameters(optimizer, params):
     with pytest.raises(ValueError):
         optimizer(**params)
@@ -207,6 +210,35 @@ def test_sr3_bad_parameters(optimizer, params):
         optimizer(**params)
 
 
+@pytest.mark.parametrize(
+    "optimizer",
+    [
+        STLSQ(threshold=0.1),
+        SR3(threshold=0.1, trimming_fraction=0.1),
+        ConstrainedSR3(threshold=0.1, trimming_fraction=0.1),
+    ],
+)
+def test_max_history(optimizer, data_lorenz):
+    x, t = data_lorenz
+    theta = PolynomialLibrary().fit_transform(x)
+    x_dot = FiniteDifference()._differentiate(x, t)
+    optimizer.fit(theta, x_dot)
+    capped = clone(optimizer).set_params(max_history=2).fit(theta, x_dot)
+    np.testing.assert_array_equal(capped.coef_, optimizer.coef_)
+    assert len(optimizer.history_) > 2
+    assert len(capped.history_) == 2
+    np.testing.assert_array_equal(capped.history_[-1], optimizer.history_[-1])
+    if hasattr(capped, "history_trimming_"):
+        assert len(capped.history_trimming_) == 2
+
+
+def test_max_history_keeps_positional_arguments():
+    initial_guess = np.zeros((3, 10))
+    opt = STLSQ(0.1, 0.05, 20, None, False, False, True, initial_guess)
+    assert opt.initial_guess is initial_guess
+    assert opt.max_history is None
+
+
 @pytest.mark.parametrize(
     "params",
     [
@@ -1028,6 +1060,57 @@ def test_normalize_columns(data_derivative_1d, optimizer):
         assert opt.coef_.shape == (1, x.shape[1])
 
 
+def test_fit_does_not_copy(data_lorenz):
+    x, t = data_lorenz
+    theta = PolynomialLibrary().fit_transform(x)
+    x_dot = FiniteDifference()(x, t)
+    opt = STLSQ(threshold=0.1, store_theta=True).fit(theta, x_dot)
+    assert np.shares_memory(opt.Theta_, theta)
+    assert not hasattr(STLSQ(threshold=0.1).fit(theta, x_dot), "Theta_")
+
+
+def test_fit_without_check_input(data_lorenz, monkeypatch):
+    x, t = data_lorenz
+    theta = PolynomialLibrary().fit_transform(x)
+    x_dot = FiniteDifference()(x, t)
+    expected = STLSQ(threshold=0.1).fit(theta, x_dot).coef_
+
+    def check_X_y(*args, **kwargs):
+        raise AssertionError("check_X_y should be skipped")
+
+    monkeypatch.setattr("pysindy.optimizers.base.check_X_y", check_X_y)
+    opt = STLSQ(threshold=0.1).fit(theta, x_dot, check_input=False)
+    np.testing.assert_array_equal(opt.coef_, expected)
+    # SINDy skips it for its library matrix
+    SINDy(optimizer=STLSQ(threshold=0.1)).fit(x, t)
+    SINDy(optimizer=EnsembleOptimizer(STLSQ(), bagging=True)).fit(x, t)
+
+
+@pytest.mark.parametrize(
+    "optimizer",
+    [
+        STLSQ(),
+        STLSQ(ridge_kw={"solver": "svd"}),
+        SR3(),
+        SR3(trimming_fraction=0.1),
+        SSR(),
+    ],
+)
+@pytest.mark.parametrize("copy_X", [True, False])
+def test_normalize_columns_keeps_x(data_lorenz, optimizer, copy_X):
+    x, t = data_lorenz
+    theta = PolynomialLibrary().fit_transform(x)
+    x_dot = FiniteDifference()(x, t)
+    theta_copy = theta.copy()
+    reg = 1 / np.linalg.norm(theta, axis=0)
+    expected = clone(optimizer).fit(theta * reg, x_dot).coef_ * reg
+
+    opt = clone(optimizer).set_params(normalize_columns=True, copy_X=copy_X)
+    opt.fit(theta, x_dot)
+    np.testing.assert_allclose(opt.coef_, expected, atol=1e-8)
+    np.testing.assert_array_equal(theta, theta_copy)
+
+
 @pytest.mark.parametrize(
     "optimizer",
     [
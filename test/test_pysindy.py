@@ -12,8 +12,23 @@ To run tests for just one file, run
 pytest file_to_test.py
 
 """
+import asyncio
+import importlib.util
+import json
+import pickle
+import re
+import subprocess
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pytest
+from joblib import parallel_backend
+from scipy.integrate import odeint
+from scipy.integrate import solve_ivp
+from sklearn.base import clone
 from sklearn.exceptions import ConvergenceWarning
 from sklearn.exceptions import NotFittedError
 from sklearn.linear_model import ElasticNet
@@ -22,17 +37,23 @@ from sklearn.model_selection import RandomizedSearchCV
 from sklearn.model_selection import TimeSeriesSplit
 from sklearn.utils.validation import check_is_fitted
 
+from pysindy import FeatureCache
+from pysindy import FitProgress
 from pysindy import SINDy
 from pysindy.differentiation import FiniteDifference
 from pysindy.differentiation import SINDyDerivative
 from pysindy.differentiation import SmoothedFiniteDifference
+from pysindy.feature_library import CustomLibrary
 from pysindy.feature_library import FourierLibrary
 from pysindy.feature_library import PDELibrary
 from pysindy.feature_library import PolynomialLibrary
 from pysindy.feature_library import WeakPDELibrary
 from pysindy.optimizers import ConstrainedSR3
+from pysindy.optimizers import EnsembleOptimizer
 from pysindy.optimizers import SR3
+from pysindy.optimizers import SSR
 from pysindy.optimizers import STLSQ
+from pysindy.utils import RaggedTrajectories
 
 
 def test_get_feature_names_len(data_lorenz):
@@ -232,6 +253,653 @@ def test_simulate(data):
         x1 = model.simulate(np.ravel(x[0]), t, integrator="None")
 
 
+def test_compile_rhs(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    rhs = model.compile_rhs()
+
+    np.testing.assert_allclose(rhs(0, x[0]), model.predict(x[:1])[0])
+    np.testing.assert_allclose(rhs(0, x), model.predict(x))
+
+
+def test_predict_evaluates_active_terms(data_lorenz):
+    x, t = data_lorenz
+    library = PolynomialLibrary(degree=4) + FourierLibrary()
+    model = SINDy(feature_library=library).fit(x, t)
+    evaluated = []
+    transform_columns = library.transform_columns
+
+    def spy(x, columns):
+        evaluated.append(columns)
+        return transform_columns(x, columns)
+
+    library.transform_columns = spy
+    np.testing.assert_allclose(model.predict(x), model.model.predict([x]))
+    np.testing.assert_array_equal(
+        evaluated[0], np.flatnonzero(np.any(model.coefficients() != 0, axis=0))
+    )
+    assert len(evaluated[0]) < library.n_output_features_
+
+
+@pytest.mark.filterwarnings("ignore:Library ensembling")
+def test_predict_library_ensemble(data_lorenz):
+    x, t = data_lorenz
+    library = PolynomialLibrary(library_ensemble=True, ensemble_indices=[0, 2])
+    model = SINDy(feature_library=library).fit(x, t)
+    coef = model.coefficients()
+    np.testing.assert_allclose(model.predict(x), library.transform(x) @ coef.T)
+
+    def rhs(t, x):
+        return (library.transform(x[np.newaxis]) @ coef.T)[0]
+
+    expected = solve_ivp(
+        rhs, (t[0], t[9]), x[0], t_eval=t[:10], method="LSODA", rtol=1e-12, atol=1e-12
+    ).y.T
+    np.testing.assert_allclose(model.simulate(x[0], t[:10]), expected, rtol=1e-8)
+
+
+def _import_exported(path):
+    spec = importlib.util.spec_from_file_location("exported_model", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize(
+    "library",
+    [
+        PolynomialLibrary(degree=3),
+        PolynomialLibrary(degree=2) + FourierLibrary(n_frequencies=2),
+        PolynomialLibrary(degree=2) * FourierLibrary(),
+        pytest.lazy_fixture("data_generalized_library"),
+    ],
+)
+def test_export_numpy(tmp_path, data_lorenz, library):
+    x, t = data_lorenz
+    model = SINDy(feature_library=library, optimizer=STLSQ(threshold=0.01))
+    model.fit(x, t)
+    path = tmp_path / "model.py"
+    model.export(path)
+    source = path.read_text()
+    assert "pysindy" not in source.split('"""')[-1]
+    exported = _import_exported(path)
+
+    np.testing.assert_allclose(exported.rhs(x), model.predict(x), atol=1e-10)
+    np.testing.assert_allclose(exported.rhs(x[0]), model.predict(x[:1])[0], atol=1e-10)
+    np.testing.assert_allclose(
+        exported.jacobian(x), model.jacobian(x), rtol=1e-10, atol=1e-10
+    )
+
+
+def test_export_numpy_shares_monomials(tmp_path, data_lorenz_c_1d):
+    x, t, u, _ = data_lorenz_c_1d
+    model = SINDy(feature_library=PolynomialLibrary(degree=3))
+    model.fit(x, t, u=u)
+    model.export(tmp_path / "model.py")
+    exported = _import_exported(tmp_path / "model.py")
+    np.testing.assert_allclose(exported.rhs(x, u), model.predict(x, u=u), rtol=1e-12)
+    np.testing.assert_allclose(
+        exported.jacobian(x[0], u[0]), model.jacobian(x[0], u[0])
+    )
+
+    # Each monomial is computed once, as a lower degree monomial times an input
+    rhs_source = (tmp_path / "model.py").read_text().split("def jacobian")[0]
+    products = re.findall(r"^    (\w+) = (\w+) \* (\w+)$", rhs_source, re.M)
+    defined = [name for name, _, _ in products]
+    assert len(defined) == len(set(defined))
+    assert any(parent in defined for _, parent, _ in products)
+
+
+def test_export_errors(tmp_path, data_lorenz, data_custom_library):
+    x, t = data_lorenz
+    model = SINDy().fit(x, t)
+    with pytest.raises(ValueError):
+        model.export(tmp_path / "model.c", target="c")
+    model = SINDy(feature_library=data_custom_library).fit(x, t)
+    with pytest.raises(NotImplementedError):
+        model.export(tmp_path / "model.py")
+
+
+@pytest.mark.parametrize(
+    "optimizer",
+    [
+        STLSQ(threshold=0.1, store_theta=True),
+        SSR(alpha=0.05, store_theta=True),
+        EnsembleOptimizer(
+            STLSQ(threshold=0.1, store_theta=True), bagging=True, n_models=5
+        ),
+    ],
+)
+def test_compact(data_lorenz, optimizer):
+    x, t = data_lorenz
+    x = np.tile(x, (20, 1))
+    t = np.arange(len(x)) * (t[1] - t[0])
+    model = SINDy(optimizer=optimizer, feature_library=PolynomialLibrary(degree=3))
+    np.random.seed(0)
+    model.fit(x, t=t, quiet=True)
+    x_dot = model.predict(x)
+    x_sim = model.simulate(x[0], t[:50])
+    size = len(pickle.dumps(model))
+
+    model.compact()
+    compact_size = len(pickle.dumps(model))
+    assert compact_size < size / 20
+    for opt in (model.optimizer, getattr(model.optimizer, "opt", None)):
+        assert not hasattr(opt, "Theta_")
+        assert not hasattr(opt, "history_")
+    np.testing.assert_array_equal(model.predict(x), x_dot)
+    np.testing.assert_array_equal(model.simulate(x[0], t[:50]), x_sim)
+    model.print()
+
+    lean = SINDy(
+        optimizer=clone(optimizer),
+        feature_library=PolynomialLibrary(degree=3),
+        lean=True,
+    )
+    np.random.seed(0)
+    lean.fit(x, t=t, quiet=True)
+    assert len(pickle.dumps(lean)) == compact_size
+    np.testing.assert_array_equal(lean.coefficients(), model.coefficients())
+
+
+# Module level functions, so that the weak library can be pickled
+def _identity(x):
+    return x
+
+
+def _square(x):
+    return x * x
+
+
+def _square_name(x):
+    return x + x
+
+
+def test_compact_weak(diffuse_multiple_trajectories):
+    t, x, u = diffuse_multiple_trajectories
+    X, T = np.meshgrid(x, t)
+    weak_lib = WeakPDELibrary(
+        library_functions=[_identity, _square],
+        function_names=[_identity, _square_name],
+        derivative_order=2,
+        spatiotemporal_grid=np.array([X, T]).T,
+        K=20,
+    )
+    model = SINDy(feature_library=weak_lib).fit(u[0], t=t)
+    assert hasattr(weak_lib, "x_k")
+    size = len(pickle.dumps(model))
+    model.compact()
+    assert not hasattr(weak_lib, "x_k")
+    assert len(pickle.dumps(model)) < size
+    model.print()
+
+
+@pytest.mark.parametrize(
+    "params, coef_members",
+    [
+        (dict(), ["coef"]),
+        (dict(feature_library=PolynomialLibrary(degree=8)), ["coef_rows"]),
+        (
+            dict(
+                feature_library=PolynomialLibrary(degree=2) * FourierLibrary(),
+                differentiation_method=SmoothedFiniteDifference(),
+                optimizer=SR3(threshold=0.05, fit_intercept=True),
+                feature_names=["x", "y", "z"],
+            ),
+            ["coef"],
+        ),
+        (
+            dict(
+                optimizer=EnsembleOptimizer(STLSQ(threshold=0.5), bagging=True),
+                dtype=np.float32,
+            ),
+            ["coef"],
+        ),
+    ],
+)
+def test_save_load(tmp_path, data_lorenz, params, coef_members):
+    x, t = data_lorenz
+    model = SINDy(**params).fit(x, t=t, quiet=True)
+    path = tmp_path / "model.npz"
+    model.save(path)
+    assert set(coef_members) <= set(np.load(path).files)
+
+    loaded = SINDy.load(path)
+    if "coef" in coef_members:
+        assert isinstance(loaded.optimizer.coef_, np.memmap)
+    assert loaded.equations() == model.equations()
+    assert loaded.feature_names == model.feature_names
+    assert loaded.n_output_features_ == model.n_output_features_
+    np.testing.assert_array_equal(loaded.coefficients(), model.coefficients())
+    np.testing.assert_array_equal(loaded.predict(x), model.predict(x))
+    np.testing.assert_array_equal(
+        loaded.simulate(x[0], t[:50]), model.simulate(x[0], t[:50])
+    )
+    assert loaded.score(x, t=t) == model.score(x, t=t)
+
+    loaded = SINDy.load(path, mmap_mode=None)
+    assert not isinstance(loaded.optimizer.coef_, np.memmap)
+    np.testing.assert_array_equal(loaded.predict(x), model.predict(x))
+
+
+def test_save_load_control(tmp_path, data_lorenz_c_1d, data_discrete_time_c):
+    x, t, u, _ = data_lorenz_c_1d
+    model = SINDy().fit(x, u=u, t=t)
+    model.save(tmp_path / "model.npz")
+    loaded = SINDy.load(tmp_path / "model.npz")
+    assert loaded.n_control_features_ == 2
+    assert loaded.equations() == model.equations()
+    np.testing.assert_array_equal(loaded.predict(x, u=u), model.predict(x, u=u))
+
+    x, u = data_discrete_time_c
+    model = SINDy(discrete_time=True).fit(x, u=u)
+    model.save(tmp_path / "model.npz")
+    loaded = SINDy.load(tmp_path / "model.npz")
+    assert loaded.discrete_time
+    np.testing.assert_array_equal(
+        loaded.simulate(x[0], 10, u=u), model.simulate(x[0], 10, u=u)
+    )
+
+
+def test_save_load_errors(tmp_path, data_lorenz, data_custom_library):
+    x, t = data_lorenz
+    with pytest.raises(NotImplementedError):
+        SINDy(feature_library=data_custom_library).fit(x, t).save(
+            tmp_path / "custom.npz"
+        )
+
+    np.savez(tmp_path / "arrays.npz", x=x)
+    with pytest.raises(ValueError):
+        SINDy.load(tmp_path / "arrays.npz")
+
+    path = tmp_path / "model.npz"
+    SINDy().fit(x, t).save(path)
+    with zipfile.ZipFile(path) as archive:
+        metadata = json.loads(archive.read("model.json"))
+    metadata["version"] += 1
+    with zipfile.ZipFile(tmp_path / "newer.npz", mode="w") as archive:
+        archive.writestr("model.json", json.dumps(metadata))
+    with pytest.raises(ValueError, match="version"):
+        SINDy.load(tmp_path / "newer.npz")
+    with pytest.raises(ValueError):
+        SINDy.load(path, mmap_mode="w+")
+
+
+def test_afit(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy(optimizer=SR3(threshold=0.1, max_iter=50))
+
+    async def fit():
+        progress = FitProgress()
+        task = asyncio.create_task(model.afit(x, t=t, quiet=True, progress=progress))
+        updates = [update async for update in progress]
+        await task
+        score = await model.ascore(x, t=t)
+        x_sim = await model.asimulate(x[0], t[:20])
+        return updates, score, x_sim
+
+    updates, score, x_sim = asyncio.run(fit())
+    expected = SINDy(optimizer=SR3(threshold=0.1, max_iter=50)).fit(x, t=t, quiet=True)
+    np.testing.assert_array_equal(model.coefficients(), expected.coefficients())
+    assert [update["iteration"] for update in updates] == list(range(len(updates)))
+    assert [update["objective"] for update in updates] == (
+        model.optimizer.objective_history
+    )
+    assert score == expected.score(x, t=t)
+    np.testing.assert_array_equal(x_sim, expected.simulate(x[0], t[:20]))
+
+
+def test_afit_cancel(data_lorenz):
+    x, t = data_lorenz
+    # Never converges
+    model = SINDy(optimizer=SR3(threshold=0.1, max_iter=10**9, tol=1e-300))
+
+    async def fit():
+        progress = FitProgress()
+        task = asyncio.create_task(model.afit(x, t=t, quiet=True, progress=progress))
+        async for update in progress:
+            if update["iteration"] == 3:
+                task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(fit())
+    n_iterations = len(model.optimizer.history_)
+    time.sleep(0.1)
+    assert len(model.optimizer.history_) == n_iterations
+
+
+def test_afit_process_pool(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy()
+
+    async def fit():
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            await model.afit(x, t=t, executor=executor)
+            with pytest.raises(ValueError):
+                await SINDy().afit(x, t=t, executor=executor, progress=FitProgress())
+
+    asyncio.run(fit())
+    np.testing.assert_array_equal(
+        model.coefficients(), SINDy().fit(x, t=t).coefficients()
+    )
+
+
+@pytest.mark.parametrize("integrator", ["solve_ivp", "odeint"])
+def test_simulate_matches_predict(data_lorenz, integrator):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    t_sim = t[:100]
+    x_sim = model.simulate(x[0], t_sim, integrator=integrator)
+
+    def rhs(t, x):
+        return model.predict(x[np.newaxis, :])[0]
+
+    if integrator == "solve_ivp":
+        kws = {"method": "LSODA", "rtol": 1e-12, "atol": 1e-12}
+        x_ref = solve_ivp(rhs, (t_sim[0], t_sim[-1]), x[0], t_eval=t_sim, **kws).y.T
+    else:
+        x_ref = odeint(rhs, x[0], t_sim, tfirst=True)
+    np.testing.assert_allclose(x_sim, x_ref, rtol=1e-8, atol=1e-8)
+
+
+@pytest.mark.parametrize("integrator", ["solve_ivp", "odeint"])
+def test_simulate_batch(data_lorenz, integrator):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    t_sim = t[:50]
+    x0 = x[[0, 100, 200]]
+    x_batch = model.simulate_batch(x0, t_sim, integrator=integrator)
+
+    assert x_batch.shape == (3, len(t_sim), x.shape[1])
+    for x0_i, x_i in zip(x0, x_batch):
+        x_ref = model.simulate(x0_i, t_sim, integrator=integrator)
+        np.testing.assert_allclose(x_i, x_ref, rtol=1e-6, atol=1e-6)
+
+
+def test_simulate_batch_discrete_time(data_discrete_time):
+    x = data_discrete_time
+    model = SINDy(discrete_time=True)
+    model.fit(x)
+    x0 = np.array([[0.1], [0.5], [0.7]])
+    x_batch = model.simulate_batch(x0, 20)
+
+    assert x_batch.shape == (3, 20, 1)
+    for x0_i, x_i in zip(x0, x_batch):
+        np.testing.assert_allclose(x_i, model.simulate(x0_i, 20))
+
+
+def test_simulate_batch_errors(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    with pytest.raises(ValueError):
+        model.simulate_batch(x[0], t)
+    with pytest.raises(ValueError):
+        model.simulate_batch(x[:2], t=1)
+    with pytest.raises(ValueError):
+        model.simulate_batch(x[:2], t, integrator="None")
+
+
+@pytest.mark.parametrize(
+    "optimizer", [STLSQ(), SR3(), STLSQ(normalize_columns=True, threshold=0.5)]
+)
+def test_partial_fit(data_lorenz, optimizer):
+    x, t = data_lorenz
+    model = SINDy(optimizer=optimizer).fit(x, t)
+    coef = model.coefficients()
+
+    streamed = SINDy(optimizer=optimizer)
+    for chunk in [slice(0, 200), slice(200, 350), slice(350, None)]:
+        streamed.partial_fit(x[chunk], t[chunk])
+    streamed.finalize()
+    assert streamed.gram_.n_samples == x.shape[0]
+    assert streamed.n_output_features_ == model.n_output_features_
+    # Chunk edges use one-sided difference stencils
+    np.testing.assert_allclose(streamed.coefficients(), coef, rtol=1e-2, atol=1e-2)
+    np.testing.assert_array_equal(streamed.coefficients() != 0, coef != 0)
+
+    single = SINDy(optimizer=optimizer)
+    single.partial_fit(x, t).finalize()
+    np.testing.assert_allclose(single.coefficients(), coef, atol=1e-8)
+
+
+def test_partial_fit_errors(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy()
+    with pytest.raises(ValueError):
+        model.finalize()
+    model.partial_fit(x, t)
+    with pytest.raises(ValueError):
+        model.partial_fit(x, t, u=x[:, 0])
+
+    model = SINDy(optimizer=STLSQ(fit_intercept=True))
+    model.partial_fit(x, t)
+    with pytest.raises(ValueError):
+        model.finalize()
+
+
+def test_fit_path(data_lorenz):
+    x, t = data_lorenz
+    thresholds = [0.01, 0.1, 0.5, 2.0, 50.0]
+    path = SINDy().fit_path(x, thresholds, t=t)
+
+    assert path["coefficients"].shape == (5, 3, 10)
+    assert path["residuals"].shape == (5, 3)
+    assert path["n_samples"] == x.shape[0]
+    assert np.all(np.diff(path["complexity"]) <= 0)
+    assert path["complexity"][-1] == 0
+    for i, threshold in enumerate(thresholds):
+        model = SINDy(optimizer=STLSQ(threshold=threshold)).fit(x, t)
+        np.testing.assert_allclose(
+            path["coefficients"][i], model.coefficients(), atol=1e-8
+        )
+        x_dot = model.differentiate(x, t)
+        np.testing.assert_allclose(
+            path["residuals"][i],
+            np.sum((x_dot - model.predict(x)) ** 2, axis=0),
+            rtol=1e-8,
+        )
+        assert path["complexity"][i] == model.complexity
+
+
+def test_fit_path_sr3_with_intercept(data_lorenz):
+    x, t = data_lorenz
+    optimizer = SR3(fit_intercept=True, max_iter=1000, tol=1e-12)
+    path = SINDy(optimizer=optimizer).fit_path(x, [0.1, 1.0], t=t)
+    model = SINDy(optimizer=SR3(threshold=1.0, fit_intercept=True)).fit(x, t)
+    np.testing.assert_array_equal(
+        path["coefficients"][1] != 0, model.coefficients() != 0
+    )
+    x_dot = model.differentiate(x, t)
+    predicted = PolynomialLibrary().fit_transform(x) @ path["coefficients"][1].T
+    np.testing.assert_allclose(
+        path["residuals"][1],
+        np.sum((x_dot - predicted - path["intercepts"][1]) ** 2, axis=0),
+    )
+
+    with pytest.raises(ValueError):
+        SINDy(optimizer=EnsembleOptimizer(STLSQ())).fit_path(x, [0.1], t=t)
+
+
+@pytest.mark.parametrize(
+    "differentiation_method",
+    [
+        FiniteDifference(axis=-2),
+        FiniteDifference(axis=-2, order=3, drop_endpoints=True),
+        SmoothedFiniteDifference(axis=-2),
+    ],
+)
+def test_fit_blocks(data_lorenz, differentiation_method):
+    x, t = data_lorenz
+    model = SINDy(
+        differentiation_method=differentiation_method,
+        optimizer=STLSQ(store_theta=True),
+    ).fit(x, t)
+    blocked = SINDy(differentiation_method=differentiation_method)
+    blocked.fit(x, t, block_size=64)
+
+    assert blocked.gram_.n_samples == model.model.steps[-1][1].optimizer.Theta_.shape[0]
+    np.testing.assert_allclose(blocked.coefficients(), model.coefficients(), atol=1e-8)
+
+
+def test_fit_memmap(data_lorenz, data_lorenz_c_2d, tmp_path):
+    x, t = data_lorenz
+    np.save(tmp_path / "x.npy", x)
+    model = SINDy().fit(x, t)
+
+    from_path = SINDy().fit(str(tmp_path / "x.npy"), t, block_size=100)
+    np.testing.assert_allclose(from_path.coefficients(), model.coefficients())
+
+    x_mm = np.load(tmp_path / "x.npy", mmap_mode="r")
+    from_memmap = SINDy().fit([x_mm, x_mm], [t, t], multiple_trajectories=True)
+    np.testing.assert_allclose(from_memmap.coefficients(), model.coefficients())
+
+    x_dot = model.differentiate(x, t)
+    with_x_dot = SINDy().fit(x_mm, t, x_dot=x_dot, block_size=33)
+    np.testing.assert_allclose(with_x_dot.coefficients(), model.coefficients())
+
+    x, t, u, _ = data_lorenz_c_2d
+    model = SINDy().fit(x, t, u=u)
+    blocked = SINDy().fit(x, t, u=u, block_size=50)
+    np.testing.assert_allclose(blocked.coefficients(), model.coefficients(), atol=1e-8)
+    assert blocked.n_control_features_ == 2
+
+
+def test_fit_blocks_discrete_time(data_discrete_time_c):
+    x, u = data_discrete_time_c
+    model = SINDy(discrete_time=True).fit(x, u=u)
+    blocked = SINDy(discrete_time=True).fit(x, u=u, block_size=7)
+    assert blocked.gram_.n_samples == x.shape[0] - 1
+    np.testing.assert_allclose(blocked.coefficients(), model.coefficients(), atol=1e-8)
+
+
+def test_fit_blocks_pde(data_1d_random_pde):
+    t, x, u, _ = data_1d_random_pde
+    pde_lib = PDELibrary(
+        library_functions=[lambda x: x, lambda x: x * x],
+        function_names=[lambda x: x, lambda x: x + x],
+        derivative_order=2,
+        spatial_grid=x,
+    )
+    model = SINDy(feature_library=pde_lib).fit(u, t)
+    blocked = SINDy(feature_library=pde_lib).fit(u, t, block_size=30)
+    np.testing.assert_allclose(blocked.coefficients(), model.coefficients(), atol=1e-8)
+
+
+def test_fit_blocks_errors(data_lorenz, data_1d_random_pde):
+    x, t = data_lorenz
+    with pytest.raises(ValueError):
+        SINDy().fit(x, t, block_size=0)
+    with pytest.raises(ValueError):
+        SINDy().fit(x, t, block_size=10, ensemble=True)
+    with pytest.raises(ValueError):
+        SINDy(differentiation_method=SINDyDerivative(kind="spline", s=1e-2)).fit(
+            x, t, block_size=10
+        )
+
+    t, x, u, _ = data_1d_random_pde
+    X, T = np.meshgrid(x, t)
+    weak_lib = WeakPDELibrary(
+        library_functions=[lambda x: x, lambda x: x * x],
+        function_names=[lambda x: x, lambda x: x + x],
+        derivative_order=2,
+        spatiotemporal_grid=np.array([X, T]).T,
+    )
+    with pytest.raises(ValueError):
+        SINDy(feature_library=weak_lib).fit(u, t, block_size=30)
+
+
+def test_jacobian(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    jac = model.jacobian(x[:10])
+    assert jac.shape == (10, 3, 3)
+    np.testing.assert_allclose(model.jacobian(x[0]), jac[0])
+
+    eps = 1e-6
+    for j in range(x.shape[1]):
+        step = np.zeros(x.shape[1])
+        step[j] = eps
+        fd = (model.predict(x[:10] + step) - model.predict(x[:10] - step)) / (2 * eps)
+        np.testing.assert_allclose(jac[..., j], fd, rtol=1e-6, atol=1e-6)
+
+
+def test_simulate_without_analytic_jacobian(data_lorenz, data_custom_library):
+    x, t = data_lorenz
+    model = SINDy(feature_library=data_custom_library)
+    model.fit(x, t)
+    with pytest.raises(NotImplementedError):
+        model.jacobian(x[0])
+    x_sim = model.simulate(x[0], t[:10])
+    assert x_sim.shape == (10, x.shape[1])
+
+
+@pytest.mark.parametrize(
+    "integrator, integrator_kws, use_jacobian, expected",
+    [
+        ("solve_ivp", {"method": "LSODA"}, None, 0),
+        ("solve_ivp", {"method": "LSODA"}, True, 1),
+        ("solve_ivp", {"method": "BDF"}, None, 1),
+        ("solve_ivp", {"method": "BDF"}, False, 0),
+        ("solve_ivp", {"method": "BDF", "jac": None}, True, 0),
+        ("odeint", {}, None, 0),
+        ("odeint", {}, True, 1),
+    ],
+)
+def test_simulate_use_jacobian(
+    data_lorenz, integrator, integrator_kws, use_jacobian, expected
+):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    calls = []
+
+    def compile_jacobian(u=None):
+        calls.append(u)
+        return SINDy.compile_jacobian(model, u=u)
+
+    model.compile_jacobian = compile_jacobian
+    model.simulate(
+        x[0],
+        t[:10],
+        integrator=integrator,
+        integrator_kws=integrator_kws,
+        use_jacobian=use_jacobian,
+    )
+    assert len(calls) == expected
+
+
+def test_simulate_jacobian_failure(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+
+    def transform_derivative(x):
+        raise ValueError("no derivatives")
+
+    model.feature_library.transform_derivative = transform_derivative
+    kws = {"method": "BDF", "rtol": 1e-10, "atol": 1e-10}
+    x_sim = model.simulate(x[0], t[:10], integrator_kws=kws, use_jacobian=True)
+    x_ref = model.simulate(x[0], t[:10], integrator_kws=kws, use_jacobian=False)
+    np.testing.assert_allclose(x_sim, x_ref)
+
+
+@pytest.mark.parametrize("method", ["LSODA", "BDF", "Radau"])
+def test_simulate_batch_implicit(data_lorenz, method):
+    x, t = data_lorenz
+    model = SINDy()
+    model.fit(x, t)
+    kws = {"method": method, "rtol": 1e-10, "atol": 1e-10}
+    x_batch = model.simulate_batch(x[[0, 100]], t[:20], integrator_kws=kws)
+    x_ref = model.simulate(x[100], t[:20], integrator_kws=kws)
+    np.testing.assert_allclose(x_batch[1], x_ref, rtol=1e-6, atol=1e-6)
+
+
 @pytest.mark.parametrize(
     "library",
     [
@@ -371,6 +1039,115 @@ def test_fit_multiple_trajectores(data_multiple_trajctories):
         model.fit(x, t=t, multiple_trajectories=True)
 
 
+@pytest.mark.parametrize("backend", ["threading", "loky"])
+def test_fit_multiple_trajectories_parallel(data_multiple_trajctories, backend):
+    x, t = data_multiple_trajctories
+    x = x + [xi[::-1] for xi in x]
+    t = t + t
+    model = SINDy().fit(x, t=t, multiple_trajectories=True)
+    with parallel_backend(backend, n_jobs=2):
+        parallel = SINDy(n_jobs=2).fit(x, t=t, multiple_trajectories=True)
+    np.testing.assert_array_equal(parallel.coefficients(), model.coefficients())
+
+    x_dot = model.differentiate(x, t=t, multiple_trajectories=True)
+    x_dot_parallel = parallel.differentiate(x, t=t, multiple_trajectories=True)
+    for xdi, xdpi in zip(x_dot, x_dot_parallel):
+        np.testing.assert_array_equal(xdi, xdpi)
+
+
+def test_fit_multiple_trajectories_parallel_weak(diffuse_multiple_trajectories):
+    t, x, u = diffuse_multiple_trajectories
+    X, T = np.meshgrid(x, t)
+    XT = np.array([X, T]).T
+    kwargs = dict(
+        library_functions=[lambda x: x, lambda x: x * x],
+        function_names=[lambda x: x, lambda x: x + x],
+        derivative_order=2,
+        spatiotemporal_grid=XT,
+        K=20,
+    )
+    np.random.seed(0)
+    model = SINDy(feature_library=WeakPDELibrary(**kwargs))
+    model.fit(u, t=t, multiple_trajectories=True)
+    np.random.seed(0)
+    parallel = SINDy(feature_library=WeakPDELibrary(**kwargs), n_jobs=2)
+    parallel.fit(u, t=t, multiple_trajectories=True)
+    np.testing.assert_array_equal(parallel.coefficients(), model.coefficients())
+
+
+def test_feature_cache(data_multiple_trajctories, monkeypatch):
+    x, t = data_multiple_trajctories
+    cache = FeatureCache()
+    library = PolynomialLibrary()
+    coefs = []
+    for threshold in [0.05, 0.1, 0.5]:
+        model = SINDy(
+            optimizer=STLSQ(threshold=threshold),
+            feature_library=library,
+            feature_cache=cache,
+        )
+        model.fit(x, t=t, multiple_trajectories=True)
+        coefs.append(model.coefficients())
+        if threshold == 0.05:
+            # Hits must not differentiate or transform again
+            monkeypatch.setattr(
+                PolynomialLibrary, "transform", lambda *args: pytest.fail()
+            )
+            monkeypatch.setattr(
+                PolynomialLibrary, "calc_trajectory", lambda *args: pytest.fail()
+            )
+    monkeypatch.undo()
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 1)
+
+    for threshold, coef in zip([0.05, 0.1, 0.5], coefs):
+        model = SINDy(optimizer=STLSQ(threshold=threshold))
+        model.fit(x, t=t, multiple_trajectories=True)
+        np.testing.assert_array_equal(model.coefficients(), coef)
+
+    # A fresh, unfitted library with the same parameters is restored from cache
+    model = SINDy(feature_library=PolynomialLibrary(), feature_cache=cache)
+    model.fit(x, t=t, multiple_trajectories=True)
+    assert cache.hits == 3
+    assert model.n_output_features_ == 10
+    model.predict(x[0])
+
+    # Changing data, time, library or differentiation method misses
+    SINDy(feature_cache=cache).fit(x[:2], t=t[:2], multiple_trajectories=True)
+    SINDy(feature_cache=cache).fit(
+        x, t=[2 * ti for ti in t], multiple_trajectories=True
+    )
+    SINDy(feature_library=PolynomialLibrary(degree=3), feature_cache=cache).fit(
+        x, t=t, multiple_trajectories=True
+    )
+    SINDy(
+        differentiation_method=FiniteDifference(order=4, axis=-2), feature_cache=cache
+    ).fit(x, t=t, multiple_trajectories=True)
+    assert (cache.hits, len(cache)) == (3, 5)
+
+    # Cloned estimators share the cache
+    assert clone(model).feature_cache is cache
+
+
+def test_feature_cache_eviction(data_lorenz):
+    x, t = data_lorenz
+    theta = PolynomialLibrary().fit_transform(x)
+    cache = FeatureCache(max_bytes=int(2.5 * (theta.nbytes + x.nbytes)))
+    for scale in [1, 2, 3]:
+        SINDy(feature_cache=cache).fit(scale * x, t)
+    assert len(cache) == 2
+    assert cache.nbytes <= cache.max_bytes
+    SINDy(feature_cache=cache).fit(x, t)
+    assert cache.hits == 0
+
+    arr = np.ones(3)
+    cache.put("key", (arr, 1))
+    assert cache.get("key") == (arr, 1)
+    assert not arr.flags.writeable
+
+    with pytest.raises(ValueError):
+        FeatureCache(max_bytes=0)
+
+
 def test_predict_multiple_trajectories(data_multiple_trajctories):
     x, t = data_multiple_trajctories
     model = SINDy()
@@ -947,3 +1724,158 @@ def test_multiple_trajectories_and_ensemble(diffuse_multiple_trajectories):
     model.fit(u, multiple_trajectories=True, t=t, ensemble=True)
     assert abs(model.coefficients()[0][-1] - 1) < 1e-2
     assert np.all(model.coefficients()[0][:-1] == 0)
+
+
+def test_import_defers_solvers():
+    code = (
+        "import sys, pysindy; "
+        "assert not {'cvxpy', 'gurobipy', 'derivative'} & set(sys.modules); "
+        "pysindy.SINDyPI; "
+        "assert 'cvxpy' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_import_defers_libraries():
+    code = (
+        "import sys, pysindy; "
+        "lazy = {'pysindy.feature_library.' + name for name in ("
+        "'custom_library', 'fourier_library', 'generalized_library', "
+        "'identity_library', 'parameterized_library', 'pde_library', "
+        "'sindy_pi_library', 'weak_pde_library')}; "
+        "assert not lazy & set(sys.modules); "
+        "pysindy.PDELibrary; "
+        "from pysindy.feature_library import ParameterizedLibrary; "
+        "assert 'pysindy.feature_library.pde_library' in sys.modules; "
+        "assert 'pysindy.feature_library.generalized_library' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_optimizer_attribute_error():
+    import pysindy
+
+    with pytest.raises(AttributeError):
+        pysindy.NotAnOptimizer
+    with pytest.raises(AttributeError):
+        pysindy.feature_library.NotALibrary
+    assert "TrappingSR3" in dir(pysindy.optimizers)
+    assert "CustomLibrary" in dir(pysindy)
+    assert "CustomLibrary" in dir(pysindy.feature_library)
+
+
+def test_fit_profile(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy(feature_library=PolynomialLibrary() + FourierLibrary())
+    model.fit(x, t=t, profile=True)
+    stages = model.fit_profile_["stages"]
+    for stage in [
+        "differentiation",
+        "library_fit",
+        "library_transform/PolynomialLibrary[0]",
+        "library_transform/FourierLibrary[1]",
+        "optimizer/_preprocess_data",
+        "optimizer/_reduce",
+        "optimizer/_reduce/iteration",
+        "optimizer/unbias",
+    ]:
+        assert stages[stage]["calls"] >= 1
+        assert stages[stage]["wall_time"] > 0
+    iterations = model.fit_profile_["iterations"]
+    assert len(iterations) == stages["optimizer/_reduce/iteration"]["calls"]
+    assert iterations[0]["optimizer"] == "STLSQ"
+
+    # Profiling does not change the fit
+    assert np.allclose(model.coefficients(), clone(model).fit(x, t=t).coefficients())
+
+
+def test_fit_float32(data_lorenz):
+    x, t = data_lorenz
+    model = SINDy(dtype=np.float32, optimizer=STLSQ(store_theta=True)).fit(x, t=t)
+    assert model.model.steps[-1][1].optimizer.Theta_.dtype == np.float32
+    np.testing.assert_allclose(
+        model.coefficients(), SINDy().fit(x, t=t).coefficients(), atol=1e-2
+    )
+
+    blocks = SINDy(dtype=np.float32).fit(x, t=t, block_size=300)
+    assert blocks.gram_.ThetaTTheta.dtype == np.float64
+    np.testing.assert_allclose(
+        blocks.coefficients(), model.coefficients(), rtol=1e-3, atol=1e-3
+    )
+
+    with pytest.raises(ValueError):
+        SINDy(dtype=int)
+
+
+def _short_trajectories(n_trajectories=40, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(8, 60, size=n_trajectories)
+    x = [rng.normal(size=(n, 2)) for n in lengths]
+    u = [rng.normal(size=(n, 1)) for n in lengths]
+    return x, u
+
+
+@pytest.mark.parametrize(
+    "differentiation_method",
+    [
+        FiniteDifference(),
+        FiniteDifference(order=4, drop_endpoints=True),
+        SmoothedFiniteDifference(smoother_kws={"window_length": 5}),
+        SINDyDerivative(kind="spectral"),
+    ],
+)
+def test_ragged_trajectories(differentiation_method):
+    x, u = _short_trajectories()
+    ragged = RaggedTrajectories.from_list(x)
+    ragged_u = RaggedTrajectories.from_list(u)
+
+    model = SINDy(differentiation_method=differentiation_method)
+    x_dot = model.differentiate(x, t=0.1, multiple_trajectories=True)
+    ragged_x_dot = model.differentiate(ragged, t=0.1)
+    np.testing.assert_allclose(ragged_x_dot.data, np.concatenate(x_dot), atol=1e-10)
+
+    model.fit(x, t=0.1, u=u, multiple_trajectories=True)
+    ragged_model = SINDy(differentiation_method=differentiation_method)
+    ragged_model.fit(ragged, t=0.1, u=ragged_u.data)
+    np.testing.assert_allclose(ragged_model.coefficients(), model.coefficients())
+
+    prediction = ragged_model.predict(ragged, u=ragged_u)
+    np.testing.assert_array_equal(prediction.offsets, ragged.offsets)
+    np.testing.assert_allclose(
+        prediction.data,
+        np.concatenate(model.predict(x, u=u, multiple_trajectories=True)),
+    )
+    assert ragged_model.score(ragged, t=0.1, u=ragged_u) == pytest.approx(
+        model.score(x, t=0.1, u=u, multiple_trajectories=True)
+    )
+
+
+def test_ragged_trajectories_fallbacks():
+    x, _ = _short_trajectories()
+    rng = np.random.default_rng(1)
+    t = [np.cumsum(rng.uniform(0.05, 0.15, size=len(xi))) for xi in x]
+    # Nonuniform time steps
+    model = SINDy().fit(x, t=t, multiple_trajectories=True)
+    ragged_model = SINDy().fit(RaggedTrajectories.from_list(x, t=t))
+    np.testing.assert_allclose(ragged_model.coefficients(), model.coefficients())
+
+    # Discrete time
+    model = SINDy(discrete_time=True).fit(x, multiple_trajectories=True)
+    ragged_model = SINDy(discrete_time=True).fit(RaggedTrajectories.from_list(x))
+    np.testing.assert_allclose(ragged_model.coefficients(), model.coefficients())
+
+    # A library that is not pointwise sees each trajectory on its own
+    library = PDELibrary(library_functions=[lambda x: x], function_names=[lambda x: x])
+    model = SINDy(feature_library=library).fit(x, t=0.1, multiple_trajectories=True)
+    ragged_model = SINDy(feature_library=library).fit(
+        RaggedTrajectories.from_list(x), t=0.1
+    )
+    np.testing.assert_allclose(ragged_model.coefficients(), model.coefficients())
+
+    # Nor is a CustomLibrary, unless its functions are vectorized (elementwise)
+    library = CustomLibrary([lambda x: x - np.mean(x)])
+    model = SINDy(feature_library=library).fit(x, t=0.1, multiple_trajectories=True)
+    np.testing.assert_allclose(
+        model.predict(RaggedTrajectories.from_list(x)).data,
+        np.concatenate(model.predict(x, multiple_trajectories=True)),
+    )
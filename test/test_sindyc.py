@@ -188,6 +188,37 @@ def test_simulate(data):
     assert len(x1) == len(t)
 
 
+@pytest.mark.parametrize(
+    "data",
+    [pytest.lazy_fixture("data_lorenz_c_1d"), pytest.lazy_fixture("data_lorenz_c_2d")],
+)
+def test_simulate_batch(data):
+    x, t, u, u_fun = data
+    model = SINDy()
+    model.fit(x, u=u, t=t)
+    x0 = x[[0, 10]]
+    x_batch = model.simulate_batch(x0, t=t[:20], u=u_fun)
+
+    assert x_batch.shape == (2, 20, x.shape[1])
+    for x0_i, x_i in zip(x0, x_batch):
+        x_ref = model.simulate(x0_i, t=t[:20], u=u_fun)
+        np.testing.assert_allclose(x_i, x_ref, rtol=1e-6, atol=1e-6)
+
+
+def test_jacobian(data_lorenz_c_2d):
+    x, t, u, _ = data_lorenz_c_2d
+    model = SINDy()
+    model.fit(x, u=u, t=t)
+    jac = model.jacobian(x[:5], u=u[:5])
+    assert jac.shape == (5, x.shape[1], x.shape[1])
+
+    eps = 1e-6
+    step = np.zeros(x.shape[1])
+    step[0] = eps
+    fd = model.predict(x[:5] + step, u=u[:5]) - model.predict(x[:5] - step, u=u[:5])
+    np.testing.assert_allclose(jac[..., 0], fd / (2 * eps), rtol=1e-6, atol=1e-6)
+
+
 @pytest.mark.parametrize(
     "data",
     [pytest.lazy_fixture("data_lorenz_c_1d"), pytest.lazy_fixture("data_lorenz_c_2d")],
@@ -1,3 +1,5 @@
+import pickle
+
 import numpy as np
 import pytest
 from numpy.testing import assert_
@@ -137,3 +139,13 @@ def test_n_elements():
     with pytest.raises(IndexError):
         assert arr3.n_coord == 1
     assert arr3.n_sample == 1
+
+
+def test_pickle_keeps_axes():
+    arr = AxesArray(
+        np.ones((2, 3, 4)), {"ax_spatial": [0], "ax_time": 1, "ax_coord": 2}
+    )
+    loaded = pickle.loads(pickle.dumps(arr))
+    assert_equal(loaded, arr)
+    assert_(isinstance(loaded, AxesArray))
+    assert_equal(loaded.__dict__, arr.__dict__)
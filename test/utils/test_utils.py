@@ -1,6 +1,21 @@
+import tracemalloc
+
 import numpy as np
+import pytest
 
+from pysindy.differentiation import FiniteDifference
+from pysindy.feature_library import CustomLibrary
+from pysindy.feature_library import PolynomialLibrary
+from pysindy.utils import AxesArray
+from pysindy.utils import concat_sample_axis
+from pysindy.utils import drop_nan_samples
+from pysindy.utils import fingerprint
+from pysindy.utils import FitProfile
+from pysindy.utils import GramStatistics
+from pysindy.utils import RaggedTrajectories
 from pysindy.utils import reorder_constraints
+from pysindy.utils.profiling import profile_stage
+from pysindy.utils.profiling import profiled_iterations
 
 
 def test_reorder_constraints_1D():
@@ -26,3 +41,117 @@ def test_reorder_constraints_2D():
     np.testing.assert_array_equal(
         reorder_constraints(row_order, n_feats, output_order="target"), target_order
     )
+
+
+def test_gram_statistics():
+    rng = np.random.default_rng(0)
+    theta = rng.standard_normal((200, 5))
+    y = rng.standard_normal((200, 2))
+    stats = GramStatistics(5, 2)
+    stats.update(theta[:120], y[:120]).update(theta[120:], y[120:])
+    np.testing.assert_allclose(stats.ThetaTTheta, theta.T @ theta)
+    assert stats.n_samples == 200
+
+    R, b = stats.to_least_squares()
+    assert R.shape[0] <= 5
+    np.testing.assert_allclose(
+        np.linalg.lstsq(R, b, rcond=None)[0], np.linalg.lstsq(theta, y, rcond=None)[0]
+    )
+    coef = rng.standard_normal((2, 5))
+    np.testing.assert_allclose(
+        stats.residual(coef), np.sum((y - theta @ coef.T) ** 2, axis=0)
+    )
+
+    with pytest.raises(ValueError):
+        stats.update(theta[:, :4], y)
+
+    # Lower precision data is accumulated in float64, block by block
+    theta32 = np.tile(theta, (30, 1)).astype(np.float32)
+    y32 = np.tile(y, (30, 1)).astype(np.float32)
+    stats32 = GramStatistics(5, 2).update(theta32, y32)
+    assert stats32.ThetaTTheta.dtype == np.float64
+    theta64 = theta32.astype(np.float64)
+    np.testing.assert_allclose(stats32.ThetaTTheta, theta64.T @ theta64)
+    np.testing.assert_allclose(stats32.y_sum, y32.astype(np.float64).sum(axis=0))
+
+
+def test_fingerprint():
+    def power(p):
+        return lambda x: x**p
+
+    assert fingerprint(np.arange(3.0)) == fingerprint(np.arange(3.0))
+    assert fingerprint(np.arange(3.0)) != fingerprint(np.arange(3))
+    assert fingerprint(np.arange(3.0)) != fingerprint(np.arange(3.0)[::-1])
+    assert fingerprint(power(2)) == fingerprint(power(2))
+    assert fingerprint(power(2)) != fingerprint(power(3))
+    assert fingerprint(PolynomialLibrary()) == fingerprint(PolynomialLibrary())
+    assert fingerprint(PolynomialLibrary()) != fingerprint(PolynomialLibrary(3))
+    assert fingerprint(FiniteDifference()) != fingerprint(FiniteDifference(order=4))
+
+    # Fitting does not change the fingerprint
+    library = CustomLibrary([power(2)], function_names=[lambda x: x + "^2"])
+    key = fingerprint(library)
+    library.fit(np.ones((4, 2)))
+    assert fingerprint(library) == key
+
+
+def test_fit_profile_nesting():
+    assert list(profiled_iterations(3, None)) == [0, 1, 2]
+    with FitProfile() as profile:
+        with profile_stage("outer"):
+            a = np.ones(10**5)
+            with profile_stage("inner"):
+                b = np.ones(10**6)
+                del b
+            for k in profiled_iterations(5, profile):
+                if k == 2:
+                    break
+            del a
+    assert not tracemalloc.is_tracing()
+    stages = profile.stages
+    assert set(stages) == {"outer", "outer/inner", "outer/iteration"}
+    assert stages["outer/iteration"]["calls"] == 3
+    assert [it["iteration"] for it in profile.iterations] == [0, 1, 2]
+    assert stages["outer/inner"]["peak_bytes"] >= 8 * 10**6
+    # The enclosing stage accounts for the peaks of the stages it contains
+    assert stages["outer"]["peak_bytes"] >= 8 * (10**6 + 10**5)
+    assert stages["outer"]["wall_time"] >= stages["outer/inner"]["wall_time"]
+    assert profile.to_dict()["stages"] == stages
+
+
+def test_sample_axis_helpers_avoid_copies():
+    x = AxesArray(np.ones((10, 2)), {"ax_sample": 0, "ax_coord": 1})
+    y = AxesArray(np.ones((10, 1)), {"ax_sample": 0, "ax_coord": 1})
+    assert np.shares_memory(concat_sample_axis([x]), x)
+    assert concat_sample_axis([x, x]).shape == (20, 2)
+
+    x_kept, y_kept = drop_nan_samples(x, y)
+    assert x_kept is x and y_kept is y
+    x[3] = np.nan
+    x_kept, y_kept = drop_nan_samples(x, y)
+    assert x_kept.shape == (9, 2) and y_kept.shape == (9, 1)
+
+
+def test_ragged_trajectories():
+    x = [np.arange(6.0).reshape(3, 2), np.arange(8.0).reshape(4, 2)]
+    ragged = RaggedTrajectories.from_list(x, t=[0.5, np.array([0, 1, 3, 4.0])])
+    assert len(ragged) == 2
+    np.testing.assert_array_equal(ragged.offsets, [0, 3, 7])
+    np.testing.assert_array_equal(ragged[-1], x[1])
+    np.testing.assert_array_equal(ragged.t, [0, 0.5, 1, 0, 1, 3, 4])
+    assert ragged.uniform_step() is None
+    assert ragged.uniform_step(0.1) == 0.1
+
+    trimmed = ragged.trim(start=1, stop=1)
+    np.testing.assert_array_equal(trimmed.lengths, [1, 2])
+    np.testing.assert_array_equal(trimmed.data, np.concatenate([x[0][1:2], x[1][1:3]]))
+    np.testing.assert_array_equal(trimmed.t, [0.5, 1, 3])
+
+    with pytest.raises(ValueError):
+        RaggedTrajectories(np.zeros((7, 2)), [0, 3, 6])
+    with pytest.raises(ValueError):
+        RaggedTrajectories(np.zeros((7, 2)), [0, 3, 3, 7])
+    with pytest.raises(ValueError):
+        RaggedTrajectories(np.zeros((7, 2)), [0, 3, 7], t=np.ones(7))
+    with pytest.raises(ValueError):
+        ragged.trim(start=2, stop=1)